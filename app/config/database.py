@@ -1,26 +1,289 @@
 """
 Módulo de configuración de la base de datos.
+
+La configuración se lee de las variables de entorno y, opcionalmente, de un archivo YAML indicado
+en DB_CONFIG_FILE (las variables de entorno tienen prioridad):
+
+    DATABASE_URL            URL completa de la base de datos principal (si no, se forma con DB_USER,
+                            DB_PASSWORD, DB_HOST y DB_NAME).
+    DATABASE_REPLICA_URL    URL de una réplica de solo lectura (opcional).
+    DB_POOL_SIZE            Conexiones que se mantienen abiertas en el pool.
+    DB_MAX_OVERFLOW         Conexiones adicionales permitidas por encima de DB_POOL_SIZE.
+    DB_POOL_TIMEOUT         Segundos de espera máxima por una conexión libre.
+    DB_POOL_RECYCLE         Segundos tras los que se renueva una conexión (-1 para no renovar).
+    DB_POOL_PRE_PING        Comprueba cada conexión antes de usarla.
+    DB_LOG_LEVEL            Nivel del log de SQLAlchemy: WARNING (por defecto), INFO (sentencias) o DEBUG (filas).
+
+Los routers usan sesiones asíncronas (get_async_db) sobre un AsyncEngine con el driver asíncrono
+equivalente al de la URL (aiomysql para MySQL, aiosqlite para SQLite) y ejecutan los servicios
+síncronos con run_in_session, de modo que las consultas no bloquean el bucle de eventos. Las sesiones
+síncronas (get_db, get_sessionmaker) siguen disponibles para los scripts y los endpoints de streaming.
 """
 
-from sqlalchemy import create_engine, inspect
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import SQLAlchemyError
-from app.models.base import get_base
+from sqlalchemy.exc import SQLAlchemyError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+DEFAULT_SETTINGS = {
+    "user": "root",
+    "password": "",
+    "host": "127.0.0.1",
+    "name": "data_prodct_project",
+    "url": None,
+    "replica_url": None,
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 30,
+    "pool_recycle": 1800,
+    "pool_pre_ping": True,
+    "log_level": "WARNING"
+}
+
+ENV_SETTINGS = {
+    "user": "DB_USER",
+    "password": "DB_PASSWORD",
+    "host": "DB_HOST",
+    "name": "DB_NAME",
+    "url": "DATABASE_URL",
+    "replica_url": "DATABASE_REPLICA_URL",
+    "pool_size": "DB_POOL_SIZE",
+    "max_overflow": "DB_MAX_OVERFLOW",
+    "pool_timeout": "DB_POOL_TIMEOUT",
+    "pool_recycle": "DB_POOL_RECYCLE",
+    "pool_pre_ping": "DB_POOL_PRE_PING",
+    "log_level": "DB_LOG_LEVEL"
+}
+
+
+def load_settings(config_file: str = None) -> dict:
+    """
+    Lee la configuración de la base de datos del archivo YAML (si existe) y de las variables de entorno.
+
+    Args:
+        config_file (str, optional): Ruta del archivo YAML. Por defecto la de DB_CONFIG_FILE.
+
+    Returns:
+        dict: Configuración con las claves de DEFAULT_SETTINGS y los tipos de sus valores por defecto.
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    config_file = config_file or os.getenv("DB_CONFIG_FILE")
+    if config_file:
+        import yaml
+
+        with open(config_file, "r", encoding="utf-8") as file:
+            settings.update((yaml.safe_load(file) or {}).get("database", {}))
+    for key, variable in ENV_SETTINGS.items():
+        if os.getenv(variable) is not None:
+            settings[key] = os.environ[variable]
+
+    for key in ("pool_size", "max_overflow", "pool_recycle"):
+        settings[key] = int(settings[key])
+    settings["pool_timeout"] = float(settings["pool_timeout"])
+    if isinstance(settings["pool_pre_ping"], str):
+        settings["pool_pre_ping"] = settings["pool_pre_ping"].lower() in ("1", "true", "yes")
+    if not settings["url"]:
+        # Conexión a una base de datos MySQL
+        settings["url"] = URL.create(
+            "mysql+mysqlconnector",
+            username=settings["user"],
+            password=settings["password"] or None,
+            host=settings["host"],
+            database=settings["name"]
+        )
+    return settings
+
+
+class PoolMetricsMixin:
+    """
+    Métricas de un pool con cola: cuántas veces se pide una conexión y cuánto se espera por ella,
+    para detectar cuándo el pool se queda sin conexiones libres.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._metrics_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._metrics_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._metrics_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_seconds, pool.max_wait_seconds = self.wait_seconds, self.max_wait_seconds
+        return pool
+
+    def metrics(self) -> dict:
+        """
+        Devuelve el estado del pool y las métricas de espera acumuladas.
+        """
+        with self._metrics_lock:
+            return {
+                "size": self.size(),
+                "checked_out": self.checkedout(),
+                "overflow": max(self.overflow(), 0),
+                "idle": self.checkedin(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds, 6),
+                "wait_seconds_avg": round(self.wait_seconds / self.checkouts, 6) if self.checkouts else 0.0,
+                "wait_seconds_max": round(self.max_wait_seconds, 6)
+            }
+
+
+class MeteredQueuePool(PoolMetricsMixin, QueuePool):
+    """
+    QueuePool de los engines síncronos con métricas de espera (ver PoolMetricsMixin).
+    """
 
 
+class MeteredAsyncAdaptedQueuePool(PoolMetricsMixin, AsyncAdaptedQueuePool):
+    """
+    Pool de los engines asíncronos, que atienden las peticiones de los routers, con métricas de espera.
+    """
+
+
+def create_db_engine(url, settings: dict):
+    """
+    Crea un engine con la configuración del pool. Las bases de datos SQLite usan el pool por defecto.
+    """
+    if str(url).startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(
+        url,
+        poolclass=MeteredQueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=settings["pool_timeout"],
+        pool_recycle=settings["pool_recycle"],
+        pool_pre_ping=settings["pool_pre_ping"]
+    )
+
+
+# Driver asíncrono equivalente a cada driver síncrono
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+mysqlconnector": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite"
+}
+
+
+def async_url(url):
+    """
+    Devuelve la URL con el driver asíncrono equivalente (las URL que ya son asíncronas no cambian).
+    """
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
+
+
+def create_async_db_engine(url, settings: dict):
+    """
+    Crea un AsyncEngine con el driver asíncrono equivalente y la configuración del pool.
+    """
+    url = async_url(url)
+    if url.drivername.startswith("sqlite"):
+        return create_async_engine(url)
+    return create_async_engine(
+        url,
+        poolclass=MeteredAsyncAdaptedQueuePool,
+        pool_size=settings["pool_size"],
+        max_overflow=settings["max_overflow"],
+        pool_timeout=settings["pool_timeout"],
+        pool_recycle=settings["pool_recycle"],
+        pool_pre_ping=settings["pool_pre_ping"]
+    )
+
+
+def pool_metrics(db_engine) -> dict:
+    """
+    Devuelve las métricas del pool de un engine (síncrono o asíncrono), o solo su estado si el pool
+    no tiene métricas.
+    """
+    pool = db_engine.pool
+    if isinstance(pool, PoolMetricsMixin):
+        return pool.metrics()
+    return {"status": pool.status()}
 
 
-# Conexión a una base de datos MySQL
-USERNAME = 'root'
-PASSWORD = ''
-HOST = '127.0.0.1'
-DATABASE_NAME = 'data_prodct_project'
+settings = load_settings()
 
-SQLALCHEMY_DATABASE_URL = f"mysql+mysqlconnector://{USERNAME}:{PASSWORD}@{HOST}/{DATABASE_NAME}"
+# El log de sentencias se controla con el nivel del logger en lugar de echo, que escribe cada sentencia en stdout
+logging.getLogger("sqlalchemy.engine").setLevel(settings["log_level"].upper())
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, echo=True)
-print("Conectando a la base de datos en:", SQLALCHEMY_DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Los engines síncronos se crean al arrancar la aplicación (init_engines, en el lifespan) o la primera
+# vez que se piden, no al importar el módulo: importar un router o un script no carga el driver de la
+# base de datos ni crea el pool
+_engines = {}
+_sessionmakers = {}
+_engines_lock = threading.Lock()
+
+
+def get_engine(read_only: bool = False):
+    """
+    Devuelve el engine de la base de datos principal o de la réplica de solo lectura, creándolo la
+    primera vez. Si no hay réplica configurada las lecturas usan la base de datos principal.
+    """
+    key = "replica" if read_only and settings["replica_url"] else "primary"
+    if key not in _engines:
+        with _engines_lock:
+            if key not in _engines:
+                db_engine = create_db_engine(settings["replica_url"] if key == "replica" else settings["url"], settings)
+                print("Conectando a la base de datos en:", db_engine.url.render_as_string(hide_password=True))
+                _sessionmakers[key] = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+                _engines[key] = db_engine
+    return _engines[key]
+
+
+def get_sessionmaker(read_only: bool = False) -> sessionmaker:
+    """
+    Devuelve la fábrica de sesiones síncronas de la base de datos principal o de la réplica.
+    """
+    get_engine(read_only)
+    return _sessionmakers["replica" if read_only and settings["replica_url"] else "primary"]
+
+
+def init_engines():
+    """
+    Crea los engines síncronos de la base de datos principal y de la réplica.
+    """
+    get_engine()
+    get_engine(read_only=True)
+
+
+def close_engines():
+    """
+    Cierra las conexiones de los engines síncronos creados.
+    """
+    with _engines_lock:
+        for db_engine in _engines.values():
+            db_engine.dispose()
+        _engines.clear()
+        _sessionmakers.clear()
 
 def get_db():
     """
@@ -29,32 +292,131 @@ def get_db():
     Yields:
         db: Sesión de la base de datos.
     """
-    db = SessionLocal()
+    db = get_sessionmaker()()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db():
+    """
+    Generador de sesiones de solo lectura sobre la réplica (o la base de datos principal si no hay réplica).
+
+    Yields:
+        db: Sesión de la base de datos de lectura.
+    """
+    db = get_sessionmaker(read_only=True)()
     try:
         yield db
     finally:
         db.close()
 
-        
+# Los engines asíncronos se crean la primera vez que se usan, para que importar el módulo no
+# requiera el driver asíncrono (por ejemplo en los scripts que solo usan sesiones síncronas)
+_async_sessionmakers = {}
+
+
+def get_async_sessionmaker(read_only: bool = False) -> async_sessionmaker:
+    """
+    Devuelve la fábrica de sesiones asíncronas de la base de datos principal o de la réplica.
+    """
+    key = "replica" if read_only and settings["replica_url"] else "primary"
+    if key not in _async_sessionmakers:
+        url = settings["replica_url"] if key == "replica" else settings["url"]
+        # expire_on_commit=False: los objetos devueltos se serializan después del commit sin volver a la base de datos
+        _async_sessionmakers[key] = async_sessionmaker(
+            create_async_db_engine(url, settings), autoflush=False, expire_on_commit=False
+        )
+    return _async_sessionmakers[key]
+
+
+async def get_async_db():
+    """
+    Generador asíncrono que cierra la sesión de la base de datos después de cada solicitud.
+
+    Yields:
+        db: Sesión asíncrona de la base de datos.
+    """
+    async with get_async_sessionmaker()() as db:
+        yield db
+
+async def get_async_read_db():
+    """
+    Generador asíncrono de sesiones de solo lectura sobre la réplica (o la base de datos principal si no hay réplica).
+
+    Yields:
+        db: Sesión asíncrona de la base de datos de lectura.
+    """
+    async with get_async_sessionmaker(read_only=True)() as db:
+        yield db
+
+async def run_in_session(db: AsyncSession, function, *args, schema=None, **kwargs):
+    """
+    Ejecuta una función de servicio síncrona (que recibe la sesión como primer argumento) sobre la
+    conexión asíncrona de db.
+
+    Args:
+        db (AsyncSession): Sesión asíncrona de la base de datos.
+        function: Función del servicio.
+        schema (optional): Esquema de Pydantic con el que se convierte el resultado (un objeto o una
+            lista) dentro de la misma llamada, para que las relaciones que falten se carguen sin salir
+            del contexto síncrono.
+
+    Returns:
+        El resultado de la función, convertido con schema si se indica (None se devuelve tal cual).
+    """
+    def call(session):
+        result = function(session, *args, **kwargs)
+        if schema is None or result is None:
+            return result
+        if isinstance(result, list):
+            return [schema.model_validate(item) for item in result]
+        return schema.model_validate(result)
+
+    return await db.run_sync(call)
+
+async def close_async_engines():
+    """
+    Cierra las conexiones de los engines asíncronos creados.
+    """
+    for factory in _async_sessionmakers.values():
+        await factory.kw["bind"].dispose()
+    _async_sessionmakers.clear()
+
+def get_pool_metrics() -> dict:
+    """
+    Devuelve las métricas de los pools de la base de datos principal y de la réplica: los de los
+    engines asíncronos, que atienden las peticiones de los routers, y los de los síncronos.
+    """
+    primary, replica = get_engine(), get_engine(read_only=True)
+    async_primary = get_async_sessionmaker().kw["bind"]
+    async_replica = get_async_sessionmaker(read_only=True).kw["bind"]
+    return {
+        "primary": pool_metrics(primary),
+        "replica": pool_metrics(replica) if replica is not primary else None,
+        "async_primary": pool_metrics(async_primary),
+        "async_replica": pool_metrics(async_replica) if async_replica is not async_primary else None
+    }
+
+
 def init_db():
     """
-    Función para la creación de las tablas en la base de datos.
+    Función para la creación y actualización de las tablas en la base de datos: aplica las
+    migraciones pendientes (ver app.migrations.runner).
+
+    Raises:
+        ValueError: Si el esquema de la base de datos es más reciente que el código o una migración
+            no se puede aplicar a los datos existentes.
     """
     try:
-        from app.models.user import User
-        from app.models.role import Role
-        from app.models.policy import Policy
-        from app.models.domain import Domain
-        from app.models.data_product import DataProduct
-        print("Intentando crear tablas en la base de datos...")
-        get_base().metadata.create_all(bind=engine)
-
-        # Inspeccionar y mostrar las tablas existentes
-        inspector = inspect(engine)
-        print("Tablas existentes en la base de datos después de la creación:", inspector.get_table_names())
+        from app.migrations.runner import LATEST_VERSION, migrate
+        applied = migrate(get_engine())
+        if applied:
+            print(f"Migraciones aplicadas: {applied}")
+        print(f"Esquema de la base de datos en la versión {LATEST_VERSION}")
 
     except (SQLAlchemyError, ConnectionError) as e:  # Aquí podrías ser más específico con el tipo de excepción
-        print(f"Error al crear tablas: {e}")
+        print(f"Error al actualizar el esquema: {e}")
 
 
 if __name__ == "__main__":
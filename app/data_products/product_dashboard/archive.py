@@ -0,0 +1,375 @@
+"""
+Este módulo implementa el archivo histórico de los datos validados.
+
+Los datos se añaden comprimidos (zlib) a archivos de segmento de solo escritura al final, que rotan
+al alcanzar un tamaño máximo. Cada segmento tiene un índice (timestamp, planta, offset, longitud)
+que se carga en memoria para buscar por rango de fechas o por planta sin leer los segmentos enteros.
+
+Cada línea del índice es un array JSON [timestamp, planta, offset, longitud]; los índices antiguos,
+con los campos separados por tabuladores, se siguen leyendo. La retención se aplica al rotar y en la
+tarea periódica de create_retention_task, que la aplicación arranca en su lifespan.
+
+Varios procesos (workers de uvicorn) pueden compartir el directorio: las escrituras y la retención se
+serializan con un bloqueo de archivo (archive.lock) y, una vez obtenido, cada proceso toma el
+segmento activo y su tamaño de los archivos, no de su memoria. Las entradas que escriben los demás
+procesos se incorporan leyendo lo nuevo de cada índice antes de escribir y de buscar. El bloqueo de
+archivo solo existe en sistemas POSIX: en el resto solo puede escribir un proceso.
+"""
+
+import asyncio
+import bisect
+import glob
+import json
+import logging
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos, un solo proceso escritor
+    fcntl = None
+
+FRAME_HEADER = struct.Struct(">I")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, order=True)
+class ArchiveEntry:
+    """
+    Entrada del índice del archivo.
+
+    Atributos:
+    timestamp: Timestamp de los datos (metadata.timestamp).
+    sequence: Orden de escritura, para desempatar entradas con el mismo timestamp.
+    plant: Planta de los datos.
+    segment: Número del segmento que contiene los datos.
+    offset: Posición del registro dentro del segmento.
+    length: Longitud del registro comprimido.
+    """
+    timestamp: str
+    sequence: int
+    plant: str
+    segment: int
+    offset: int
+    length: int
+
+
+def parse_index_line(line: str) -> tuple[str, str, int, int]:
+    """
+    Lee una línea del índice: un array JSON o, en los índices antiguos, campos separados por tabuladores.
+    """
+    if line.startswith("["):
+        timestamp, plant, offset, length = json.loads(line)
+        return timestamp, plant, offset, length
+    # El timestamp no tiene tabuladores; la planta puede tenerlos, así que se toma lo que queda en medio
+    timestamp, rest = line.rstrip("\n").split("\t", 1)
+    plant, offset, length = rest.rsplit("\t", 2)
+    return timestamp, plant, int(offset), int(length)
+
+
+class SegmentArchive:
+    """
+    Archivo de segmentos comprimidos con índice por timestamp y por planta.
+
+    Args:
+        directory (str): Directorio de los segmentos.
+        max_segment_bytes (int): Tamaño a partir del cual se abre un segmento nuevo.
+        retention_days (int, optional): Días que se conservan los segmentos cerrados. None para no borrar nunca.
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024, retention_days: int = None):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._entries: list[ArchiveEntry] = []
+        self._by_plant: dict[str, list[ArchiveEntry]] = {}
+        self._sequence = 0
+        # Bytes ya leídos del índice de cada segmento conocido
+        self._index_offsets: dict[int, int] = {}
+        self._lock_file = open(os.path.join(directory, "archive.lock"), "a", encoding="utf-8") if fcntl else None
+        self._segment = 1
+        self._segment_size = 0
+        with self._lock:
+            self._sync_with_files()
+
+    def close(self):
+        """
+        Cierra el archivo del bloqueo entre procesos.
+        """
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def segments(self) -> list[int]:
+        """
+        Devuelve los números de segmento existentes, en orden.
+        """
+        return sorted(
+            int(os.path.basename(path)[len("segment-"):-len(".log")])
+            for path in glob.glob(os.path.join(self.directory, "segment-*.log"))
+        )
+
+    def append(self, combined_data: dict) -> ArchiveEntry:
+        """
+        Añade unos datos combinados al archivo y devuelve su entrada de índice.
+        """
+        return self.append_many([combined_data])[0]
+
+    def append_many(self, batch: list[dict]) -> list[ArchiveEntry]:
+        """
+        Añade varios datos combinados al archivo con una sola escritura por segmento.
+        """
+        entries = []
+        rotated = False
+        with self._writer_lock():
+            frames = []
+            for combined_data in batch:
+                if self._segment_size >= self.max_segment_bytes:
+                    self._write(frames, entries)
+                    frames = []
+                    self._segment += 1
+                    self._segment_size = 0
+                    rotated = True
+                record = zlib.compress(json.dumps(combined_data, ensure_ascii=False).encode("utf-8"))
+                self._sequence += 1
+                entries.append(ArchiveEntry(
+                    timestamp=combined_data["metadata"]["timestamp"],
+                    sequence=self._sequence,
+                    plant=combined_data.get("Planta", ""),
+                    segment=self._segment,
+                    offset=self._segment_size + FRAME_HEADER.size,
+                    length=len(record)
+                ))
+                frames.append(FRAME_HEADER.pack(len(record)) + record)
+                self._segment_size += FRAME_HEADER.size + len(record)
+            self._write(frames, entries)
+
+        # Además de en la tarea periódica, la retención se comprueba al rotar, fuera de la ruta de escritura normal
+        if rotated:
+            self.apply_retention()
+        return entries
+
+    def find(self, start: str = None, end: str = None, plant: str = None, limit: int = None) -> list[dict]:
+        """
+        Busca los datos archivados en el rango de timestamps [start, end] y, opcionalmente, de una planta.
+
+        Returns:
+            list[dict]: Los datos encontrados, ordenados por timestamp.
+        """
+        entries = self.find_entries(start, end, plant, limit)
+        files = self._open_segments({entry.segment for entry in entries})
+        try:
+            # Las entradas de los segmentos que la retención ha borrado después de buscarlas se omiten
+            return [self._read_frame(files[entry.segment], entry) for entry in entries if entry.segment in files]
+        finally:
+            for segment_file in files.values():
+                segment_file.close()
+
+    def find_entries(self, start: str = None, end: str = None, plant: str = None, limit: int = None) -> list[ArchiveEntry]:
+        """
+        Busca en el índice las entradas del rango de timestamps [start, end] y, opcionalmente, de una planta.
+        """
+        with self._lock:
+            self._read_new_index_entries()
+            entries = self._by_plant.get(plant, []) if plant is not None else self._entries
+            low = bisect.bisect_left(entries, start, key=lambda entry: entry.timestamp) if start else 0
+            high = bisect.bisect_right(entries, end, key=lambda entry: entry.timestamp) if end else len(entries)
+            found = entries[low:high]
+        return found[:limit] if limit is not None else found
+
+    def read(self, entry: ArchiveEntry) -> dict:
+        """
+        Lee y descomprime los datos de una entrada del índice.
+
+        Raises:
+            FileNotFoundError: Si la retención ha borrado el segmento de la entrada.
+        """
+        files = self._open_segments({entry.segment})
+        if entry.segment not in files:
+            raise FileNotFoundError(self._segment_path(entry.segment))
+        with files[entry.segment] as segment_file:
+            return self._read_frame(segment_file, entry)
+
+    def apply_retention(self, now: datetime = None) -> list[int]:
+        """
+        Borra los segmentos cerrados cuyos datos son todos anteriores al periodo de retención.
+
+        Returns:
+            list[int]: Números de los segmentos borrados.
+        """
+        if self.retention_days is None:
+            return []
+        cutoff = ((now or datetime.now()) - timedelta(days=self.retention_days)).strftime("%Y-%m-%dT%H:%M:%S")
+        with self._writer_lock():
+            newest = {}
+            for entry in self._entries:
+                newest[entry.segment] = max(newest.get(entry.segment, ""), entry.timestamp)
+            expired = []
+            for segment in self.segments():
+                if segment == self._segment or newest.get(segment, "") >= cutoff:
+                    continue
+                try:
+                    os.remove(self._segment_path(segment))
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    # En Windows no se puede borrar un segmento abierto por una lectura: se borrará la próxima vez
+                    logger.warning("Could not remove archive segment %s", segment, exc_info=True)
+                    continue
+                if os.path.exists(self._index_path(segment)):
+                    os.remove(self._index_path(segment))
+                expired.append(segment)
+            self._forget_segments(expired)
+        return expired
+
+    def _write(self, frames: list[bytes], entries: list[ArchiveEntry]):
+        if not frames:
+            return
+        new_entries = entries[-len(frames):]
+        with open(self._segment_path(self._segment), "ab") as segment_file:
+            segment_file.write(b"".join(frames))
+        with open(self._index_path(self._segment), "ab") as index_file:
+            index_file.write("".join(
+                json.dumps([entry.timestamp, entry.plant, entry.offset, entry.length], ensure_ascii=False) + "\n"
+                for entry in new_entries
+            ).encode("utf-8"))
+            # Con el bloqueo de escritura el índice estaba leído hasta el final: lo escrito ya está en memoria
+            self._index_offsets[self._segment] = index_file.tell()
+        for entry in new_entries:
+            self._add_entry(entry)
+
+    def _add_entry(self, entry: ArchiveEntry):
+        bisect.insort(self._entries, entry)
+        bisect.insort(self._by_plant.setdefault(entry.plant, []), entry)
+
+    def _forget_segments(self, segments: list[int]):
+        if not segments:
+            return
+        for segment in segments:
+            self._index_offsets.pop(segment, None)
+        self._entries = [entry for entry in self._entries if entry.segment not in segments]
+        self._by_plant = {
+            plant: [entry for entry in entries if entry.segment not in segments]
+            for plant, entries in self._by_plant.items()
+        }
+
+    @contextmanager
+    def _writer_lock(self):
+        # Bloqueo de los hilos del proceso y, entre procesos, del archivo archive.lock; una vez
+        # obtenido se toma el estado de los archivos, que otro proceso puede haber cambiado
+        with self._lock:
+            if self._lock_file is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            try:
+                self._sync_with_files()
+                yield
+            finally:
+                if self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _sync_with_files(self):
+        segments = self._read_new_index_entries()
+        self._segment = segments[-1] if segments else 1
+        segment_path = self._segment_path(self._segment)
+        self._segment_size = os.path.getsize(segment_path) if os.path.exists(segment_path) else 0
+
+    def _read_new_index_entries(self) -> list[int]:
+        # Incorpora las líneas completas que se han añadido a los índices (también las de otros
+        # procesos) y olvida los segmentos que ya no existen. Devuelve los segmentos existentes.
+        segments = self.segments()
+        self._forget_segments([segment for segment in self._index_offsets if segment not in segments])
+        for segment in segments:
+            offset = self._index_offsets.get(segment, 0)
+            index_path = self._index_path(segment)
+            try:
+                if os.path.getsize(index_path) <= offset:
+                    self._index_offsets[segment] = offset
+                    continue
+                with open(index_path, "rb") as index_file:
+                    index_file.seek(offset)
+                    data = index_file.read()
+            except FileNotFoundError:
+                self._index_offsets[segment] = offset
+                continue
+            end = data.rfind(b"\n") + 1
+            for line in data[:end].decode("utf-8").split("\n")[:-1]:
+                timestamp, plant, entry_offset, length = parse_index_line(line)
+                self._sequence += 1
+                self._add_entry(ArchiveEntry(timestamp, self._sequence, plant, segment, int(entry_offset), int(length)))
+            self._index_offsets[segment] = offset + end
+        return segments
+
+    def _open_segments(self, segments: set[int]) -> dict:
+        # Los segmentos se abren con el lock para que la retención no los borre entre la búsqueda y
+        # la lectura; la lectura se hace después, sin el lock (un archivo abierto sigue siendo legible
+        # aunque se borre)
+        files = {}
+        with self._lock:
+            for segment in segments:
+                try:
+                    files[segment] = open(self._segment_path(segment), "rb")
+                except FileNotFoundError:
+                    continue
+        return files
+
+    @staticmethod
+    def _read_frame(segment_file, entry: ArchiveEntry) -> dict:
+        segment_file.seek(entry.offset)
+        return json.loads(zlib.decompress(segment_file.read(entry.length)))
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:08d}.log")
+
+    def _index_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"segment-{segment:08d}.idx")
+
+
+_archive = None
+
+
+def get_archive() -> SegmentArchive:
+    """
+    Devuelve el archivo compartido, creándolo con la configuración del entorno la primera vez.
+    """
+    global _archive
+    if _archive is None:
+        retention_days = os.getenv("ARCHIVE_RETENTION_DAYS")
+        _archive = SegmentArchive(
+            os.getenv("ARCHIVE_DIR", "app/archive"),
+            max_segment_bytes=int(os.getenv("ARCHIVE_SEGMENT_BYTES", str(64 * 1024 * 1024))),
+            retention_days=int(retention_days) if retention_days else None
+        )
+    return _archive
+
+
+async def _retention_loop(archive: SegmentArchive, interval: float):
+    while True:
+        try:
+            expired = await asyncio.to_thread(archive.apply_retention)
+            if expired:
+                logger.info("Archive retention removed segments %s", expired)
+        except Exception:
+            logger.exception("Archive retention failed")
+        await asyncio.sleep(interval)
+
+
+def create_retention_task(interval: float = None):
+    """
+    Arranca la tarea que aplica la retención del archivo al arrancar y después cada interval segundos
+    (por defecto ARCHIVE_RETENTION_INTERVAL, una hora), aunque no se escriba nada.
+
+    Returns:
+        asyncio.Task: La tarea, que hay que cancelar al parar, o None si no hay retención configurada.
+    """
+    if not os.getenv("ARCHIVE_RETENTION_DAYS"):
+        return None
+    interval = interval or float(os.getenv("ARCHIVE_RETENTION_INTERVAL", "3600"))
+    return asyncio.create_task(_retention_loop(get_archive(), interval))
@@ -0,0 +1,111 @@
+"""
+Este módulo mantiene en memoria los contratos de datos ya parseados y compilados.
+
+Cada archivo de contrato se lee una sola vez y solo se vuelve a cargar si cambia su fecha de
+modificación. El registro nunca escribe en los archivos de contrato.
+"""
+
+import copy
+import os
+import threading
+from dataclasses import dataclass, field
+
+from app.data_products.product_dashboard.contract_validator import ContractValidator
+
+
+@dataclass(frozen=True)
+class CompiledContract:
+    """
+    Contrato de datos parseado y compilado.
+
+    Atributos:
+    contract_id: Identificador del contrato.
+    version: Versión del contrato (info.version).
+    path: Ruta del archivo del contrato.
+    mtime: Fecha de modificación del archivo cuando se cargó.
+    validator: Validador compilado del modelo principal.
+    """
+    contract_id: str
+    version: str
+    path: str
+    mtime: float
+    validator: ContractValidator
+    _contract: dict = field(repr=False)
+
+    def as_dict(self) -> dict:
+        """
+        Devuelve una copia del contrato parseado, que se puede modificar sin afectar al registro.
+        """
+        return copy.deepcopy(self._contract)
+
+
+class ContractRegistry:
+    """
+    Registro de contratos de datos indexado por (id, versión) y por ruta de archivo.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_path: dict[str, CompiledContract] = {}
+        self._by_key: dict[tuple[str, str], CompiledContract] = {}
+
+    def get(self, path: str) -> CompiledContract:
+        """
+        Devuelve el contrato compilado de un archivo, recargándolo solo si ha cambiado su mtime.
+        """
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime
+        compiled = self._by_path.get(path)
+        if compiled is not None and compiled.mtime == mtime:
+            return compiled
+
+        with self._lock:
+            compiled = self._by_path.get(path)
+            if compiled is None or compiled.mtime != mtime:
+                compiled = self._load(path, mtime)
+            return compiled
+
+    def get_by_id(self, contract_id: str, version: str = None) -> CompiledContract:
+        """
+        Devuelve un contrato ya cargado por su id y, opcionalmente, su versión.
+
+        Raises:
+            KeyError: Si el contrato no está registrado.
+        """
+        if version is not None:
+            return self._by_key[(contract_id, version)]
+        candidates = [compiled for (key_id, _), compiled in self._by_key.items() if key_id == contract_id]
+        if not candidates:
+            raise KeyError(contract_id)
+        return max(candidates, key=lambda compiled: compiled.mtime)
+
+    def clear(self):
+        """
+        Vacía el registro.
+        """
+        with self._lock:
+            self._by_path.clear()
+            self._by_key.clear()
+
+    def _load(self, path: str, mtime: float) -> CompiledContract:
+        import yaml
+
+        with open(path, "r", encoding="utf-8") as yaml_file:
+            datacontract = yaml.safe_load(yaml_file)
+        compiled = CompiledContract(
+            contract_id=datacontract.get("id"),
+            version=str(datacontract.get("info", {}).get("version")),
+            path=path,
+            mtime=mtime,
+            validator=ContractValidator(datacontract),
+            _contract=datacontract,
+        )
+        previous = self._by_path.get(path)
+        if previous is not None:
+            self._by_key.pop((previous.contract_id, previous.version), None)
+        self._by_path[path] = compiled
+        self._by_key[(compiled.contract_id, compiled.version)] = compiled
+        return compiled
+
+
+contract_registry = ContractRegistry()
@@ -0,0 +1,148 @@
+"""
+Este módulo compila los modelos de un contrato de datos (datacontract.yaml) a JSON Schema
+para validar los datos combinados en memoria, sin lanzar el datacontract-cli.
+"""
+
+import re
+
+# Correspondencia entre los tipos de la especificación datacontract y los tipos de JSON Schema
+CONTRACT_TYPES = {
+    "string": "string",
+    "text": "string",
+    "varchar": "string",
+    "timestamp": "string",
+    "timestamp_tz": "string",
+    "timestamp_ntz": "string",
+    "date": "string",
+    "number": "number",
+    "decimal": "number",
+    "numeric": "number",
+    "float": "number",
+    "double": "number",
+    "int": "integer",
+    "integer": "integer",
+    "long": "integer",
+    "bigint": "integer",
+    "boolean": "boolean",
+    "array": "array",
+    "object": "object",
+    "record": "object",
+    "struct": "object",
+    "null": "null",
+}
+
+REQUIRED_COLUMN = re.compile(r"required_column\((.+)\)")
+
+
+def field_to_schema(field: dict) -> dict:
+    """
+    Convierte la definición de un campo del contrato en un fragmento de JSON Schema.
+    """
+    field_type = field.get("type", "object")
+    schema = {"type": CONTRACT_TYPES.get(field_type, "object")}
+    if field_type in ("timestamp", "timestamp_tz", "timestamp_ntz"):
+        schema["format"] = "date-time"
+    elif field_type == "date":
+        schema["format"] = "date"
+    if "enum" in field:
+        schema["enum"] = field["enum"]
+
+    if schema["type"] == "array" and "items" in field:
+        schema["items"] = field_to_schema(field["items"])
+    elif schema["type"] == "object" and "fields" in field:
+        schema.update(fields_to_schema(field["fields"]))
+    return schema
+
+
+def fields_to_schema(fields: dict) -> dict:
+    """
+    Convierte un diccionario de campos del contrato en las propiedades de un objeto JSON Schema.
+    """
+    return {
+        "properties": {name: field_to_schema(field) for name, field in fields.items()},
+        "required": [name for name, field in fields.items() if field.get("required")],
+    }
+
+
+def model_to_schema(datacontract: dict, model_name: str) -> dict:
+    """
+    Genera el JSON Schema de un modelo del contrato de datos.
+    """
+    model = datacontract["models"][model_name]
+    schema = {"$schema": "http://json-schema.org/draft-07/schema#", "type": "object"}
+    schema.update(fields_to_schema(model.get("fields", {})))
+
+    # Las comprobaciones de calidad required_column(...) también se aplican como campos obligatorios
+    for column in quality_required_columns(datacontract, model_name):
+        if column not in schema["required"]:
+            schema["required"].append(column)
+    return schema
+
+
+def quality_required_columns(datacontract: dict, model_name: str) -> list[str]:
+    """
+    Extrae las columnas de las comprobaciones required_column(...) de la sección quality del contrato.
+    """
+    specification = datacontract.get("quality", {}).get("specification", {})
+    if not isinstance(specification, dict):
+        return []
+    checks = specification.get(f"checks for {model_name}", [])
+    return [
+        match.group(1).strip()
+        for match in (REQUIRED_COLUMN.match(check) for check in checks if isinstance(check, str))
+        if match
+    ]
+
+
+class ContractValidator:
+    """
+    Validador compilado de un modelo del contrato de datos.
+
+    Atributos:
+    contract_id: Identificador del contrato.
+    version: Versión del contrato.
+    model_name: Nombre del modelo validado.
+    schema: JSON Schema generado a partir del modelo.
+    """
+
+    def __init__(self, datacontract: dict, model_name: str = None):
+        self.contract_id = datacontract.get("id")
+        self.version = datacontract.get("info", {}).get("version")
+        self.model_name = model_name or next(iter(datacontract["models"]))
+        self.schema = model_to_schema(datacontract, self.model_name)
+        # jsonschema se importa al compilar el primer contrato, no al arrancar la aplicación
+        from jsonschema import Draft7Validator
+        self._validator = Draft7Validator(self.schema)
+
+    def iter_errors(self, data: dict) -> list[str]:
+        """
+        Devuelve los errores de validación de los datos, con la ruta del campo que falla.
+        """
+        errors = sorted(self._validator.iter_errors(data), key=lambda error: [str(part) for part in error.path])
+        return [
+            f"{'.'.join(str(part) for part in error.path) or '<root>'}: {error.message}"
+            for error in errors
+        ]
+
+    def validate(self, data: dict) -> bool:
+        """
+        Valida los datos contra el modelo del contrato.
+
+        Raises:
+            RuntimeError: Si los datos no cumplen el contrato.
+        """
+        errors = self.iter_errors(data)
+        if errors:
+            raise RuntimeError(f"Validation failed: {'; '.join(errors)}")
+        return True
+
+
+def load_validator(data_contract_path: str, model_name: str = None) -> ContractValidator:
+    """
+    Lee un contrato de datos desde disco y lo compila en un validador.
+    """
+    import yaml
+
+    with open(data_contract_path, "r", encoding="utf-8") as yaml_file:
+        datacontract = yaml.safe_load(yaml_file)
+    return ContractValidator(datacontract, model_name)
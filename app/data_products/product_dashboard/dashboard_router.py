@@ -2,53 +2,219 @@
 Router para la gestión de datos del producto de dashboard.
 """
 
-from fastapi import APIRouter, HTTPException
+import os
 
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.config.database import get_db
+
+from app.data_products.product_dashboard.archive import get_archive
 from app.data_products.product_dashboard.data_contract_service import (
     validate_data_with_datacontract,
-    send_data_to_api
-)
-from app.data_products.product_dashboard.transformers import (
-    transform_sap_data,
-    transform_gmao_data,
-    transform_clear_data,
-    transform_bim_data,
-    combine_data
+    validate_batch_with_datacontract
 )
+from app.data_products.product_dashboard.outbox import get_outbox
+from app.data_products.product_dashboard.streaming import LineTooLongError, combine_stream
+from app.data_products.product_dashboard.transformers import transform_and_combine
 from app.models.data_models_pydantic import CombinedDataInput
+from app.service.production_metric_service import store_combined_data, store_combined_batch
+from app.utils.metrics import stage_timer
+from app.utils.request_body import parse_json_items
 
 router = APIRouter()
 
-@router.post("/process_data/")
-async def process_data(data: CombinedDataInput):
+DASHBOARD_API_URL = "endpoint para dashboard en la API de vt-lab"
+# Número de líneas de trabajo (GMAO + BIM + productos de CLEAR) a partir del cual se usa el motor columnar
+COLUMNAR_MIN_LINES = int(os.getenv("COLUMNAR_MIN_LINES", "5000"))
+# Número de elementos por mensaje al encolar un lote para la API de destino
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "100"))
+
+
+@router.post("/process_data/", status_code=202)
+async def process_data(data: CombinedDataInput, db: Session = Depends(get_db)):
     """
     Recibe los datos, los manda a transformar (transformers), los manda a combinarlos para generar el Json (transformers),
-    manda el Json a validar con datacontract - cli (data_contract_service ) y
-    si se valida correctamente los envía a nuestra API.
+    manda el Json a validar contra el contrato de datos (data_contract_service) y
+    si se valida correctamente lo guarda en el archivo histórico (archive) y en la tabla de métricas de
+    producción, y lo deja en la cola de salida (outbox) para enviarlo a nuestra API.
     """
     try:
-        # Asigna los datos a cada función de transformación según corresponda
-        transformed_data_sap = transform_sap_data(data.sap)
-        transformed_data_gmao = transform_gmao_data(data.gmao)
-        transformed_data_clear = transform_clear_data(data.clear)
-        transformed_data_bim = transform_bim_data(data.bim)
-
-        # Combina todos los datos transformados en una estructura única
-        combined_data = combine_data(
-            transformed_data_sap,
-            transformed_data_gmao,
-            transformed_data_clear,
-            transformed_data_bim
-        )
+        # Transforma los datos de cada fuente y los combina en una estructura única
+        combined_data, unmatched_lines = transform_input(data)
 
         # Validar los datos antes de enviarlos, los mandamos a validar
-        if validate_data_with_datacontract(combined_data):
-            # Si la validación ha sido correcta se envía el JSON
-            response = send_data_to_api(
-                combined_data,
-                "endpoint para dashboard en la API de vt-lab"
-            )
-            return {"message": "Data sent successfully", "api_response": response}
+        with stage_timer("validate"):
+            valid = validate_data_with_datacontract(combined_data)
+        if valid:
+            # Si la validación ha sido correcta se archiva y se encola el JSON para su envío
+            delivery_id = await archive_and_enqueue(db, combined_data)
+            return {
+                "message": "Data queued for delivery",
+                "delivery_id": delivery_id,
+                "unmatched_lines": unmatched_lines
+            }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.post("/process_data/stream/", status_code=202)
+async def process_data_stream(request: Request, db: Session = Depends(get_db)):
+    """
+    Procesa un payload de gran tamaño enviado como NDJSON (ver streaming), leyéndolo y
+    transformándolo registro a registro sin cargar el cuerpo entero en memoria. El resultado
+    se valida, se archiva y se encola igual que en /process_data/.
+    """
+    try:
+        # La lectura del stream transforma y combina a la vez: se mide como combine
+        with stage_timer("combine"):
+            combined_data, unmatched_lines = await combine_stream(request.stream())
+    except LineTooLongError as e:
+        raise HTTPException(status_code=413, detail=str(e)) from e
+    except (ValueError, KeyError, AttributeError, IndexError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid stream: {e}") from e
+
+    try:
+        with stage_timer("validate"):
+            valid = validate_data_with_datacontract(combined_data)
+        if valid:
+            delivery_id = await archive_and_enqueue(db, combined_data)
+            return {
+                "message": "Data queued for delivery",
+                "delivery_id": delivery_id,
+                "unmatched_lines": unmatched_lines
+            }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.post("/process_data/batch/", status_code=202)
+async def process_data_batch(
+    request: Request,
+    chunk_size: int = Query(BATCH_CHUNK_SIZE, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """
+    Procesa un lote de datos de varias plantas o periodos en una sola petición.
+
+    El cuerpo puede ser un array JSON de CombinedDataInput o NDJSON (un CombinedDataInput por línea,
+    con Content-Type application/x-ndjson). Todos los elementos se transforman, se validan juntos
+    y los válidos se archivan y se encolan para enviarlos a nuestra API en bloques de chunk_size elementos.
+
+    Returns:
+        dict: Resumen del lote y resultado de cada elemento, en el mismo orden de entrada.
+    """
+    raw_items = parse_json_items(await request.body(), request.headers.get("content-type", ""))
+
+    results = [{"index": index, "status": "pending"} for index in range(len(raw_items))]
+    batch = []
+    batch_indexes = []
+    for index, raw_item in enumerate(raw_items):
+        try:
+            data = CombinedDataInput.model_validate(raw_item)
+            combined_data, unmatched_lines = transform_input(data)
+        except (ValidationError, ValueError, KeyError, AttributeError, IndexError, TypeError) as e:
+            results[index].update(status="error", detail=str(e))
+            continue
+        results[index]["unmatched_lines"] = unmatched_lines
+        batch.append(combined_data)
+        batch_indexes.append(index)
 
+    valid_batch = []
+    valid_indexes = []
+    try:
+        with stage_timer("validate"):
+            validation_errors = validate_batch_with_datacontract(batch)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+    for index, combined_data, errors in zip(batch_indexes, batch, validation_errors):
+        if errors:
+            results[index].update(status="invalid", detail=errors)
+        else:
+            valid_batch.append(combined_data)
+            valid_indexes.append(index)
+
+    if valid_batch:
+        with stage_timer("archive"):
+            await run_in_threadpool(get_archive().append_many, valid_batch)
+        with stage_timer("store"):
+            await run_in_threadpool(store_combined_batch, db, valid_batch)
+    chunks = [valid_batch[start:start + chunk_size] for start in range(0, len(valid_batch), chunk_size)]
+    delivery_ids = []
+    if chunks:
+        with stage_timer("enqueue"):
+            delivery_ids = await run_in_threadpool(get_outbox().enqueue_many, chunks, DASHBOARD_API_URL)
+    for position, index in enumerate(valid_indexes):
+        results[index].update(status="queued", chunk=position // chunk_size, delivery_id=delivery_ids[position // chunk_size])
+
+    queued = sum(1 for result in results if result["status"] == "queued")
+    return {
+        "message": "Batch processed",
+        "total": len(results),
+        "queued": queued,
+        "items": results
+    }
+
+
+@router.get("/process_data/outbox/status")
+async def read_outbox_status():
+    """
+    Devuelve el estado de la cola de salida: profundidad, mensajes en envío, fallidos y retraso.
+    """
+    return await run_in_threadpool(get_outbox().stats)
+
+
+@router.get("/process_data/archive/")
+async def read_archive(
+    plant: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=10000)
+):
+    """
+    Busca datos archivados por planta y rango de timestamps (formato ISO 8601, extremos incluidos).
+
+    Returns:
+        list[dict]: Los datos archivados, ordenados por timestamp.
+    """
+    return await run_in_threadpool(get_archive().find, start, end, plant, limit)
+
+
+def transform_input(data: CombinedDataInput) -> tuple[dict, dict]:
+    """
+    Transforma y combina los datos de entrada, con el motor columnar si el payload es grande.
+    """
+    sap, gmao, clear, bim = data.sap.details, data.gmao.details, data.clear.details, data.bim.details
+    size = (
+        len(gmao.get("gmao_worklines", []))
+        + len(bim.get("bim_worklines", []))
+        + len(clear.get("output_products", []))
+    )
+    if size >= COLUMNAR_MIN_LINES:
+        # numpy solo se importa cuando llega un payload grande
+        from app.data_products.product_dashboard.columnar import combine_columnar
+        # El motor columnar transforma y combina a la vez: se mide como combine
+        with stage_timer("combine"):
+            return combine_columnar(sap, gmao, clear, bim)
+    return transform_and_combine(sap, gmao, clear, bim, timer=stage_timer)
+
+
+async def archive_and_enqueue(db: Session, combined_data: dict) -> int:
+    """
+    Archiva los datos combinados ya validados, los guarda en la tabla de métricas de producción y
+    los deja en la cola de salida.
+
+    Returns:
+        int: Identificador del envío en la cola de salida.
+    """
+    with stage_timer("archive"):
+        await run_in_threadpool(get_archive().append, combined_data)
+    with stage_timer("store"):
+        await run_in_threadpool(store_combined_data, db, combined_data)
+    with stage_timer("enqueue"):
+        return await run_in_threadpool(get_outbox().enqueue, combined_data, DASHBOARD_API_URL)
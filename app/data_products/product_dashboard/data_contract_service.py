@@ -3,40 +3,102 @@ Este módulo contiene funciones para transformar y enviar datos a otra API.
 """
 
 import json
-import subprocess
-import requests
-import yaml
-from fastapi import HTTPException
+import os
+import tempfile
 
+from app.data_products.product_dashboard.contract_registry import contract_registry
+from app.data_products.product_dashboard.delivery_client import get_delivery_client
+from app.utils.metrics import stage_timer
 
-def validate_data_with_datacontract(combined_data, data_contract_path="app/data_contracts/datacontract.yaml"):
+# Si está activo, además de la validación en memoria se ejecuta el datacontract-cli
+STRICT_VALIDATION = os.getenv("DATACONTRACT_STRICT", "false").lower() in ("1", "true", "yes")
+
+
+def validate_data_with_datacontract(combined_data, data_contract_path="app/data_contracts/datacontract.yaml", strict=None):
     """
-    Valida los datos combinados usando datacontract-cli.
+    Valida los datos combinados contra el contrato de datos.
+
+    La validación se hace en memoria con el JSON Schema compilado del contrato. En modo estricto
+    (argumento strict o variable de entorno DATACONTRACT_STRICT) se ejecuta además datacontract-cli.
+
+    Raises:
+        RuntimeError: Si los datos no cumplen el contrato.
     """
-    # Guardar los datos en un archivo JSON temporal
-    timestamp = combined_data["metadata"]["timestamp"].replace(':', '').replace('-', '').replace('T', '_').replace('Z', '')
-    filename = f"app/uploads/{timestamp}.json"
-    with open(filename, "w", encoding="utf-8") as file:
-        json.dump(combined_data, file, ensure_ascii=False, indent=2)
+    contract_registry.get(data_contract_path).validator.validate(combined_data)
 
-    # Actualizar el archivo de contrato de datos para referenciar el archivo subido
-    with open(data_contract_path, "r", encoding="utf-8") as yaml_file:
-        datacontract = yaml.safe_load(yaml_file)
-    datacontract['servers']['production']['path'] = filename
-    with open(data_contract_path, "w", encoding="utf-8") as yaml_file:
-        yaml.safe_dump(datacontract, yaml_file)
+    if strict if strict is not None else STRICT_VALIDATION:
+        validate_data_file_with_datacontract_cli(combined_data, data_contract_path)
+
+    return True  # Retorna True si la validación fue exitosa
+
+
+def validate_batch_with_datacontract(batch: list[dict], data_contract_path="app/data_contracts/datacontract.yaml", strict=None) -> list[list[str]]:
+    """
+    Valida un lote de datos combinados con el mismo validador compilado.
+
+    Args:
+        batch (list[dict]): Lista de datos combinados.
+        data_contract_path (str): Ruta del contrato de datos.
+        strict (bool, optional): Si se ejecuta además datacontract-cli sobre cada elemento válido.
+
+    Returns:
+        list[list[str]]: Errores de validación de cada elemento (lista vacía si es válido).
+    """
+    validator = contract_registry.get(data_contract_path).validator
+    errors = [validator.iter_errors(combined_data) for combined_data in batch]
 
-    # Ejecutar la validación con datacontract-cli
-    result = subprocess.run(['datacontract', 'test', data_contract_path], capture_output=True, text=True, check=True)
+    if strict if strict is not None else STRICT_VALIDATION:
+        for index, combined_data in enumerate(batch):
+            if errors[index]:
+                continue
+            try:
+                validate_data_file_with_datacontract_cli(combined_data, data_contract_path)
+            except RuntimeError as e:
+                errors[index] = [str(e)]
+    return errors
+
+
+def validate_data_file_with_datacontract_cli(combined_data, data_contract_path):
+    """
+    Guarda los datos en un archivo JSON temporal y lo valida con datacontract-cli.
+    """
+    with tempfile.NamedTemporaryFile("w", suffix=".json", encoding="utf-8", delete=False) as file:
+        json.dump(combined_data, file, ensure_ascii=False)
+    try:
+        validate_data_with_datacontract_cli(file.name, data_contract_path)
+    finally:
+        os.remove(file.name)
+
+
+def validate_data_with_datacontract_cli(filename, data_contract_path):
+    """
+    Valida un archivo de datos usando datacontract-cli.
+
+    El contrato original no se modifica: se genera una copia temporal que referencia el archivo subido.
+    """
+    import subprocess
+
+    import yaml
+
+    datacontract = contract_registry.get(data_contract_path).as_dict()
+    datacontract['servers']['production']['path'] = os.path.abspath(filename)
+
+    with tempfile.NamedTemporaryFile("w", suffix=".yaml", encoding="utf-8", delete=False) as yaml_file:
+        yaml.safe_dump(datacontract, yaml_file)
+    try:
+        # Ejecutar la validación con datacontract-cli
+        result = subprocess.run(['datacontract', 'test', yaml_file.name], capture_output=True, text=True, check=False)
+    finally:
+        os.remove(yaml_file.name)
     if result.returncode != 0:
         raise RuntimeError(f"Validation failed: {result.stderr}")
 
-    return True  # Retorna True si la validación fue exitosa
-
 
-def send_data_to_api(transformed_data: dict, target_url: str):
+async def send_data_to_api_async(transformed_data: dict, target_url: str):
     """
-    Envía los datos ya transformados a otra API.
+    Envía los datos ya transformados a otra API sin bloquear el event loop.
+
+    Usa el cliente compartido (delivery_client), con pool de conexiones, reintentos y circuit breaker.
 
     Args:
         transformed_data (dict): Los datos ya transformados.
@@ -48,7 +110,5 @@ def send_data_to_api(transformed_data: dict, target_url: str):
     Raises:
         HTTPException: Si la respuesta de la API no es satisfactoria.
     """
-    response = requests.post(target_url, json=transformed_data, timeout=10)
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail=response.text)
-    return response.json()
+    with stage_timer("deliver"):
+        return await get_delivery_client().post(target_url, transformed_data)
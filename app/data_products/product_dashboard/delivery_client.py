@@ -0,0 +1,203 @@
+"""
+Este módulo contiene el cliente asíncrono para enviar datos a la API de destino.
+
+El cliente reutiliza un pool de conexiones keep-alive, limita el número de envíos concurrentes,
+reintenta con espera exponencial y jitter los errores 5xx y los timeouts, y deja de enviar
+(circuit breaker) mientras la API de destino está fallando.
+"""
+
+import asyncio
+import os
+import random
+import time
+from typing import TYPE_CHECKING
+
+from fastapi import HTTPException
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker con estados cerrado, abierto y semiabierto.
+
+    Tras failure_threshold fallos seguidos el circuito se abre y se rechazan los envíos durante
+    reset_timeout segundos. Después se deja pasar un envío de prueba: si tiene éxito el circuito
+    se cierra y si falla se vuelve a abrir. Si la prueba termina sin resultado (se cancela o falla
+    con otro error) se libera con release_probe; si nadie la libera, pasados otros reset_timeout
+    segundos se da por perdida y se permite otra.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+
+    @property
+    def state(self) -> str:
+        """
+        Estado actual del circuito.
+        """
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """
+        Indica si se puede hacer un envío. En semiabierto solo se permite un envío de prueba a la vez.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and (
+            self._probe_started_at is None or self._clock() - self._probe_started_at >= self.reset_timeout
+        ):
+            self._probe_started_at = self._clock()
+            return True
+        return False
+
+    def release_probe(self):
+        """
+        Libera el envío de prueba en curso sin cambiar el estado (el envío no ha tenido resultado).
+        """
+        self._probe_started_at = None
+
+    def record_success(self):
+        """
+        Registra un envío correcto y cierra el circuito.
+        """
+        self._failures = 0
+        self._opened_at = None
+        self._probe_started_at = None
+
+    def record_failure(self):
+        """
+        Registra un envío fallido y abre el circuito si se alcanza el umbral.
+        """
+        self._failures += 1
+        self._probe_started_at = None
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            self._opened_at = self._clock()
+
+
+class DeliveryClient:
+    """
+    Cliente HTTP asíncrono con pool de conexiones, concurrencia limitada, reintentos y circuit breaker.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 10,
+        max_concurrency: int = 10,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.2,
+        backoff_max: float = 5.0,
+        breaker: CircuitBreaker = None,
+        transport: "httpx.AsyncBaseTransport" = None
+    ):
+        # httpx se importa al crear el cliente, la primera vez que se envían datos
+        import httpx
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+        self._transport_errors = (httpx.TimeoutException, httpx.TransportError)
+
+    async def post(self, url: str, payload) -> dict:
+        """
+        Envía el payload como JSON a la URL indicada.
+
+        Returns:
+            dict: La respuesta de la API de destino.
+
+        Raises:
+            HTTPException: Si la API responde con error, si se agotan los reintentos o si el circuito está abierto.
+        """
+        async with self._semaphore:
+            for attempt in range(self.max_retries + 1):
+                probe = self.breaker.state == CircuitBreaker.HALF_OPEN
+                if not self.breaker.allow_request():
+                    raise HTTPException(status_code=503, detail="Downstream API unavailable (circuit open)")
+                try:
+                    response = await self._client.post(url, json=payload)
+                except self._transport_errors as e:
+                    self.breaker.record_failure()
+                    if attempt == self.max_retries:
+                        raise HTTPException(status_code=504, detail=f"Downstream API error: {e!r}") from e
+                except BaseException:
+                    # Cancelación (p. ej. al parar el worker) u otro error: si era el envío de prueba, se libera
+                    if probe:
+                        self.breaker.release_probe()
+                    raise
+                else:
+                    if response.status_code < 500:
+                        self.breaker.record_success()
+                        if response.status_code != 200:
+                            raise HTTPException(status_code=response.status_code, detail=response.text)
+                        return response.json()
+                    self.breaker.record_failure()
+                    if attempt == self.max_retries:
+                        raise HTTPException(status_code=response.status_code, detail=response.text)
+                await asyncio.sleep(self.backoff_delay(attempt))
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        Espera antes del siguiente reintento: exponencial con jitter completo.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def aclose(self):
+        """
+        Cierra las conexiones del pool.
+        """
+        await self._client.aclose()
+
+
+_delivery_client = None
+
+
+def get_delivery_client() -> DeliveryClient:
+    """
+    Devuelve el cliente de envío compartido, creándolo con la configuración del entorno la primera vez.
+    """
+    global _delivery_client
+    if _delivery_client is None:
+        _delivery_client = DeliveryClient(
+            max_connections=int(os.getenv("DELIVERY_MAX_CONNECTIONS", "10")),
+            max_concurrency=int(os.getenv("DELIVERY_MAX_CONCURRENCY", "10")),
+            timeout=float(os.getenv("DELIVERY_TIMEOUT", "10")),
+            max_retries=int(os.getenv("DELIVERY_MAX_RETRIES", "3")),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("DELIVERY_BREAKER_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("DELIVERY_BREAKER_RESET", "30"))
+            )
+        )
+    return _delivery_client
+
+
+async def close_delivery_client():
+    """
+    Cierra el cliente de envío compartido, si existe.
+    """
+    global _delivery_client
+    if _delivery_client is not None:
+        await _delivery_client.aclose()
+        _delivery_client = None
@@ -0,0 +1,314 @@
+"""
+Este módulo implementa la cola de salida (outbox) de los datos validados.
+
+Los datos se guardan en una base de datos SQLite local antes de responder a la petición, y un
+conjunto de workers en segundo plano los envía a la API de destino por lotes, con reintentos y
+cola de mensajes fallidos (dead letter).
+"""
+
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DEAD = "dead"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    target_url TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_outbox_status_next_attempt ON outbox (status, next_attempt_at);
+"""
+
+
+class Outbox:
+    """
+    Cola persistente en SQLite. Los mensajes entregados se borran; los que agotan los reintentos
+    quedan con estado dead.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+
+    def enqueue(self, payload, target_url: str) -> int:
+        """
+        Añade un mensaje a la cola y devuelve su ID.
+        """
+        return self.enqueue_many([payload], target_url)[0]
+
+    def enqueue_many(self, payloads: list, target_url: str) -> list[int]:
+        """
+        Añade varios mensajes a la cola en una sola transacción y devuelve sus IDs.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            return [
+                self._connection.execute(
+                    "INSERT INTO outbox (target_url, payload, created_at, next_attempt_at) VALUES (?, ?, ?, ?)",
+                    (target_url, json.dumps(payload, ensure_ascii=False), now, now)
+                ).lastrowid
+                for payload in payloads
+            ]
+
+    def claim(self, limit: int, lease_seconds: float = 60.0) -> list[tuple[int, str, object, int]]:
+        """
+        Reserva hasta limit mensajes listos para enviar.
+
+        Los mensajes reservados cuya reserva caduca (por ejemplo, si el proceso se detuvo) vuelven a
+        estar disponibles.
+
+        Returns:
+            list[tuple]: ID, URL de destino, payload e intentos previos de cada mensaje.
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            rows = self._connection.execute(
+                "SELECT id, target_url, payload, attempts FROM outbox "
+                "WHERE status IN (?, ?) AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (PENDING, IN_FLIGHT, now, limit)
+            ).fetchall()
+            self._connection.executemany(
+                "UPDATE outbox SET status = ?, next_attempt_at = ? WHERE id = ?",
+                [(IN_FLIGHT, now + lease_seconds, row[0]) for row in rows]
+            )
+        return [(row[0], row[1], json.loads(row[2]), row[3]) for row in rows]
+
+    def renew(self, message_ids: list[int], lease_seconds: float = 60.0):
+        """
+        Amplía la reserva de los mensajes que se siguen enviando, para que no los reserve otro worker.
+        """
+        until = time.time() + lease_seconds
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.executemany(
+                "UPDATE outbox SET next_attempt_at = ? WHERE id = ? AND status = ?",
+                [(until, message_id, IN_FLIGHT) for message_id in message_ids]
+            )
+
+    def ack(self, message_ids: list[int]):
+        """
+        Elimina de la cola los mensajes entregados.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.executemany("DELETE FROM outbox WHERE id = ?", [(message_id,) for message_id in message_ids])
+
+    def fail(self, message_id: int, error: str, retry_at: float = None):
+        """
+        Registra un envío fallido. Si retry_at es None el mensaje pasa a la cola de fallidos.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "UPDATE outbox SET status = ?, attempts = attempts + 1, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                (PENDING if retry_at is not None else DEAD, retry_at or time.time(), error, message_id)
+            )
+
+    def dead_letters(self, limit: int = 100) -> list[dict]:
+        """
+        Devuelve los mensajes de la cola de fallidos.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, target_url, attempts, created_at, last_error FROM outbox WHERE status = ? ORDER BY id LIMIT ?",
+                (DEAD, limit)
+            ).fetchall()
+        return [
+            {"id": row[0], "target_url": row[1], "attempts": row[2], "created_at": row[3], "last_error": row[4]}
+            for row in rows
+        ]
+
+    def requeue_dead(self) -> int:
+        """
+        Vuelve a poner en cola los mensajes fallidos y devuelve cuántos se han recuperado.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "UPDATE outbox SET status = ?, attempts = 0, next_attempt_at = ? WHERE status = ?",
+                (PENDING, time.time(), DEAD)
+            )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        """
+        Devuelve la profundidad de la cola, los mensajes en envío, los fallidos y el retraso del más antiguo.
+        """
+        with self._lock:
+            counts = dict(self._connection.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            oldest = self._connection.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status IN (?, ?)", (PENDING, IN_FLIGHT)
+            ).fetchone()[0]
+        return {
+            "depth": counts.get(PENDING, 0) + counts.get(IN_FLIGHT, 0),
+            "in_flight": counts.get(IN_FLIGHT, 0),
+            "dead": counts.get(DEAD, 0),
+            "lag_seconds": round(time.time() - oldest, 3) if oldest is not None else 0.0
+        }
+
+    def close(self):
+        """
+        Cierra la conexión con la base de datos de la cola.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+class OutboxWorker:
+    """
+    Conjunto de tareas asyncio que vacían la cola y envían los mensajes con send.
+
+    Args:
+        outbox (Outbox): Cola de la que se leen los mensajes.
+        send: Corrutina send(payload, target_url) que envía un mensaje.
+        workers (int): Número de tareas de envío.
+        batch_size (int): Número máximo de mensajes que reserva cada tarea en cada lectura.
+        max_attempts (int): Intentos antes de pasar un mensaje a la cola de fallidos.
+        poll_interval (float): Espera en segundos cuando la cola está vacía.
+        lease_seconds (float): Duración de la reserva de los mensajes. Mientras se envían se renueva
+            cada tercio de este tiempo, así que un envío con muchos reintentos no deja caducar la
+            reserva y otro worker no vuelve a enviar los mismos mensajes.
+    """
+
+    def __init__(self, outbox: Outbox, send, workers: int = 2, batch_size: int = 50,
+                 max_attempts: int = 8, poll_interval: float = 1.0, backoff_base: float = 1.0, backoff_max: float = 300.0,
+                 lease_seconds: float = 60.0):
+        self.outbox = outbox
+        self.send = send
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lease_seconds = lease_seconds
+        self._tasks = []
+
+    def start(self):
+        """
+        Arranca las tareas de envío en el event loop actual.
+        """
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """
+        Detiene las tareas de envío. Los mensajes reservados y no enviados se reintentarán al caducar su reserva.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def drain_once(self) -> int:
+        """
+        Reserva un lote de mensajes y los envía. Devuelve el número de mensajes procesados.
+        """
+        messages = await asyncio.to_thread(self.outbox.claim, self.batch_size, self.lease_seconds)
+        if not messages:
+            return 0
+        heartbeat = asyncio.create_task(self._renew_lease([message[0] for message in messages]))
+        try:
+            results = await asyncio.gather(
+                *(self.send(payload, target_url) for _, target_url, payload, _ in messages),
+                return_exceptions=True
+            )
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+        delivered = []
+        for (message_id, _, _, attempts), result in zip(messages, results):
+            if not isinstance(result, Exception):
+                delivered.append(message_id)
+                continue
+            error = str(getattr(result, "detail", result)) or repr(result)
+            permanent = isinstance(result, HTTPException) and 400 <= result.status_code < 500 and result.status_code != 429
+            if permanent or attempts + 1 >= self.max_attempts:
+                await asyncio.to_thread(self.outbox.fail, message_id, error)
+            else:
+                await asyncio.to_thread(self.outbox.fail, message_id, error, time.time() + self.backoff_delay(attempts))
+        if delivered:
+            await asyncio.to_thread(self.outbox.ack, delivered)
+        return len(messages)
+
+    def backoff_delay(self, attempts: int) -> float:
+        """
+        Espera antes del siguiente intento de un mensaje: exponencial con jitter completo.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempts))
+
+    async def _renew_lease(self, message_ids: list[int]):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                await asyncio.to_thread(self.outbox.renew, message_ids, self.lease_seconds)
+            except sqlite3.Error:
+                logger.exception("Error al renovar la reserva de %d mensajes de la cola de salida", len(message_ids))
+
+    async def _run(self):
+        errors = 0
+        while True:
+            try:
+                processed = await self.drain_once()
+                errors = 0
+            except Exception:
+                # Cualquier error se registra y se reintenta con espera creciente: si terminara la tarea
+                # se dejarían de enviar datos sin ningún aviso (CancelledError no hereda de Exception)
+                errors += 1
+                logger.exception("Error al vaciar la cola de salida (%d seguidos)", errors)
+                await asyncio.sleep(min(self.backoff_max, self.poll_interval * 2 ** errors))
+                continue
+            if not processed:
+                await asyncio.sleep(self.poll_interval)
+
+
+_outbox = None
+
+
+def get_outbox() -> Outbox:
+    """
+    Devuelve la cola de salida compartida, creándola con la ruta de OUTBOX_PATH la primera vez.
+    """
+    global _outbox
+    if _outbox is None:
+        _outbox = Outbox(os.getenv("OUTBOX_PATH", "app/outbox/outbox.db"))
+    return _outbox
+
+
+def create_outbox_worker(send) -> OutboxWorker:
+    """
+    Crea el worker de la cola de salida compartida con la configuración del entorno.
+    """
+    return OutboxWorker(
+        get_outbox(),
+        send,
+        workers=int(os.getenv("OUTBOX_WORKERS", "2")),
+        batch_size=int(os.getenv("OUTBOX_BATCH_SIZE", "50")),
+        max_attempts=int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8")),
+        poll_interval=float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0")),
+        lease_seconds=float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+    )
@@ -0,0 +1,225 @@
+"""
+Este módulo implementa la ingesta en streaming de los datos de SAP, GMAO, CLEAR y BIM.
+
+El cuerpo de la petición es NDJSON con un registro por línea, que se lee y se transforma a medida
+que llega, sin cargar el cuerpo entero ni los datos de entrada de cada fuente en memoria:
+
+    {"source": "sap", "details": {"employee_costs": "25000€", "sap_plant": "Zona Franca"}}
+    {"source": "clear", "details": {"line_id": "L1", "input_material": "50 Toneladas"}}
+    {"source": "clear", "product": {"product_type": "Material A", "product_amount": "30"}}
+    {"source": "gmao", "details": {"gmao_location": "Zona Franca"}}
+    {"source": "gmao", "workline": {"workline_id": "L1", "electric_usage": "1200 kW", ...}}
+    {"source": "bim", "details": {"plant_location": "Zona Franca"}}
+    {"source": "bim", "workline": {"ID_Linea": "L1", "line_name": "..."}}
+
+Los registros "details" llevan los campos de cabecera de cada fuente (las listas de líneas o de
+productos pueden ir también dentro, para payloads pequeños) y solo puede haber uno por fuente. El
+orden de los registros es libre.
+
+Este formato no es el JSON de CombinedDataInput que recibe /process_data/: para leer ese documento
+de forma incremental haría falta un parser JSON en streaming (no hay ninguno entre las dependencias),
+así que los clientes con payloads grandes tienen que enviar un registro por línea.
+
+La memoria que se ahorra es la de la entrada: el resultado sigue siendo un único documento con una
+línea por cada línea de BIM, porque la validación contra el contrato, el archivo histórico y la cola
+de salida trabajan con el documento completo.
+"""
+
+import json
+import os
+
+from app.data_products.product_dashboard.transformers import (
+    build_combined,
+    transform_bim_line,
+    transform_clear_product,
+    transform_gmao_line,
+    transform_sap_data
+)
+
+# Longitud máxima de una línea NDJSON; evita que una sola línea enorme se cargue entera en memoria
+STREAM_MAX_LINE_BYTES = int(os.getenv("STREAM_MAX_LINE_BYTES", str(1024 * 1024)))
+
+SOURCES = ("sap", "gmao", "clear", "bim")
+
+
+class LineTooLongError(ValueError):
+    """
+    Error que se lanza cuando una línea del cuerpo supera STREAM_MAX_LINE_BYTES.
+    """
+
+
+async def iter_lines(chunks, max_line_bytes: int = None):
+    """
+    Divide en líneas los fragmentos de bytes de un cuerpo en streaming.
+
+    Args:
+        chunks: Iterable asíncrono de fragmentos de bytes (por ejemplo, request.stream()).
+        max_line_bytes (int, optional): Longitud máxima de una línea. Por defecto STREAM_MAX_LINE_BYTES.
+
+    Raises:
+        LineTooLongError: Si una línea supera la longitud máxima.
+    """
+    max_line_bytes = max_line_bytes or STREAM_MAX_LINE_BYTES
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if len(line) > max_line_bytes:
+                raise LineTooLongError(f"Line longer than {max_line_bytes} bytes")
+            yield line
+        if len(buffer) > max_line_bytes:
+            raise LineTooLongError(f"Line longer than {max_line_bytes} bytes")
+    if buffer:
+        yield buffer
+
+
+async def iter_records(chunks, max_line_bytes: int = None):
+    """
+    Lee los registros NDJSON de un cuerpo en streaming, ignorando las líneas vacías.
+
+    Raises:
+        ValueError: Si una línea no es un objeto JSON válido.
+    """
+    number = 0
+    async for line in iter_lines(chunks, max_line_bytes):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON: {e}") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number}: record must be a JSON object")
+        yield record
+
+
+class StreamingCombiner:
+    """
+    Transforma y combina los registros a medida que llegan.
+
+    Solo conserva los datos necesarios para el cruce: de GMAO el consumo y el tiempo de paro de la
+    primera línea de cada ID, de BIM el ID y el nombre de cada línea, y de CLEAR la entrada de
+    material y los productos ya transformados. El resultado es el mismo que el de transform_and_combine.
+    Un objeto solo se puede usar para un stream: result() consume el estado del cruce.
+    """
+
+    def __init__(self):
+        self.sap = None
+        self.planta = ""
+        self.clear_id = None
+        self.entrada_material = None
+        self.productos = []
+        self.gmao_index: dict[str, tuple[float, float]] = {}
+        self.bim_lines: list[tuple[str, str]] = []
+        self.details_seen: set[str] = set()
+
+    def add(self, record: dict):
+        """
+        Procesa un registro del stream.
+
+        Raises:
+            ValueError: Si la fuente o el tipo de registro no son válidos.
+        """
+        source = record.get("source")
+        if source not in SOURCES:
+            raise ValueError(f"Unknown source: {source!r}")
+        if "details" in record:
+            # Un segundo registro de cabecera sobrescribiría la del primero pero sumaría sus listas
+            if source in self.details_seen:
+                raise ValueError(f"Duplicate details record for source {source!r}")
+            self.details_seen.add(source)
+            getattr(self, f"_add_{source}_details")(record["details"])
+        elif source == "gmao" and "workline" in record:
+            self._add_gmao_line(record["workline"])
+        elif source == "bim" and "workline" in record:
+            self._add_bim_line(record["workline"])
+        elif source == "clear" and "product" in record:
+            self.productos.append(transform_clear_product(record["product"]))
+        else:
+            raise ValueError(f"Invalid record for source {source!r}")
+
+    def result(self) -> tuple[dict, dict]:
+        """
+        Devuelve los datos combinados y las líneas sin cruzar, como transform_and_combine.
+
+        Las líneas combinadas se construyen consumiendo las de BIM y el índice de GMAO, para no
+        tener a la vez en memoria el estado del cruce y el resultado.
+
+        Raises:
+            ValueError: Si no se ha recibido el registro de SAP o el de CLEAR.
+        """
+        if self.sap is None:
+            raise ValueError("Missing sap details record")
+        if self.clear_id is None:
+            raise ValueError("Missing clear details record")
+
+        bim_lines, self.bim_lines = self.bim_lines, []
+        bim_lines.reverse()
+        combined_lines = []
+        bim_ids = set()
+        unmatched_bim = []
+        while bim_lines:
+            line_id, nombre = bim_lines.pop()
+            bim_ids.add(line_id)
+            gmao_line = self.gmao_index.get(line_id)
+            in_clear = line_id == self.clear_id
+            if gmao_line is None or not in_clear:
+                unmatched_bim.append(line_id)
+            combined_lines.append({
+                "ID_Linea": line_id,
+                "nombre_linea_de_trabajo": nombre,
+                "consumo_electrico": gmao_line[0] if gmao_line else 0,
+                "tiempo_de_paro": gmao_line[1] if gmao_line else 0,
+                "entrada_material": self.entrada_material if in_clear else 0,
+                "producto_Salida": self.productos if in_clear else []
+            })
+
+        gmao_index, self.gmao_index = self.gmao_index, {}
+        unmatched = {
+            "bim": unmatched_bim,
+            "gmao": [line_id for line_id in gmao_index if line_id not in bim_ids],
+            "clear": [] if self.clear_id in bim_ids else [self.clear_id]
+        }
+        return build_combined(self.planta, combined_lines, self.sap["Gasto_trabajadores"]), unmatched
+
+    def _add_sap_details(self, details: dict):
+        self.sap = transform_sap_data(details)
+
+    def _add_gmao_details(self, details: dict):
+        for line in details.get("gmao_worklines", []):
+            self._add_gmao_line(line)
+
+    def _add_clear_details(self, details: dict):
+        self.clear_id = details.get("line_id", "")
+        self.entrada_material = float(details.get("input_material", "").split()[0])
+        for product in details.get("output_products", []):
+            self.productos.append(transform_clear_product(product))
+
+    def _add_bim_details(self, details: dict):
+        self.planta = details.get("plant_location", "")
+        for line in details.get("bim_worklines", []):
+            self._add_bim_line(line)
+
+    def _add_gmao_line(self, line: dict):
+        transformed = transform_gmao_line(line)
+        if transformed["ID_Linea"] not in self.gmao_index:
+            self.gmao_index[transformed["ID_Linea"]] = (transformed["consumo_electrico"], transformed["tiempo_de_paro"])
+
+    def _add_bim_line(self, line: dict):
+        transformed = transform_bim_line(line)
+        self.bim_lines.append((transformed["ID_Linea"], transformed["nombre_linea_de_trabajo"]))
+
+
+async def combine_stream(chunks, max_line_bytes: int = None) -> tuple[dict, dict]:
+    """
+    Lee un cuerpo NDJSON en streaming y lo transforma y combina registro a registro.
+
+    Returns:
+        tuple: Diccionario combinado y diccionario de líneas sin cruzar por fuente (ver transformers.join_lines).
+    """
+    combiner = StreamingCombiner()
+    async for record in iter_records(chunks, max_line_bytes):
+        combiner.add(record)
+    return combiner.result()
@@ -2,6 +2,7 @@
 Este módulo contiene funciones para transformar datos de diferentes fuentes al formato esperado.
 """
 
+from contextlib import nullcontext
 from datetime import datetime
 
 
@@ -20,17 +21,20 @@ def transform_gmao_data(data: dict) -> dict:
     """
     return {
         "Planta": data.get("gmao_location", ""),
-        "Lineas_de_trabajo": [
-            {
-                "ID_Linea": line.get("workline_id", ""),
-                "nombre_linea_de_trabajo": line.get("workline_title", ""),
-                "entrada_material": 0,
-                "producto_Salida": [],
-                "consumo_electrico": float(line.get("electric_usage", "").split()[0]),
-                "tiempo_de_paro": float(line.get("downtime_total", ""))
-            }
-            for line in data.get("gmao_worklines", [])
-        ]
+        "Lineas_de_trabajo": [transform_gmao_line(line) for line in data.get("gmao_worklines", [])]
+    }
+
+def transform_gmao_line(line: dict) -> dict:
+    """
+    Transforma una línea de trabajo de GMAO al formato esperado.
+    """
+    return {
+        "ID_Linea": line.get("workline_id", ""),
+        "nombre_linea_de_trabajo": line.get("workline_title", ""),
+        "entrada_material": 0,
+        "producto_Salida": [],
+        "consumo_electrico": float(line.get("electric_usage", "").split()[0]),
+        "tiempo_de_paro": float(line.get("downtime_total", ""))
     }
 
 def transform_clear_data(data: dict) -> dict:
@@ -44,13 +48,7 @@ def transform_clear_data(data: dict) -> dict:
                 "ID_Linea": data.get("line_id", ""),  # Asumimos que CLEAR también proporciona ID
                 "nombre_linea_de_trabajo": "",  # Nombre desde BIM
                 "entrada_material": float(data.get("input_material", "").split()[0]),
-                "producto_Salida": [
-                    {
-                        "tipo_material": product.get("product_type", ""),
-                        "cantidad": float(product.get("product_amount", ""))
-                    }
-                    for product in data.get("output_products", [])
-                ],
+                "producto_Salida": [transform_clear_product(product) for product in data.get("output_products", [])],
                 "consumo_electrico": 0,  # Desde GMAO
                 "tiempo_de_paro": 0  # Desde GMAO
             }
@@ -58,35 +56,119 @@ def transform_clear_data(data: dict) -> dict:
         "Gasto_trabajadores": 0  # Desde SAP
     }
 
+def transform_clear_product(product: dict) -> dict:
+    """
+    Transforma un producto de salida de CLEAR al formato esperado.
+    """
+    return {
+        "tipo_material": product.get("product_type", ""),
+        "cantidad": float(product.get("product_amount", ""))
+    }
+
 def transform_bim_data(data: dict) -> dict:
     """
     Transforma los datos de BIM al formato esperado.
     """
     return {
         "Planta": data.get("plant_location", ""),
-        "Lineas_de_trabajo": [
-            {
-                "ID_Linea": line["ID_Linea"],  # Identificador de línea proporcionado por BIM
-                "nombre_linea_de_trabajo": line["line_name"],  # Asumimos que BIM proporciona el nombre
-                "entrada_material": 0,  # Desde CLEAR
-                "producto_Salida": [],  # Desde CLEAR
-                "consumo_electrico": 0,  # Desde GMAO
-                "tiempo_de_paro": 0  # Desde GMAO
-            }
-            for line in data.get("bim_worklines", [])
-        ],
+        "Lineas_de_trabajo": [transform_bim_line(line) for line in data.get("bim_worklines", [])],
         "Gasto_trabajadores": 0  # Desde SAP
     }
 
+def transform_bim_line(line: dict) -> dict:
+    """
+    Transforma una línea de trabajo de BIM al formato esperado.
+    """
+    return {
+        "ID_Linea": line["ID_Linea"],  # Identificador de línea proporcionado por BIM
+        "nombre_linea_de_trabajo": line["line_name"],  # Asumimos que BIM proporciona el nombre
+        "entrada_material": 0,  # Desde CLEAR
+        "producto_Salida": [],  # Desde CLEAR
+        "consumo_electrico": 0,  # Desde GMAO
+        "tiempo_de_paro": 0  # Desde GMAO
+    }
+
+def index_lines(lines: list) -> dict:
+    """
+    Indexa las líneas de trabajo por ID_Linea. Si un ID se repite se conserva la primera línea.
+    """
+    index = {}
+    for line in lines:
+        index.setdefault(line["ID_Linea"], line)
+    return index
+
+def join_lines(bim_lines: list, gmao_lines: list, clear_lines: list) -> tuple[list, dict]:
+    """
+    Une las líneas de trabajo de BIM con las de GMAO y CLEAR por ID_Linea en tiempo lineal.
+
+    Returns:
+        tuple: Lista de líneas combinadas y diccionario con los ID_Linea sin cruzar de cada fuente:
+        "bim" (líneas de BIM sin datos de GMAO o de CLEAR), "gmao" y "clear" (líneas que no existen en BIM).
+    """
+    gmao_index = index_lines(gmao_lines)
+    clear_index = index_lines(clear_lines)
+
+    combined_lines = []
+    bim_ids = set()
+    unmatched_bim = []
+    for bim_line in bim_lines:
+        line_id = bim_line["ID_Linea"]
+        bim_ids.add(line_id)
+        gmao_line = gmao_index.get(line_id)
+        clear_line = clear_index.get(line_id)
+        if gmao_line is None or clear_line is None:
+            unmatched_bim.append(line_id)
+
+        # Combinar información de todas las fuentes
+        combined_lines.append({
+            "ID_Linea": line_id,
+            "nombre_linea_de_trabajo": bim_line["nombre_linea_de_trabajo"],
+            "consumo_electrico": gmao_line["consumo_electrico"] if gmao_line else 0,
+            "tiempo_de_paro": gmao_line["tiempo_de_paro"] if gmao_line else 0,
+            "entrada_material": clear_line["entrada_material"] if clear_line else 0,
+            "producto_Salida": clear_line["producto_Salida"] if clear_line else []
+        })
+
+    unmatched = {
+        "bim": unmatched_bim,
+        "gmao": [line_id for line_id in gmao_index if line_id not in bim_ids],
+        "clear": [line_id for line_id in clear_index if line_id not in bim_ids]
+    }
+    return combined_lines, unmatched
+
 def combine_data(sap_data, gmao_data, clear_data, bim_data):
     """
     Combina los datos transformados de SAP, GMAO, CLEAR y BIM en un único diccionario.
     """
+    combined, _ = combine_data_with_report(sap_data, gmao_data, clear_data, bim_data)
+    return combined
+
+def combine_data_with_report(sap_data, gmao_data, clear_data, bim_data) -> tuple[dict, dict]:
+    """
+    Combina los datos transformados y devuelve también las líneas de trabajo que no se han podido cruzar.
+
+    Returns:
+        tuple: Diccionario combinado y diccionario de líneas sin cruzar por fuente (ver join_lines).
+    """
+    # Fusiona las líneas de trabajo con datos de todas las fuentes
+    combined_lines, unmatched = join_lines(
+        bim_data["Lineas_de_trabajo"],
+        gmao_data["Lineas_de_trabajo"],
+        clear_data["Lineas_de_trabajo"]
+    )
+
+    combined = build_combined(bim_data["Planta"], combined_lines, sap_data["Gasto_trabajadores"])
+    return combined, unmatched
+
+def build_combined(planta: str, combined_lines: list, gasto_trabajadores: float) -> dict:
+    """
+    Construye el diccionario combinado con sus metadatos a partir de las líneas ya combinadas.
+    """
 
     # Obtener el timestamp actual en el formato deseado
     current_timestamp = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
 
-    combined = {
+    return {
         "metadata": {
             "timestamp": current_timestamp,
             "version": "1.0",
@@ -98,27 +180,24 @@ def combine_data(sap_data, gmao_data, clear_data, bim_data):
                 "periocidad_de_los_datos": ["dia", "semana", "mes", "año"]
             }
         },
-        "Planta": bim_data["Planta"],
-        "Lineas_de_trabajo": [],
-        "Gasto_trabajadores": sap_data["Gasto_trabajadores"]
+        "Planta": planta,
+        "Lineas_de_trabajo": combined_lines,
+        "Gasto_trabajadores": gasto_trabajadores
     }
 
-    # Fusiona las líneas de trabajo con datos de todas las fuentes
-    for bim_line in bim_data["Lineas_de_trabajo"]:
-        line_id = bim_line["ID_Linea"]
-        gmao_line = next((line for line in gmao_data["Lineas_de_trabajo"] if line["ID_Linea"] == line_id), None)
-        clear_line = next((line for line in clear_data["Lineas_de_trabajo"] if line["ID_Linea"] == line_id), None)
-
-        # Combinar información de todas las fuentes
-        combined_line = {
-            "ID_Linea": line_id,
-            "nombre_linea_de_trabajo": bim_line["nombre_linea_de_trabajo"],
-            "consumo_electrico": gmao_line["consumo_electrico"] if gmao_line else 0,
-            "tiempo_de_paro": gmao_line["tiempo_de_paro"] if gmao_line else 0,
-            "entrada_material": clear_line["entrada_material"] if clear_line else 0,
-            "producto_Salida": clear_line["producto_Salida"] if clear_line else []
-        }
+def transform_and_combine(sap: dict, gmao: dict, clear: dict, bim: dict, timer=None) -> tuple[dict, dict]:
+    """
+    Transforma los datos de cada fuente y los combina en una estructura única.
 
-        combined["Lineas_de_trabajo"].append(combined_line)
+    Args:
+        timer (optional): Función que recibe el nombre de una etapa ("transform" o "combine") y
+            devuelve un context manager que la mide (por ejemplo, metrics.stage_timer).
 
-    return combined
+    Returns:
+        tuple: Diccionario combinado y diccionario de líneas sin cruzar por fuente (ver join_lines).
+    """
+    timer = timer or (lambda _stage: nullcontext())
+    with timer("transform"):
+        sources = (transform_sap_data(sap), transform_gmao_data(gmao), transform_clear_data(clear), transform_bim_data(bim))
+    with timer("combine"):
+        return combine_data_with_report(*sources)
@@ -1,10 +1,56 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.data_products.product_dashboard import dashboard_router
-from app.routers import user_router, domain_router, role_router, policy_router, data_product_router
+from app.data_products.product_dashboard.archive import create_retention_task
+from app.data_products.product_dashboard.data_contract_service import send_data_to_api_async
+from app.data_products.product_dashboard.delivery_client import close_delivery_client
+from app.data_products.product_dashboard.outbox import create_outbox_worker
+from app.config.database import close_async_engines, close_engines, get_engine, init_engines
+from app.migrations.runner import check_schema_version
+from app.utils.metrics import MetricsMiddleware, instrument_engines
+from app.utils.security import close_hash_executor
+from app.routers import (
+    user_router,
+    domain_router,
+    role_router,
+    policy_router,
+    data_product_router,
+    production_metric_router,
+    database_router,
+    export_router,
+    metrics_router
+)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    """
+    Arranque y parada de la aplicación: registra las métricas de las consultas, crea los engines de la
+    base de datos, comprueba que el esquema está en la versión del código (si no, la aplicación no
+    arranca) y arranca los workers de la cola de salida y la retención del archivo histórico y, al
+    parar, los detiene y cierra las conexiones salientes, las de la base de datos y el pool de hash
+    de contraseñas.
+    """
+    instrument_engines()
+    init_engines()
+    check_schema_version(get_engine())
+    outbox_worker = create_outbox_worker(send_data_to_api_async)
+    outbox_worker.start()
+    retention_task = create_retention_task()
+    yield
+    if retention_task is not None:
+        retention_task.cancel()
+    await outbox_worker.stop()
+    await close_delivery_client()
+    await close_async_engines()
+    close_engines()
+    close_hash_executor()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # Configurar CORS
 app.add_middleware(
@@ -14,6 +60,8 @@ app.add_middleware(
     allow_methods=["*"],  # Permite todos los métodos HTTP.
     allow_headers=["*"],  # Permite todos los headers.
 )
+# Métricas de latencia y consultas de cada petición (ver app.utils.metrics)
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(dashboard_router.router, prefix="/api/v1", tags=["product_dashboard"])
 app.include_router(user_router.router, prefix="/api/v1", tags=["users"])
@@ -21,6 +69,10 @@ app.include_router(domain_router.router, prefix="/api/v1", tags=["domains"])
 app.include_router(role_router.router, prefix="/api/v1", tags=["roles"])
 app.include_router(policy_router.router, prefix="/api/v1", tags=["policies"])
 app.include_router(data_product_router.router, prefix="/api/v1", tags=["data_products"])
+app.include_router(production_metric_router.router, prefix="/api/v1", tags=["production_metrics"])
+app.include_router(database_router.router, prefix="/api/v1", tags=["database"])
+app.include_router(export_router.router, prefix="/api/v1", tags=["export"])
+app.include_router(metrics_router.router, tags=["metrics"])
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,54 @@
+"""
+Operaciones de esquema compartidas por las migraciones.
+
+Los índices se crean sin bloquear las escrituras de la tabla en MySQL (ALGORITHM=INPLACE,
+LOCK=NONE), de modo que las migraciones se pueden aplicar con la aplicación en marcha.
+"""
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+
+def find_duplicates(connection: Connection, table: str, column: str, limit: int = 10) -> list:
+    """
+    Devuelve hasta limit valores repetidos de una columna, que impedirían crear un índice único.
+    """
+    return list(connection.execute(text(
+        f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL GROUP BY {column} HAVING COUNT(*) > 1 LIMIT {limit}"
+    )).scalars())
+
+
+def get_indexes(connection: Connection) -> dict:
+    """
+    Devuelve los índices existentes de cada tabla: {tabla: {nombre: índice}}.
+    """
+    inspector = inspect(connection)
+    return {
+        table: {index["name"]: index for index in inspector.get_indexes(table)}
+        for table in inspector.get_table_names()
+    }
+
+
+def create_index_online(connection: Connection, table: str, name: str, columns: list[str], unique: bool = False):
+    """
+    Crea un índice sin bloquear las escrituras de la tabla cuando la base de datos lo permite.
+    """
+    if connection.dialect.name == "mysql":
+        connection.execute(text(
+            f"ALTER TABLE {table} ADD {'UNIQUE ' if unique else ''}INDEX {name} ({', '.join(columns)}), "
+            "ALGORITHM=INPLACE, LOCK=NONE"
+        ))
+    else:
+        connection.execute(text(
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table} ({', '.join(columns)})"
+        ))
+
+
+def drop_index(connection: Connection, table: str, name: str):
+    """
+    Elimina un índice de una tabla.
+    """
+    if connection.dialect.name == "mysql":
+        connection.execute(text(f"DROP INDEX {name} ON {table}"))
+    else:
+        connection.execute(text(f"DROP INDEX {name}"))
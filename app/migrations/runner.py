@@ -0,0 +1,180 @@
+"""
+Migraciones versionadas del esquema de la base de datos.
+
+Cada migración es un módulo de app/migrations con una función upgrade(connection) que devuelve los
+cambios aplicados; se registra en MIGRATIONS con su número de versión. La tabla schema_version
+guarda las versiones aplicadas. Al arrancar, migrate solo consulta la versión actual y, si coincide
+con la última, no inspecciona el esquema ni importa las migraciones.
+
+Las migraciones deben ser idempotentes (comprobar lo que ya existe antes de cambiarlo): en MySQL las
+sentencias DDL hacen commit implícito, así que una migración interrumpida puede haber aplicado parte
+de sus cambios sin registrar su versión.
+
+Uso:
+    python -m app.migrations.runner
+"""
+
+import importlib
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# Versión -> módulo de la migración, en orden de aplicación
+MIGRATIONS = {
+    1: "app.migrations.v0001_baseline",
+    2: "app.migrations.v0002_index_review"
+}
+
+LATEST_VERSION = max(MIGRATIONS)
+
+# Nombre del bloqueo que impide que varios procesos apliquen las migraciones a la vez
+LOCK_NAME = "schema_migrations"
+LOCK_TIMEOUT = int(os.getenv("MIGRATION_LOCK_TIMEOUT", "300"))
+
+# La tabla de versiones no forma parte de los modelos: no la crean ni la borran sus create_all/drop_all
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False)
+)
+
+
+def current_version(connection: Connection) -> int:
+    """
+    Devuelve la última versión aplicada, o 0 si la base de datos no tiene tabla de versiones.
+    """
+    if not inspect(connection).has_table(schema_version.name):
+        return 0
+    return connection.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def apply_migration(connection: Connection, version: int) -> list[str]:
+    """
+    Aplica una migración y registra su versión en la misma transacción.
+
+    Args:
+        connection (Connection): Conexión a la base de datos, dentro de una transacción.
+        version (int): Versión de la migración.
+
+    Returns:
+        list[str]: Cambios aplicados.
+    """
+    module = importlib.import_module(MIGRATIONS[version])
+    changes = module.upgrade(connection)
+    connection.execute(schema_version.insert().values(
+        version=version,
+        name=MIGRATIONS[version].rsplit(".", 1)[-1],
+        applied_at=datetime.now(timezone.utc).replace(tzinfo=None)
+    ))
+    return changes
+
+
+@contextmanager
+def migration_lock(engine: Engine):
+    """
+    Bloqueo entre procesos mientras se aplican las migraciones: GET_LOCK en MySQL, un bloqueo
+    consultivo en PostgreSQL y un bloqueo de archivo junto a la base de datos en SQLite (solo en
+    sistemas POSIX; en el resto, la clave primaria de schema_version hace fallar al segundo proceso).
+
+    Raises:
+        RuntimeError: Si no se obtiene el bloqueo en LOCK_TIMEOUT segundos.
+    """
+    dialect = engine.dialect.name
+    if dialect in ("mysql", "postgresql"):
+        with engine.connect() as connection:
+            if dialect == "mysql":
+                acquired = connection.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}).scalar()
+            else:
+                connection.execute(text(f"SET lock_timeout = '{LOCK_TIMEOUT}s'"))
+                connection.execute(text("SELECT pg_advisory_lock(hashtext(:name))"), {"name": LOCK_NAME})
+                acquired = 1
+            connection.commit()
+            if acquired != 1:
+                raise RuntimeError(f"Could not acquire the {LOCK_NAME} lock in {LOCK_TIMEOUT}s")
+            try:
+                yield
+            finally:
+                if dialect == "mysql":
+                    connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+                else:
+                    connection.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": LOCK_NAME})
+                connection.commit()
+    elif dialect == "sqlite" and engine.url.database not in (None, "", ":memory:") and os.name == "posix":
+        import fcntl
+
+        with open(f"{engine.url.database}.migrations.lock", "w", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        yield
+
+
+def check_schema_version(engine: Engine) -> int:
+    """
+    Comprueba al arrancar que el esquema está en la versión del código, con una sola consulta de
+    la versión y sin inspeccionar el esquema.
+
+    Raises:
+        RuntimeError: Si faltan migraciones o el esquema es más reciente que el código.
+    """
+    with engine.connect() as connection:
+        version = current_version(connection)
+    if version != LATEST_VERSION:
+        raise RuntimeError(
+            f"Database schema version {version} does not match {LATEST_VERSION}; "
+            "run python -m app.migrations.runner"
+        )
+    return version
+
+
+def migrate(engine: Engine, target: int = LATEST_VERSION) -> list[int]:
+    """
+    Aplica las migraciones pendientes hasta la versión target, cada una en su propia transacción.
+    Si hay migraciones pendientes se aplican con migration_lock, volviendo a leer la versión una
+    vez obtenido, para que varios procesos que arrancan a la vez no apliquen la misma migración.
+
+    Args:
+        engine (Engine): Engine de la base de datos.
+        target (int, optional): Versión final. Por defecto la última.
+
+    Returns:
+        list[int]: Versiones aplicadas (vacía si el esquema ya estaba al día).
+
+    Raises:
+        ValueError: Si target no es una versión conocida o la base de datos tiene una versión más
+            reciente que el código.
+    """
+    if target not in MIGRATIONS:
+        raise ValueError(f"Unknown schema version {target}")
+    with engine.connect() as connection:
+        version = current_version(connection)
+    if version == target:
+        return []
+
+    with migration_lock(engine):
+        with engine.begin() as connection:
+            schema_version.create(connection, checkfirst=True)
+            version = current_version(connection)
+        if version > target:
+            raise ValueError(f"Database schema version {version} is newer than {target}")
+        applied = []
+        for pending in sorted(number for number in MIGRATIONS if version < number <= target):
+            with engine.begin() as connection:
+                for change in apply_migration(connection, pending):
+                    print(f"Migración {pending}: {change}")
+            applied.append(pending)
+    return applied
+
+
+if __name__ == "__main__":
+    from app.config.database import get_engine
+
+    applied_versions = migrate(get_engine())
+    print(f"Esquema en la versión {LATEST_VERSION}" + (f" (aplicadas {applied_versions})" if applied_versions else ""))
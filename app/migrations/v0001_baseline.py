@@ -0,0 +1,126 @@
+"""
+Migración 1: esquema inicial.
+
+Las tablas se definen aquí tal como estaban al introducir las migraciones, sin usar los modelos:
+los cambios posteriores de los modelos se aplican con sus propias migraciones, así que esta
+migración crea siempre el mismo esquema. En una base de datos creada antes de las migraciones solo
+se crean las tablas que falten, y el índice de permisos efectivos se llena a partir de los roles
+existentes cuando se crea su tabla.
+"""
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    insert,
+    inspect,
+    select
+)
+from sqlalchemy.engine import Connection
+
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(60), index=True),
+    Column("email", String(250), unique=True, index=True, nullable=False),
+    Column("hashed_password", String(250), nullable=False),
+    Column("domain_id", Integer, ForeignKey("domains.id"))
+)
+
+roles = Table(
+    "roles", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(60), index=True),
+    Column("description", String(250), index=True)
+)
+
+policies = Table(
+    "policies", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(60), index=True),
+    Column("description", String(250), index=True)
+)
+
+domains = Table(
+    "domains", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(60), index=True),
+    Column("description", String(250), index=True)
+)
+
+data_products = Table(
+    "data_products", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("name", String(60))
+)
+
+user_roles = Table(
+    "user_roles", metadata,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("role_id", Integer, ForeignKey("roles.id"), primary_key=True)
+)
+
+domain_data_product = Table(
+    "domain_data_product", metadata,
+    Column("domain_id", Integer, ForeignKey("domains.id"), primary_key=True),
+    Column("data_product_id", Integer, ForeignKey("data_products.id"), primary_key=True)
+)
+
+role_policies = Table(
+    "role_policies", metadata,
+    Column("role_id", Integer, ForeignKey("roles.id"), primary_key=True),
+    Column("policy_id", Integer, ForeignKey("policies.id"), primary_key=True)
+)
+
+user_effective_policies = Table(
+    "user_effective_policies", metadata,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("policy_id", Integer, ForeignKey("policies.id"), primary_key=True),
+    Index("ix_user_effective_policies_policy_id", "policy_id")
+)
+
+production_metrics = Table(
+    "production_metrics", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("timestamp", DateTime, nullable=False),
+    Column("planta", String(60), nullable=False),
+    Column("id_linea", String(60), nullable=False),
+    Column("consumo_electrico", Float),
+    Column("tiempo_de_paro", Float),
+    Column("entrada_material", Float),
+    Column("producto_salida", Float),
+    Index("ix_production_metrics_planta_linea_timestamp", "planta", "id_linea", "timestamp"),
+    Index("ix_production_metrics_planta_timestamp", "planta", "timestamp")
+)
+
+
+def upgrade(connection: Connection) -> list[str]:
+    """
+    Crea las tablas que faltan.
+
+    Args:
+        connection (Connection): Conexión a la base de datos.
+
+    Returns:
+        list[str]: Cambios aplicados.
+    """
+    existing = set(inspect(connection).get_table_names())
+    missing = [table for table in metadata.sorted_tables if table.name not in existing]
+    metadata.create_all(bind=connection, tables=missing)
+    if user_effective_policies in missing:
+        # Una fila por cada política que un usuario obtiene a través de alguno de sus roles
+        connection.execute(insert(user_effective_policies).from_select(
+            ["user_id", "policy_id"],
+            select(user_roles.c.user_id, role_policies.c.policy_id)
+            .join(role_policies, role_policies.c.role_id == user_roles.c.role_id)
+            .distinct()
+        ))
+    return [f"created table {table.name}" for table in missing]
@@ -0,0 +1,76 @@
+"""
+Migración 2: revisión de índices.
+
+- Añade los índices en sentido inverso de las tablas intermedias (usuarios de un rol, roles de una
+  política, dominios de un producto de datos) y el de users.domain_id.
+- Hace únicos users.name y data_products.name, que los servicios ya tratan como únicos.
+- Elimina los índices que no usa ninguna consulta y que solo encarecen las escrituras: los de las
+  columnas description y los de las claves primarias id, que ya tienen su propio índice.
+
+La migración es idempotente: solo crea los índices que faltan y solo elimina los que existen.
+"""
+
+from sqlalchemy.engine import Connection
+
+from app.migrations.operations import create_index_online, drop_index, find_duplicates, get_indexes
+
+# Índices (tabla, nombre) que se eliminan
+DROPPED_INDEXES = [
+    ("users", "ix_users_id"),
+    ("roles", "ix_roles_id"),
+    ("roles", "ix_roles_description"),
+    ("policies", "ix_policies_id"),
+    ("policies", "ix_policies_description"),
+    ("domains", "ix_domains_id"),
+    ("domains", "ix_domains_description")
+]
+
+# Índices (tabla, nombre, columnas, único) que se crean
+CREATED_INDEXES = [
+    ("user_roles", "ix_user_roles_role_id", ["role_id"], False),
+    ("role_policies", "ix_role_policies_policy_id", ["policy_id"], False),
+    ("domain_data_product", "ix_domain_data_product_data_product_id", ["data_product_id"], False),
+    ("users", "ix_users_domain_id", ["domain_id"], False),
+    ("users", "ix_users_name", ["name"], True),
+    ("data_products", "ix_data_products_name", ["name"], True)
+]
+
+
+def upgrade(connection: Connection) -> list[str]:
+    """
+    Aplica la revisión de índices.
+
+    Args:
+        connection (Connection): Conexión a la base de datos.
+
+    Returns:
+        list[str]: Cambios aplicados.
+
+    Raises:
+        ValueError: Si hay valores repetidos en una columna que pasa a ser única.
+    """
+    existing = get_indexes(connection)
+    changes = []
+
+    for table, name, columns, unique in CREATED_INDEXES:
+        if table not in existing:
+            continue
+        current = existing[table].get(name)
+        if current is not None and bool(current["unique"]) == unique:
+            continue
+        if unique:
+            duplicates = find_duplicates(connection, table, columns[0])
+            if duplicates:
+                raise ValueError(f"{table}.{columns[0]} has duplicated values: {duplicates}")
+        if current is not None:
+            # El índice existe sin la restricción de unicidad: se sustituye
+            drop_index(connection, table, name)
+        create_index_online(connection, table, name, columns, unique)
+        changes.append(f"created {'unique ' if unique else ''}index {name} on {table}")
+
+    for table, name in DROPPED_INDEXES:
+        if name in existing.get(table, {}):
+            drop_index(connection, table, name)
+            changes.append(f"dropped index {name} on {table}")
+    return changes
+
@@ -1,20 +1,24 @@
-from sqlalchemy import Table, Column, Integer, ForeignKey
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index
 from .base import get_base
 
 # Tabla de asociación para la relación muchos-a-muchos entre User y Role
 user_role_association = Table('user_roles', get_base().metadata,
     Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
-    Column('role_id', Integer, ForeignKey('roles.id'), primary_key=True)
+    Column('role_id', Integer, ForeignKey('roles.id'), primary_key=True),
+    # La clave primaria (user_id, role_id) sirve para los roles de un usuario; este índice, para los usuarios de un rol
+    Index('ix_user_roles_role_id', 'role_id')
 )
 
 # Tabla de asociación entre los dominios y los dataProduct
 domain_data_product = Table('domain_data_product', get_base().metadata,
     Column('domain_id', Integer, ForeignKey('domains.id'), primary_key=True),
-    Column('data_product_id', Integer, ForeignKey('data_products.id'), primary_key=True)
+    Column('data_product_id', Integer, ForeignKey('data_products.id'), primary_key=True),
+    Index('ix_domain_data_product_data_product_id', 'data_product_id')
 )
 
 # Tabla de asociación para la relación muchos-a-muchos entre Role y Policy
 role_policy_association = Table('role_policies', get_base().metadata,
     Column('role_id', Integer, ForeignKey('roles.id'), primary_key=True),
-    Column('policy_id', Integer, ForeignKey('policies.id'), primary_key=True)
+    Column('policy_id', Integer, ForeignKey('policies.id'), primary_key=True),
+    Index('ix_role_policies_policy_id', 'policy_id')
 )
@@ -7,7 +7,7 @@ class DataProduct(get_base()):
     __tablename__ = 'data_products'
 
     id = Column(Integer, primary_key=True)
-    name = Column(String(60))
+    name = Column(String(60), unique=True, index=True)
     
 
     # Relación con Domain a través de la tabla intermedia
@@ -6,9 +6,9 @@ from .associations import domain_data_product
 class Domain(get_base()):
     __tablename__ = 'domains'
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(60), index=True)
-    description = Column(String(250), index=True)
+    description = Column(String(250))
 
     # Relación con User
     users = relationship("User", back_populates="domain")
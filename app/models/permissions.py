@@ -0,0 +1,10 @@
+from sqlalchemy import Table, Column, Integer, ForeignKey, Index
+from .base import get_base
+
+# Índice materializado de los permisos efectivos: una fila por cada política que un usuario
+# obtiene a través de alguno de sus roles (user_roles -> role_policies)
+user_effective_policy = Table('user_effective_policies', get_base().metadata,
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True),
+    Column('policy_id', Integer, ForeignKey('policies.id'), primary_key=True),
+    Index('ix_user_effective_policies_policy_id', 'policy_id')
+)
@@ -6,9 +6,9 @@ from .associations import role_policy_association
 class Policy(get_base()):
     __tablename__ = 'policies'
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(60), index=True)
-    description = Column(String(250), index=True)
+    description = Column(String(250))
 
     # Relación con Role
     roles = relationship("Role", secondary=role_policy_association, back_populates="policies")
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from .base import get_base
+
+class ProductionMetric(get_base()):
+    __tablename__ = 'production_metrics'
+
+    id = Column(Integer, primary_key=True)
+    timestamp = Column(DateTime, nullable=False)
+    planta = Column(String(60), nullable=False)
+    id_linea = Column(String(60), nullable=False)
+
+    # Una columna por métrica de la línea de trabajo
+    consumo_electrico = Column(Float)
+    tiempo_de_paro = Column(Float)
+    entrada_material = Column(Float)
+    producto_salida = Column(Float)  # Suma de las cantidades de producto_Salida
+
+    __table_args__ = (
+        Index('ix_production_metrics_planta_linea_timestamp', 'planta', 'id_linea', 'timestamp'),
+        Index('ix_production_metrics_planta_timestamp', 'planta', 'timestamp'),
+    )
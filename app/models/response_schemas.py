@@ -0,0 +1,78 @@
+"""
+Módulo que define los esquemas de respuesta de las entidades.
+
+Los esquemas se construyen directamente a partir de los objetos de SQLAlchemy (from_attributes)
+e incluyen solo las relaciones que se cargan con selectinload en los servicios, para que la
+serialización no lance consultas adicionales. Las contraseñas nunca forman parte de la respuesta.
+"""
+
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+class EntitySummary(BaseModel):
+    """
+    Clase que representa una entidad relacionada dentro de otra respuesta.
+
+    Atributos:
+    id: ID de la entidad.
+    name: Nombre de la entidad.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+
+class UserRead(BaseModel):
+    """
+    Clase que representa un usuario en las respuestas, con sus roles.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    email: str
+    domain_id: Optional[int] = None
+    roles: List[EntitySummary] = []
+
+class RoleRead(BaseModel):
+    """
+    Clase que representa un rol en las respuestas, con sus políticas.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    policies: List[EntitySummary] = []
+
+class PolicyRead(BaseModel):
+    """
+    Clase que representa una política en las respuestas.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+
+class DomainRead(BaseModel):
+    """
+    Clase que representa un dominio en las respuestas, con sus productos de datos.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    data_products: List[EntitySummary] = []
+
+class DataProductRead(BaseModel):
+    """
+    Clase que representa un producto de datos en las respuestas, con sus dominios.
+    """
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: Optional[str] = None
+    domains: List[EntitySummary] = []
@@ -6,9 +6,9 @@ from .associations import user_role_association, role_policy_association
 class Role(get_base()):
     __tablename__ = 'roles'
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     name = Column(String(60), index=True)
-    description = Column(String(250), index=True)
+    description = Column(String(250))
 
     # Relación con User, usando la tabla intermedia
     users = relationship("User", secondary=user_role_association, back_populates="roles")
@@ -6,11 +6,11 @@ from .associations import user_role_association
 class User(get_base()):
     __tablename__ = 'users'
 
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(60), index=True)
+    id = Column(Integer, primary_key=True)
+    name = Column(String(60), unique=True, index=True)
     email = Column(String(250), unique=True, index=True, nullable=False)
     hashed_password = Column(String(250), nullable=False)
-    domain_id = Column(Integer, ForeignKey('domains.id'))
+    domain_id = Column(Integer, ForeignKey('domains.id'), index=True)
 
     # Relación Domain
     domain = relationship("Domain", back_populates="users")
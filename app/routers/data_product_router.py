@@ -3,16 +3,27 @@ Router para la gestión de productos de datos.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import get_async_db, get_async_read_db, run_in_session
 from app.service.data_product_service import (
     create_data_product,
     get_data_product,
-    get_all_data_products,
+    list_data_products,
     update_data_product,
     delete_data_product,
-    delete_all_data_products
+    delete_all_data_products,
+    bulk_create_data_products,
+    bulk_update_data_products,
+    bulk_delete_data_products
 )
+from app.models.response_schemas import DataProductRead
+from app.service.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.request_body import read_json_items, validate_items, bulk_response
 
 router = APIRouter()
 
@@ -30,8 +41,47 @@ class DataProductUpdate(BaseModel):
     name: Optional[str] = None
     domain_ids: Optional[List[int]] = None
 
+class DataProductBulkUpdate(DataProductUpdate):
+    """
+    Esquema para la actualización de un producto de datos en una operación por lotes.
+    """
+    id: int
+
+@router.post("/data_products/bulk")
+async def create_data_products_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Crea varios productos de datos. El cuerpo es un array JSON de DataProductCreate o NDJSON (uno por línea).
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, items = validate_items(await read_json_items(request), DataProductCreate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_create_data_products, items))
+
+@router.put("/data_products/bulk")
+async def update_data_products_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Actualiza varios productos de datos. El cuerpo es un array JSON o NDJSON de elementos con el id y los campos a cambiar.
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, items = validate_items(await read_json_items(request), DataProductBulkUpdate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_update_data_products, items))
+
+@router.delete("/data_products/bulk")
+async def delete_data_products_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Elimina varios productos de datos. El cuerpo es un array JSON o NDJSON de IDs.
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, ids = validate_items(await read_json_items(request), int)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_delete_data_products, ids))
+
 @router.post("/data_products/")
-async def create_new_data_product(data_product: DataProductCreate):
+async def create_new_data_product(data_product: DataProductCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Crea un nuevo producto de datos.
 
@@ -41,11 +91,14 @@ async def create_new_data_product(data_product: DataProductCreate):
     Returns:
         dict: Mensaje de éxito y el producto de datos creado.
     """
-    new_data_product = create_data_product(data_product.name, data_product.domain_ids)
+    try:
+        new_data_product = await run_in_session(db, create_data_product, data_product.name, data_product.domain_ids, schema=DataProductRead)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     return {"message": "Data product created successfully", "data_product": new_data_product}
 
-@router.get("/data_products/{data_product_id}")
-async def read_data_product(data_product_id: int):
+@router.get("/data_products/{data_product_id}", response_model=DataProductRead)
+async def read_data_product(data_product_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Recupera un producto de datos por su ID.
 
@@ -55,24 +108,41 @@ async def read_data_product(data_product_id: int):
     Returns:
         DataProduct: El producto de datos correspondiente al ID proporcionado.
     """
-    data_product = get_data_product(data_product_id)
+    data_product = await run_in_session(db, get_data_product, data_product_id, schema=DataProductRead)
     if data_product is None:
         raise HTTPException(status_code=404, detail="Data product not found")
     return data_product
 
-@router.get("/data_products/")
-async def read_all_data_products():
+@router.get("/data_products/", response_model=List[DataProductRead])
+async def read_all_data_products(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    name: Optional[str] = None,
+    domain_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
-    Recupera todos los productos de datos.
+    Recupera una página de productos de datos, filtrada por nombre o dominio.
+    El cursor de la página siguiente se devuelve en la cabecera X-Next-Cursor.
 
     Returns:
-        list[DataProduct]: Lista de todos los productos de datos.
-    """
-    data_products = get_all_data_products()
+        list[DataProduct]: Elementos de la página (diccionarios con las columnas de fields si se indica).
+    """
+    try:
+        data_products, next_cursor = await run_in_session(db, list_data_products, cursor, limit, name, domain_id, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if fields:
+        # Con fields se devuelven diccionarios con solo las columnas pedidas, fuera del esquema de respuesta
+        return JSONResponse(jsonable_encoder(data_products), headers=headers)
+    response.headers.update(headers)
     return data_products
 
 @router.put("/data_products/{data_product_id}")
-async def update_existing_data_product(data_product_id: int, data_product: DataProductUpdate):
+async def update_existing_data_product(data_product_id: int, data_product: DataProductUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Actualiza un producto de datos existente.
 
@@ -83,13 +153,16 @@ async def update_existing_data_product(data_product_id: int, data_product: DataP
     Returns:
         dict: Mensaje de éxito y el producto de datos actualizado.
     """
-    updated_data_product = update_data_product(data_product_id, data_product.name, data_product.domain_ids)
+    try:
+        updated_data_product = await run_in_session(db, update_data_product, data_product_id, data_product.name, data_product.domain_ids, schema=DataProductRead)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     if updated_data_product is None:
         raise HTTPException(status_code=404, detail="Data product not found")
     return {"message": "Data product updated successfully", "data_product": updated_data_product}
 
 @router.delete("/data_products/{data_product_id}")
-async def delete_existing_data_product(data_product_id: int):
+async def delete_existing_data_product(data_product_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina un producto de datos por su ID.
 
@@ -99,18 +172,18 @@ async def delete_existing_data_product(data_product_id: int):
     Returns:
         dict: Mensaje de éxito.
     """
-    deleted_data_product = delete_data_product(data_product_id)
+    deleted_data_product = await run_in_session(db, delete_data_product, data_product_id)
     if deleted_data_product is None:
         raise HTTPException(status_code=404, detail="Data product not found")
     return {"message": "Data product deleted successfully"}
 
 @router.delete("/data_products/")
-async def delete_all_data_products_route():
+async def delete_all_data_products_route(db: AsyncSession = Depends(get_async_db)):
     """
     Elimina todos los productos de datos.
 
     Returns:
         dict: Mensaje de éxito y el número de productos de datos eliminados.
     """
-    num_rows_deleted = delete_all_data_products()
+    num_rows_deleted = await run_in_session(db, delete_all_data_products)
     return {"message": "All data products deleted successfully", "deleted_count": num_rows_deleted}
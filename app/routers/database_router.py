@@ -0,0 +1,16 @@
+"""
+Router para consultar el estado de la base de datos.
+"""
+
+from fastapi import APIRouter
+
+from app.config.database import get_pool_metrics
+
+router = APIRouter()
+
+@router.get("/database/pool")
+async def read_pool_metrics():
+    """
+    Devuelve el estado y las métricas de espera de los pools de conexiones (principal y réplica).
+    """
+    return get_pool_metrics()
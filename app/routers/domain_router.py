@@ -1,14 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+from app.config.database import get_async_db, get_async_read_db, run_in_session
 from app.service.domain_service import (
     create_domain,
     get_domain,
-    get_all_domains,
+    get_domain_data_product_ids,
+    list_domains,
     update_domain,
     delete_domain,
-    delete_all_domains
+    delete_all_domains,
+    bulk_create_domains,
+    bulk_update_domains,
+    bulk_delete_domains
 )
+from app.models.response_schemas import DomainRead
+from app.service.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.request_body import read_json_items, validate_items, bulk_response
 
 router = APIRouter()
 
@@ -20,38 +31,78 @@ class DomainUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
 
+class DomainBulkUpdate(DomainUpdate):
+    id: int
+
+@router.post("/domains/bulk")
+async def create_domains_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    results, indexes, items = validate_items(await read_json_items(request), DomainCreate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_create_domains, items))
+
+@router.put("/domains/bulk")
+async def update_domains_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    results, indexes, items = validate_items(await read_json_items(request), DomainBulkUpdate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_update_domains, items))
+
+@router.delete("/domains/bulk")
+async def delete_domains_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    results, indexes, ids = validate_items(await read_json_items(request), int)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_delete_domains, ids))
+
 @router.post("/domains/")
-async def create_new_domain(domain: DomainCreate):
-    new_domain = create_domain(domain.name, domain.description)
+async def create_new_domain(domain: DomainCreate, db: AsyncSession = Depends(get_async_db)):
+    new_domain = await run_in_session(db, create_domain, domain.name, domain.description, schema=DomainRead)
     return {"message": "Domain created successfully", "id": new_domain.id,"domain": new_domain}
 
-@router.get("/domains/{domain_id}")
-async def read_domain(domain_id: int):
-    domain = get_domain(domain_id)
+@router.get("/domains/{domain_id}", response_model=DomainRead)
+async def read_domain(domain_id: int, db: AsyncSession = Depends(get_async_db)):
+    domain = await run_in_session(db, get_domain, domain_id, schema=DomainRead)
     if domain is None:
         raise HTTPException(status_code=404, detail="Domain not found")
     return domain
 
-@router.get("/domains/")
-async def read_all_domains():
-    domains = get_all_domains()
+@router.get("/domains/{domain_id}/data_products")
+async def read_domain_data_products(domain_id: int, db: AsyncSession = Depends(get_async_db)):
+    data_product_ids = await run_in_session(db, get_domain_data_product_ids, domain_id)
+    if data_product_ids is None:
+        raise HTTPException(status_code=404, detail="Domain not found")
+    return {"domain_id": domain_id, "data_product_ids": data_product_ids}
+
+@router.get("/domains/", response_model=List[DomainRead])
+async def read_all_domains(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    name: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    try:
+        domains, next_cursor = await run_in_session(db, list_domains, cursor, limit, name, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if fields:
+        # Con fields se devuelven diccionarios con solo las columnas pedidas, fuera del esquema de respuesta
+        return JSONResponse(jsonable_encoder(domains), headers=headers)
+    response.headers.update(headers)
     return domains
 
 @router.put("/domains/{domain_id}")
-async def update_existing_domain(domain_id: int, domain: DomainUpdate):
-    updated_domain = update_domain(domain_id, domain.name, domain.description)
+async def update_existing_domain(domain_id: int, domain: DomainUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_domain = await run_in_session(db, update_domain, domain_id, domain.name, domain.description, schema=DomainRead)
     if updated_domain is None:
         raise HTTPException(status_code=404, detail="Domain not found")
     return {"message": "Domain updated successfully", "domain": updated_domain}
 
 @router.delete("/domains/{domain_id}")
-async def delete_existing_domain(domain_id: int):
-    deleted_domain = delete_domain(domain_id)
+async def delete_existing_domain(domain_id: int, db: AsyncSession = Depends(get_async_db)):
+    deleted_domain = await run_in_session(db, delete_domain, domain_id)
     if deleted_domain is None:
         raise HTTPException(status_code=404, detail="Domain not found")
     return {"message": "Domain deleted successfully"}
 
 @router.delete("/domains/")
-async def delete_all_domains_route():
-    num_rows_deleted = delete_all_domains()
+async def delete_all_domains_route(db: AsyncSession = Depends(get_async_db)):
+    num_rows_deleted = await run_in_session(db, delete_all_domains)
     return {"message": "All domains deleted successfully", "deleted_count": num_rows_deleted}
@@ -0,0 +1,38 @@
+"""
+Router para exportar las tablas de usuarios, roles, políticas, dominios, productos de datos y sus asociaciones.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.config.database import get_read_db
+from app.service.export_service import EXPORTS, FORMATS, iter_export
+
+router = APIRouter()
+
+@router.get("/export/{name}")
+async def export_table(
+    name: str,
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Exporta una tabla completa en NDJSON o CSV. El contenido se envía a medida que se lee de la
+    base de datos, sin cargar la tabla en memoria.
+
+    Args:
+        name (str): Nombre de la tabla (users, roles, policies, domains, data_products, user_roles,
+            role_policies o domain_data_product).
+        export_format (str): Formato de salida: ndjson (por defecto) o csv.
+
+    Returns:
+        StreamingResponse: Contenido de la tabla.
+    """
+    if name not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return StreamingResponse(
+        iter_export(db, name, export_format),
+        media_type=FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'}
+    )
@@ -0,0 +1,17 @@
+"""
+Router que expone las métricas de la aplicación para Prometheus.
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.utils.metrics import CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """
+    Devuelve las métricas de peticiones, base de datos y etapas del procesamiento en el formato de texto de Prometheus.
+    """
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
@@ -3,16 +3,27 @@ Router para la gestión de políticas.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import get_async_db, get_async_read_db, run_in_session
 from app.service.policy_service import (
     create_policy,
     get_policy,
-    get_all_policies,
+    list_policies,
     update_policy,
     delete_policy,
-    delete_all_policies
+    delete_all_policies,
+    bulk_create_policies,
+    bulk_update_policies,
+    bulk_delete_policies
 )
+from app.models.response_schemas import PolicyRead
+from app.service.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.request_body import read_json_items, validate_items, bulk_response
 
 router = APIRouter()
 
@@ -32,8 +43,47 @@ class PolicyUpdate(BaseModel):
     description: Optional[str] = None
     role_ids: Optional[List[int]] = None
 
+class PolicyBulkUpdate(PolicyUpdate):
+    """
+    Esquema para la actualización de una política en una operación por lotes.
+    """
+    id: int
+
+@router.post("/policies/bulk")
+async def create_policies_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Crea varias políticas. El cuerpo es un array JSON de PolicyCreate o NDJSON (uno por línea).
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, items = validate_items(await read_json_items(request), PolicyCreate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_create_policies, items))
+
+@router.put("/policies/bulk")
+async def update_policies_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Actualiza varias políticas. El cuerpo es un array JSON o NDJSON de elementos con el id y los campos a cambiar.
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, items = validate_items(await read_json_items(request), PolicyBulkUpdate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_update_policies, items))
+
+@router.delete("/policies/bulk")
+async def delete_policies_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Elimina varias políticas. El cuerpo es un array JSON o NDJSON de IDs.
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, ids = validate_items(await read_json_items(request), int)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_delete_policies, ids))
+
 @router.post("/policies/")
-async def create_new_policy(policy: PolicyCreate):
+async def create_new_policy(policy: PolicyCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Crea una nueva política.
 
@@ -43,11 +93,14 @@ async def create_new_policy(policy: PolicyCreate):
     Returns:
         dict: Mensaje de éxito y la política creada.
     """
-    new_policy = create_policy(policy.name, policy.description, policy.role_ids)
+    try:
+        new_policy = await run_in_session(db, create_policy, policy.name, policy.description, policy.role_ids, schema=PolicyRead)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     return {"message": "Policy created successfully", "policy": new_policy}
 
-@router.get("/policies/{policy_id}")
-async def read_policy(policy_id: int):
+@router.get("/policies/{policy_id}", response_model=PolicyRead)
+async def read_policy(policy_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Recupera una política por su ID.
 
@@ -57,24 +110,40 @@ async def read_policy(policy_id: int):
     Returns:
         Policy: La política correspondiente al ID proporcionado.
     """
-    policy = get_policy(policy_id)
+    policy = await run_in_session(db, get_policy, policy_id, schema=PolicyRead)
     if policy is None:
         raise HTTPException(status_code=404, detail="Policy not found")
     return policy
 
-@router.get("/policies/")
-async def read_all_policies():
+@router.get("/policies/", response_model=List[PolicyRead])
+async def read_all_policies(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    name: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
-    Recupera todas las políticas.
+    Recupera una página de políticas, filtrada por nombre.
+    El cursor de la página siguiente se devuelve en la cabecera X-Next-Cursor.
 
     Returns:
-        list[Policy]: Lista de todas las políticas.
-    """
-    policies = get_all_policies()
+        list[Policy]: Elementos de la página (diccionarios con las columnas de fields si se indica).
+    """
+    try:
+        policies, next_cursor = await run_in_session(db, list_policies, cursor, limit, name, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if fields:
+        # Con fields se devuelven diccionarios con solo las columnas pedidas, fuera del esquema de respuesta
+        return JSONResponse(jsonable_encoder(policies), headers=headers)
+    response.headers.update(headers)
     return policies
 
 @router.put("/policies/{policy_id}")
-async def update_existing_policy(policy_id: int, policy: PolicyUpdate):
+async def update_existing_policy(policy_id: int, policy: PolicyUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Actualiza una política existente.
 
@@ -85,13 +154,16 @@ async def update_existing_policy(policy_id: int, policy: PolicyUpdate):
     Returns:
         dict: Mensaje de éxito y la política actualizada.
     """
-    updated_policy = update_policy(policy_id, policy.name, policy.description, policy.role_ids)
+    try:
+        updated_policy = await run_in_session(db, update_policy, policy_id, policy.name, policy.description, policy.role_ids, schema=PolicyRead)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     if updated_policy is None:
         raise HTTPException(status_code=404, detail="Policy not found")
     return {"message": "Policy updated successfully", "policy": updated_policy}
 
 @router.delete("/policies/{policy_id}")
-async def delete_existing_policy(policy_id: int):
+async def delete_existing_policy(policy_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina una política por su ID.
 
@@ -101,18 +173,18 @@ async def delete_existing_policy(policy_id: int):
     Returns:
         dict: Mensaje de éxito.
     """
-    deleted_policy = delete_policy(policy_id)
+    deleted_policy = await run_in_session(db, delete_policy, policy_id)
     if deleted_policy is None:
         raise HTTPException(status_code=404, detail="Policy not found")
     return {"message": "Policy deleted successfully"}
 
 @router.delete("/policies/")
-async def delete_all_policies_route():
+async def delete_all_policies_route(db: AsyncSession = Depends(get_async_db)):
     """
     Elimina todas las políticas.
 
     Returns:
         dict: Mensaje de éxito y el número de políticas eliminadas.
     """
-    num_rows_deleted = delete_all_policies()
+    num_rows_deleted = await run_in_session(db, delete_all_policies)
     return {"message": "All policies deleted successfully", "deleted_count": num_rows_deleted}
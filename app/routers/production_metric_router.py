@@ -0,0 +1,51 @@
+"""
+Router para la consulta de las métricas de producción.
+"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import get_async_read_db, run_in_session
+from app.service.production_metric_service import get_metrics, aggregate_metrics
+
+router = APIRouter()
+
+@router.get("/production_metrics/")
+async def read_production_metrics(
+    planta: str,
+    id_linea: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: int = Query(1000, ge=1, le=100000),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Recupera las métricas de una planta (y opcionalmente de una línea) en un rango de fechas.
+
+    Returns:
+        list[dict]: Las métricas ordenadas por timestamp.
+    """
+    return await run_in_session(db, get_metrics, planta, id_linea, start, end, limit)
+
+@router.get("/production_metrics/aggregate")
+async def read_aggregated_production_metrics(
+    planta: str,
+    periodo: str = "dia",
+    id_linea: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Agrega las métricas de una planta por periodo (dia, semana, mes o año).
+
+    Returns:
+        list[dict]: Un elemento por periodo con la suma de cada métrica.
+    """
+    try:
+        return await run_in_session(db, aggregate_metrics, planta, periodo, id_linea, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
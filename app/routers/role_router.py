@@ -3,16 +3,27 @@ Router para la gestión de roles.
 """
 
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import get_async_db, get_async_read_db, run_in_session
 from app.service.role_service import (
     create_role,
     get_role,
-    get_all_roles,
+    list_roles,
     update_role,
     delete_role,
-    delete_all_roles
+    delete_all_roles,
+    bulk_create_roles,
+    bulk_update_roles,
+    bulk_delete_roles
 )
+from app.models.response_schemas import RoleRead
+from app.service.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.request_body import read_json_items, validate_items, bulk_response
 
 router = APIRouter()
 
@@ -34,8 +45,47 @@ class RoleUpdate(BaseModel):
     user_ids: Optional[List[int]] = None
     policy_ids: Optional[List[int]] = None
 
+class RoleBulkUpdate(RoleUpdate):
+    """
+    Esquema para la actualización de un rol en una operación por lotes.
+    """
+    id: int
+
+@router.post("/roles/bulk")
+async def create_roles_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Crea varios roles. El cuerpo es un array JSON de RoleCreate o NDJSON (uno por línea).
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, items = validate_items(await read_json_items(request), RoleCreate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_create_roles, items))
+
+@router.put("/roles/bulk")
+async def update_roles_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Actualiza varios roles. El cuerpo es un array JSON o NDJSON de elementos con el id y los campos a cambiar.
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, items = validate_items(await read_json_items(request), RoleBulkUpdate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_update_roles, items))
+
+@router.delete("/roles/bulk")
+async def delete_roles_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Elimina varios roles. El cuerpo es un array JSON o NDJSON de IDs.
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    results, indexes, ids = validate_items(await read_json_items(request), int)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_delete_roles, ids))
+
 @router.post("/roles/")
-async def create_new_role(role: RoleCreate):
+async def create_new_role(role: RoleCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Crea un nuevo rol.
 
@@ -46,13 +96,13 @@ async def create_new_role(role: RoleCreate):
         dict: Mensaje de éxito y el rol creado.
     """
     try:
-        new_role = create_role(role.name, role.description, role.user_ids, role.policy_ids)
+        new_role = await run_in_session(db, create_role, role.name, role.description, role.user_ids, role.policy_ids, schema=RoleRead)
         return {"message": "Role created successfully", "role": new_role}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
-@router.get("/roles/{role_id}")
-async def read_role(role_id: int):
+@router.get("/roles/{role_id}", response_model=RoleRead)
+async def read_role(role_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Recupera un rol por su ID.
 
@@ -62,24 +112,40 @@ async def read_role(role_id: int):
     Returns:
         Role: El rol correspondiente al ID proporcionado.
     """
-    role = get_role(role_id)
+    role = await run_in_session(db, get_role, role_id, schema=RoleRead)
     if role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     return role
 
-@router.get("/roles/")
-async def read_all_roles():
+@router.get("/roles/", response_model=List[RoleRead])
+async def read_all_roles(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    name: Optional[str] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
     """
-    Recupera todos los roles.
+    Recupera una página de roles, filtrada por nombre.
+    El cursor de la página siguiente se devuelve en la cabecera X-Next-Cursor.
 
     Returns:
-        list[Role]: Lista de todos los roles.
+        list[Role]: Elementos de la página (diccionarios con las columnas de fields si se indica).
     """
-    roles = get_all_roles()
+    try:
+        roles, next_cursor = await run_in_session(db, list_roles, cursor, limit, name, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if fields:
+        # Con fields se devuelven diccionarios con solo las columnas pedidas, fuera del esquema de respuesta
+        return JSONResponse(jsonable_encoder(roles), headers=headers)
+    response.headers.update(headers)
     return roles
 
 @router.put("/roles/{role_id}")
-async def update_existing_role(role_id: int, role: RoleUpdate):
+async def update_existing_role(role_id: int, role: RoleUpdate, db: AsyncSession = Depends(get_async_db)):
     """
     Actualiza un rol existente.
 
@@ -90,13 +156,16 @@ async def update_existing_role(role_id: int, role: RoleUpdate):
     Returns:
         dict: Mensaje de éxito y el rol actualizado.
     """
-    updated_role = update_role(role_id, role.name, role.description, role.user_ids, role.policy_ids)
+    try:
+        updated_role = await run_in_session(db, update_role, role_id, role.name, role.description, role.user_ids, role.policy_ids, schema=RoleRead)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     if updated_role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     return {"message": "Role updated successfully", "role": updated_role}
 
 @router.delete("/roles/{role_id}")
-async def delete_existing_role(role_id: int):
+async def delete_existing_role(role_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Elimina un rol por su ID.
 
@@ -106,18 +175,18 @@ async def delete_existing_role(role_id: int):
     Returns:
         dict: Mensaje de éxito.
     """
-    deleted_role = delete_role(role_id)
+    deleted_role = await run_in_session(db, delete_role, role_id)
     if deleted_role is None:
         raise HTTPException(status_code=404, detail="Role not found")
     return {"message": "Role deleted successfully"}
 
 @router.delete("/roles/")
-async def delete_all_roles_route():
+async def delete_all_roles_route(db: AsyncSession = Depends(get_async_db)):
     """
     Elimina todos los roles.
 
     Returns:
         dict: Mensaje de éxito y el número de roles eliminados.
     """
-    num_rows_deleted = delete_all_roles()
+    num_rows_deleted = await run_in_session(db, delete_all_roles)
     return {"message": "All roles deleted successfully", "deleted_count": num_rows_deleted}
@@ -1,15 +1,29 @@
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from pydantic import BaseModel, Field, EmailStr
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.database import get_async_db, get_async_read_db, run_in_session
 
 from app.service.user_service import (
+    hash_user_passwords,
     create_user,
     get_user,
-    get_all_users,
+    list_users,
     update_user,
     delete_user,
-    delete_all_users
+    delete_all_users,
+    bulk_create_users,
+    bulk_update_users,
+    bulk_delete_users
 )
+from app.models.response_schemas import UserRead
+from app.service.permission_service import get_user_policy_ids
+from app.service.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.utils.request_body import read_json_items, validate_items, bulk_response
+from app.utils.security import hash_password_async
 
 router = APIRouter()
 
@@ -27,41 +41,93 @@ class UserUpdate(BaseModel):
     domain_id: Optional[int]
     roles: Optional[List[int]] = None
 
+class UserBulkUpdate(BaseModel):
+    id: int
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    plain_password: Optional[str] = None
+    domain_id: Optional[int] = None
+    roles: Optional[List[int]] = None
+
+@router.post("/users/bulk")
+async def create_users_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    results, indexes, items = validate_items(await read_json_items(request), UserCreate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_create_users, await hash_user_passwords(items)))
+
+@router.put("/users/bulk")
+async def update_users_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    results, indexes, items = validate_items(await read_json_items(request), UserBulkUpdate)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_update_users, await hash_user_passwords(items)))
+
+@router.delete("/users/bulk")
+async def delete_users_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    results, indexes, ids = validate_items(await read_json_items(request), int)
+    return bulk_response(results, indexes, await run_in_session(db, bulk_delete_users, ids))
+
 @router.post("/users/")
-async def create_new_user(user: UserCreate):
+async def create_new_user(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    # El hash se calcula en el pool de hash para no bloquear el bucle de eventos
+    hashed_password = await hash_password_async(user.plain_password)
     try:
-        new_user = create_user(user.name, user.email, user.plain_password, user.domain_id, user.roles)
+        new_user = await run_in_session(db, create_user, user.name, user.email, None, user.domain_id, user.roles, hashed_password=hashed_password, schema=UserRead)
         return {"message": "User created successfully", "user": new_user}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-@router.get("/users/{user_id}")
-async def read_user(user_id: int):
-    user = get_user(user_id)
+@router.get("/users/{user_id}", response_model=UserRead)
+async def read_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    user = await run_in_session(db, get_user, user_id, schema=UserRead)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
-@router.get("/users/")
-async def read_all_users():
-    users = get_all_users()
+@router.get("/users/{user_id}/permissions")
+async def read_user_permissions(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    policy_ids = await run_in_session(db, get_user_policy_ids, user_id)
+    if policy_ids is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": user_id, "policy_ids": policy_ids}
+
+@router.get("/users/", response_model=List[UserRead])
+async def read_all_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    name: Optional[str] = None,
+    domain_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    try:
+        users, next_cursor = await run_in_session(db, list_users, cursor, limit, name, domain_id, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    if fields:
+        # Con fields se devuelven diccionarios con solo las columnas pedidas, fuera del esquema de respuesta
+        return JSONResponse(jsonable_encoder(users), headers=headers)
+    response.headers.update(headers)
     return users
 
 @router.put("/users/{user_id}")
-async def update_existing_user(user_id: int, user: UserUpdate):
-    updated_user = update_user(user_id, user.name, user.email, user.plain_password, user.domain_id, user.roles)
+async def update_existing_user(user_id: int, user: UserUpdate, db: AsyncSession = Depends(get_async_db)):
+    hashed_password = await hash_password_async(user.plain_password) if user.plain_password else None
+    try:
+        updated_user = await run_in_session(db, update_user, user_id, user.name, user.email, None, user.domain_id, user.roles, hashed_password=hashed_password, schema=UserRead)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
     if updated_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User updated successfully", "user": updated_user}
 
 @router.delete("/users/{user_id}")
-async def delete_existing_user(user_id: int):
-    deleted_user = delete_user(user_id)
+async def delete_existing_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    deleted_user = await run_in_session(db, delete_user, user_id)
     if deleted_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return {"message": "User deleted successfully"}
 
 @router.delete("/users/")
-async def delete_all_users_route():
-    num_rows_deleted = delete_all_users()
+async def delete_all_users_route(db: AsyncSession = Depends(get_async_db)):
+    num_rows_deleted = await run_in_session(db, delete_all_users)
     return {"message": "All users deleted successfully", "deleted_count": num_rows_deleted}
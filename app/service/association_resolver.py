@@ -0,0 +1,50 @@
+"""
+Servicio para resolver los IDs de las asociaciones (roles de un usuario, políticas de un rol...)
+con una sola consulta IN en lugar de una consulta por ID.
+"""
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+# Número máximo de IDs por consulta IN, para no superar el límite de parámetros de la base de datos
+MAX_IDS_PER_QUERY = 1000
+
+
+def load_by_ids(db: Session, model, ids: list[int]) -> tuple[list, list[int]]:
+    """
+    Carga los objetos de un modelo con los IDs indicados.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        model: Modelo de SQLAlchemy con columna id.
+        ids (list[int]): IDs a cargar. Los repetidos se cargan una sola vez.
+
+    Returns:
+        tuple: Objetos encontrados, en el orden de ids, e IDs que no existen.
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    found = {}
+    for start in range(0, len(unique_ids), MAX_IDS_PER_QUERY):
+        chunk = unique_ids[start:start + MAX_IDS_PER_QUERY]
+        found.update((obj.id, obj) for obj in db.scalars(select(model).where(model.id.in_(chunk))))
+    missing = [object_id for object_id in unique_ids if object_id not in found]
+    return [found[object_id] for object_id in unique_ids if object_id in found], missing
+
+
+def resolve_associations(db: Session, model, ids: list[int]) -> list:
+    """
+    Carga los objetos de una asociación.
+
+    Returns:
+        list: Objetos encontrados, en el orden de ids.
+
+    Raises:
+        ValueError: Si alguno de los IDs no existe (los routers responden 400, como el campo missing
+            de las operaciones por lotes).
+    """
+    if not ids:
+        return []
+    found, missing = load_by_ids(db, model, ids)
+    if missing:
+        raise ValueError(f"{model.__name__} ids not found: {missing}")
+    return found
@@ -0,0 +1,96 @@
+"""
+Caché de autorización: políticas efectivas de cada usuario y productos de datos visibles en cada dominio.
+
+Por defecto es una LRU en memoria de cada proceso; si se define AUTH_CACHE_PATH se usa una caché
+SQLite compartida por todos los workers. Las escrituras de los servicios marcan en la sesión las
+claves afectadas y se invalidan solo esas, después del commit. Una petición que leyó los datos
+anteriores al commit no puede volver a guardarlos: cached lee la generación de la clave antes de
+consultar la base de datos y set no guarda el valor si la invalidación la ha cambiado entretanto.
+
+    AUTH_CACHE_MAX_ENTRIES  Entradas máximas de la caché en memoria.
+    AUTH_CACHE_TTL          Segundos de vida de cada entrada.
+    AUTH_CACHE_PATH         Archivo SQLite de la caché compartida (opcional).
+"""
+
+import os
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.utils.cache import LRUCache, SQLiteCache
+
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+AUTH_CACHE_PATH = os.getenv("AUTH_CACHE_PATH")
+
+# Claves de Session.info con lo que hay que invalidar al hacer commit
+PENDING_KEY = "auth_cache_invalidate"
+CLEAR_KEY = "auth_cache_clear"
+
+
+def create_cache(path: str = None):
+    """
+    Crea la caché compartida en path o, si no se indica, la caché en memoria.
+    """
+    if path:
+        return SQLiteCache(path, AUTH_CACHE_TTL)
+    return LRUCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL)
+
+
+cache = create_cache(AUTH_CACHE_PATH)
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}:policies"
+
+
+def domain_key(domain_id: int) -> str:
+    return f"domain:{domain_id}:data_products"
+
+
+def cached(key: str, load):
+    """
+    Devuelve el valor de una clave de la caché o, si no está, lo calcula con load() y lo guarda.
+    Si load() devuelve None (la entidad no existe) o la clave se invalida mientras se calcula, no
+    se guarda nada.
+    """
+    value = cache.get(key)
+    if value is None:
+        generation = cache.generation(key)
+        value = load()
+        if value is not None:
+            cache.set(key, value, generation)
+    return value
+
+
+def invalidate_after_commit(db: Session, user_ids=(), domain_ids=()):
+    """
+    Marca las claves de los usuarios y dominios indicados para invalidarlas cuando se haga commit de la sesión.
+    """
+    pending = db.info.setdefault(PENDING_KEY, set())
+    pending.update(user_key(user_id) for user_id in user_ids)
+    pending.update(domain_key(domain_id) for domain_id in domain_ids)
+
+
+def invalidate_all_after_commit(db: Session):
+    """
+    Marca toda la caché para vaciarla cuando se haga commit (al eliminar todas las entidades de una tabla).
+    """
+    db.info[CLEAR_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_pending(session):
+    if session.info.pop(CLEAR_KEY, False):
+        session.info.pop(PENDING_KEY, None)
+        cache.clear()
+        return
+    pending = session.info.pop(PENDING_KEY, None)
+    if pending:
+        cache.delete_many(pending)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(PENDING_KEY, None)
+    session.info.pop(CLEAR_KEY, None)
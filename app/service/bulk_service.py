@@ -0,0 +1,236 @@
+"""
+Servicio genérico para crear, actualizar y eliminar entidades por lotes.
+
+Los elementos se procesan en bloques de BULK_CHUNK_SIZE, con una transacción por bloque: las filas
+se insertan con una sola sentencia executemany y las asociaciones muchos-a-muchos se escriben
+directamente en sus tablas intermedias. Si un bloque falla por una restricción de integridad, se
+repite fila a fila (con savepoints) para devolver el resultado de cada elemento. Los datos derivados
+de las entidades (Dependents) se recalculan dentro de la misma transacción que cada bloque.
+
+Como en las operaciones individuales, los elementos con IDs asociados que no existen no se escriben:
+su resultado es un error con los IDs que faltan (missing).
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Callable
+
+from sqlalchemy import Table, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.base import get_base
+from app.service.association_resolver import load_by_ids
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+
+@dataclass(frozen=True)
+class Association:
+    """
+    Asociación muchos-a-muchos que se puede asignar en una operación por lotes.
+
+    Atributos:
+    field: Clave de los elementos con la lista de IDs asociados (por ejemplo "roles" o "policy_ids").
+    table: Tabla intermedia.
+    own_column: Columna de la tabla intermedia con el ID de la entidad procesada.
+    other_column: Columna de la tabla intermedia con el ID asociado.
+    model: Modelo de los objetos asociados.
+    """
+    field: str
+    table: Table
+    own_column: str
+    other_column: str
+    model: type
+
+
+@dataclass(frozen=True)
+class Dependents:
+    """
+    Datos derivados de las entidades procesadas que se recalculan en la misma transacción que cada
+    bloque (por ejemplo el índice de permisos efectivos).
+
+    Atributos:
+    collect: Función (db, ids) que devuelve las claves de los datos que dependen de las entidades con esos IDs.
+    refresh: Función (db, keys) que recalcula los datos de esas claves.
+    """
+    collect: Callable
+    refresh: Callable
+
+
+def bulk_create(db: Session, model, items: list[dict], associations: tuple = (), chunk_size: int = None,
+                dependents: Dependents = None) -> list[dict]:
+    """
+    Crea entidades por lotes.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        model: Modelo de las entidades.
+        items (list[dict]): Columnas de cada entidad y, opcionalmente, las listas de IDs de sus asociaciones.
+        associations (tuple[Association]): Asociaciones que se pueden asignar.
+        chunk_size (int, optional): Elementos por transacción. Por defecto BULK_CHUNK_SIZE.
+        dependents (Dependents, optional): Datos derivados que se recalculan con cada bloque.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden: status ("created" o "error") e id
+        o, si hay IDs asociados que no existen, detail y missing.
+    """
+    return _run_chunks(db, items, chunk_size, lambda chunk: _create_chunk(db, model, chunk, associations, dependents))
+
+
+def bulk_update(db: Session, model, items: list[dict], associations: tuple = (), chunk_size: int = None,
+                dependents: Dependents = None) -> list[dict]:
+    """
+    Actualiza entidades por lotes. Cada elemento lleva el id y los campos a cambiar; los campos vacíos
+    no se modifican, como en las actualizaciones individuales, y las listas de IDs asociados
+    sustituyen a las anteriores.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden: status ("updated", "not_found" o
+        "error"), id y, si hay IDs asociados que no existen, detail y missing.
+    """
+    return _run_chunks(db, items, chunk_size, lambda chunk: _update_chunk(db, model, chunk, associations, dependents))
+
+
+def bulk_delete(db: Session, model, ids: list[int], chunk_size: int = None, dependents: Dependents = None) -> list[dict]:
+    """
+    Elimina entidades por lotes, junto con sus filas en las tablas intermedias. Las claves ajenas
+    de otras entidades que apuntan a ellas (por ejemplo users.domain_id) se ponen a NULL.
+
+    Returns:
+        list[dict]: Resultado de cada ID, en el mismo orden: status ("deleted", "not_found" o "error") e id.
+    """
+    return _run_chunks(db, ids, chunk_size, lambda chunk: _delete_chunk(db, model, chunk, dependents))
+
+
+def _run_chunks(db: Session, items: list, chunk_size: int, process) -> list[dict]:
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    results = []
+    for start in range(0, len(items), chunk_size):
+        chunk = items[start:start + chunk_size]
+        try:
+            chunk_results = process(chunk)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            chunk_results = []
+            for item in chunk:
+                try:
+                    with db.begin_nested():
+                        chunk_results.extend(process([item]))
+                except IntegrityError as e:
+                    chunk_results.append({"status": "error", "detail": str(e.orig)})
+            db.commit()
+        results.extend(chunk_results)
+    return results
+
+
+def _create_chunk(db: Session, model, chunk: list[dict], associations: tuple, dependents: Dependents) -> list[dict]:
+    fields = {association.field for association in associations}
+    results = _missing_results(db, chunk, associations)
+    valid = [item for item, result in zip(chunk, results) if result is None]
+    rows = [{key: value for key, value in item.items() if key not in fields} for item in valid]
+    if not rows:
+        ids = []
+    elif db.get_bind().dialect.insert_executemany_returning_sort_by_parameter_order:
+        ids = list(db.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows))
+    else:
+        # Sin RETURNING en inserciones múltiples (MySQL) el ORM obtiene el ID de cada fila
+        objects = [model(**row) for row in rows]
+        db.add_all(objects)
+        db.flush()
+        ids = [obj.id for obj in objects]
+
+    created = iter(ids)
+    results = [result or {"status": "created", "id": next(created)} for result in results]
+    _write_associations(db, ids, valid, associations)
+    if dependents and ids:
+        dependents.refresh(db, dependents.collect(db, ids))
+    return results
+
+
+def _update_chunk(db: Session, model, chunk: list[dict], associations: tuple, dependents: Dependents) -> list[dict]:
+    fields = {association.field for association in associations}
+    found = set(db.scalars(select(model.id).where(model.id.in_([item["id"] for item in chunk]))))
+    missing = _missing_results(db, chunk, associations)
+    results = [
+        {"status": "not_found", "id": item["id"]} if item["id"] not in found
+        else {**result, "id": item["id"]} if result is not None
+        else {"status": "updated", "id": item["id"]}
+        for item, result in zip(chunk, missing)
+    ]
+    replaced = [item for item, result in zip(chunk, results) if result["status"] == "updated"]
+    updated_ids = [item["id"] for item in replaced]
+    # Las claves afectadas se recogen antes y después del cambio, para incluir las asociaciones que se quitan
+    affected = dependents.collect(db, updated_ids) if dependents else set()
+    updates = [
+        {key: value for key, value in item.items() if key not in fields and (value or key == "id")}
+        for item in replaced
+    ]
+    updates = [row for row in updates if len(row) > 1]
+    if updates:
+        db.execute(update(model), updates)
+
+    for association in associations:
+        ids = [item["id"] for item in replaced if item.get(association.field) is not None]
+        if ids:
+            own_column = association.table.c[association.own_column]
+            db.execute(delete(association.table).where(own_column.in_(ids)))
+    _write_associations(db, updated_ids, replaced, associations)
+    if dependents:
+        dependents.refresh(db, affected | dependents.collect(db, updated_ids))
+    return results
+
+
+def _delete_chunk(db: Session, model, ids: list[int], dependents: Dependents) -> list[dict]:
+    found = set(db.scalars(select(model.id).where(model.id.in_(ids))))
+    affected = dependents.collect(db, list(found)) if dependents else set()
+    if found:
+        for table in get_base().metadata.sorted_tables:
+            for foreign_key in table.foreign_keys:
+                if foreign_key.column.table is not model.__table__:
+                    continue
+                column = foreign_key.parent
+                if column.primary_key:
+                    db.execute(delete(table).where(column.in_(found)))
+                else:
+                    db.execute(update(table).where(column.in_(found)).values({column.name: None}))
+        db.execute(delete(model).where(model.id.in_(found)))
+    if affected:
+        dependents.refresh(db, affected)
+    return [{"status": "deleted" if object_id in found else "not_found", "id": object_id} for object_id in ids]
+
+
+def _missing_results(db: Session, items: list[dict], associations: tuple) -> list:
+    """
+    Busca con una consulta por asociación los IDs asociados que no existen.
+
+    Returns:
+        list: Por cada elemento, None si todos sus IDs existen o su resultado de error con los que faltan.
+    """
+    results = [None] * len(items)
+    for association in associations:
+        requested = [item.get(association.field) or [] for item in items]
+        _, missing_ids = load_by_ids(db, association.model, [other_id for other_ids in requested for other_id in other_ids])
+        if not missing_ids:
+            continue
+        missing_ids = set(missing_ids)
+        for index, other_ids in enumerate(requested):
+            missing = [other_id for other_id in dict.fromkeys(other_ids) if other_id in missing_ids]
+            if missing:
+                result = results[index] = results[index] or {"status": "error", "detail": "", "missing": {}}
+                result["missing"][association.field] = missing
+                detail = f"{association.model.__name__} ids not found: {missing}"
+                result["detail"] = f"{result['detail']}; {detail}" if result["detail"] else detail
+    return results
+
+
+def _write_associations(db: Session, ids: list[int], items: list[dict], associations: tuple):
+    for association in associations:
+        links = [
+            {association.own_column: object_id, association.other_column: other_id}
+            for object_id, item in zip(ids, items)
+            for other_id in dict.fromkeys(item.get(association.field) or [])
+        ]
+        if links:
+            db.execute(insert(association.table), links)
@@ -2,17 +2,50 @@
 Servicio para la gestión de productos de datos.
 """
 
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.data_product import DataProduct
 from app.models.domain import Domain
-from app.config.database import SessionLocal
+from app.models.associations import domain_data_product
+from app.service.authorization_cache import invalidate_after_commit, invalidate_all_after_commit
+from app.service.bulk_service import Association, Dependents, bulk_create, bulk_update, bulk_delete
+from app.service.association_resolver import MAX_IDS_PER_QUERY, resolve_associations
+from app.service.pagination import DEFAULT_PAGE_SIZE, paginate
 
-def create_data_product(name: str, domain_ids: list[int] = None):
+def data_product_load_options() -> tuple:
+    """
+    Opciones de carga de las relaciones que se incluyen en las respuestas (una consulta por relación).
+    """
+    return (selectinload(DataProduct.domains),)
+
+def data_product_domains(db: Session, data_product_ids: list[int]) -> set[int]:
+    """
+    Devuelve los dominios en los que están los productos de datos indicados.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        data_product_ids (list[int]): IDs de los productos de datos.
+
+    Returns:
+        set[int]: IDs de los dominios.
+    """
+    db.flush()
+    domain_ids = set()
+    for start in range(0, len(data_product_ids), MAX_IDS_PER_QUERY):
+        chunk = data_product_ids[start:start + MAX_IDS_PER_QUERY]
+        domain_ids.update(db.scalars(
+            select(domain_data_product.c.domain_id).where(domain_data_product.c.data_product_id.in_(chunk)).distinct()
+        ))
+    return domain_ids
+
+def create_data_product(db: Session, name: str, domain_ids: list[int] = None):
     """
     Crea un nuevo producto de datos con los dominios proporcionados.
 
     Args:
+        db (Session): Sesión de la base de datos.
         name (str): Nombre del producto de datos.
         domain_ids (list[int], optional): Lista de IDs de dominios a asignar al producto de datos.
 
@@ -22,115 +55,182 @@ def create_data_product(name: str, domain_ids: list[int] = None):
     Raises:
         ValueError: Si el producto de datos ya existe.
     """
-    db = SessionLocal()
     try:
         new_data_product = DataProduct(name=name)
-        if domain_ids:
-            for domain_id in domain_ids:
-                domain = db.get(Domain, domain_id)
-                if domain:
-                    new_data_product.domains.append(domain)
+        new_data_product.domains = resolve_associations(db, Domain, domain_ids)
         db.add(new_data_product)
+        invalidate_after_commit(db, domain_ids=[domain.id for domain in new_data_product.domains])
         db.commit()
         db.refresh(new_data_product)
         return new_data_product
     except IntegrityError as exc:
         db.rollback()
         raise ValueError("Data product with this name already exists") from exc
-    finally:
-        db.close()
 
-def get_data_product(data_product_id: int):
+def get_data_product(db: Session, data_product_id: int):
     """
     Recupera un producto de datos por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         data_product_id (int): ID del producto de datos.
 
     Returns:
         DataProduct: El producto de datos correspondiente al ID proporcionado, o None si no se encuentra.
     """
-    db = SessionLocal()
-    data_product = db.query(DataProduct).filter(DataProduct.id == data_product_id).first()
-    db.close()
+    data_product = db.query(DataProduct).options(*data_product_load_options()).filter(DataProduct.id == data_product_id).first()
     return data_product
 
-def get_all_data_products():
+def get_all_data_products(db: Session):
     """
     Recupera todos los productos de datos.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         list[DataProduct]: Lista de todos los productos de datos.
     """
-    db = SessionLocal()
     data_products = db.query(DataProduct).all()
-    db.close()
     return data_products
 
-def update_data_product(data_product_id: int, name: str = None, domain_ids: list[int] = None):
+def list_data_products(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, name: str = None, domain_id: int = None, fields: str = None):
+    """
+    Recupera una página de productos de datos, ordenados por ID (ver pagination.paginate).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        cursor (str, optional): Cursor de la página siguiente devuelto con la página anterior.
+        limit (int): Número máximo de elementos de la página.
+        name (str, optional): Nombre exacto del producto de datos.
+        domain_id (int, optional): ID de un dominio al que pertenecen los productos de datos.
+        fields (str, optional): Columnas a devolver, separadas por comas.
+
+    Returns:
+        tuple: Elementos de la página y cursor de la página siguiente (None si es la última).
+
+    Raises:
+        ValueError: Si el cursor o los campos no son válidos.
+    """
+    conditions = []
+    if name is not None:
+        conditions.append(DataProduct.name == name)
+    if domain_id is not None:
+        conditions.append(DataProduct.domains.any(Domain.id == domain_id))
+    return paginate(db, DataProduct, cursor, limit, tuple(conditions), fields, options=data_product_load_options())
+
+def update_data_product(db: Session, data_product_id: int, name: str = None, domain_ids: list[int] = None):
     """
     Actualiza un producto de datos existente.
 
     Args:
+        db (Session): Sesión de la base de datos.
         data_product_id (int): ID del producto de datos.
         name (str, optional): Nuevo nombre del producto de datos.
         domain_ids (list[int], optional): Nueva lista de IDs de dominios a asignar al producto de datos.
 
     Returns:
         DataProduct: El producto de datos actualizado, o None si no se encuentra.
+
+    Raises:
+        ValueError: Si ya existe otro producto de datos con ese nombre.
     """
-    db = SessionLocal()
     data_product = db.query(DataProduct).filter(DataProduct.id == data_product_id).first()
     if not data_product:
-        db.close()
         return None
-    if name:
-        data_product.name = name
-    if domain_ids is not None:
-        data_product.domains = []
-        for domain_id in domain_ids:
-            domain = db.get(Domain, domain_id)
-            if domain:
-                data_product.domains.append(domain)
-    db.commit()
-    db.refresh(data_product)
-    db.close()
-    return data_product
+    try:
+        if name:
+            data_product.name = name
+        if domain_ids is not None:
+            # Se invalidan los dominios de antes y de después del cambio
+            previous = data_product_domains(db, [data_product_id])
+            data_product.domains = resolve_associations(db, Domain, domain_ids)
+            invalidate_after_commit(db, domain_ids=previous | data_product_domains(db, [data_product_id]))
+        db.commit()
+        db.refresh(data_product)
+        return data_product
+    except IntegrityError as exc:
+        db.rollback()
+        raise ValueError("Data product with this name already exists") from exc
 
-def delete_data_product(data_product_id: int):
+def delete_data_product(db: Session, data_product_id: int):
     """
     Elimina un producto de datos por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         data_product_id (int): ID del producto de datos a eliminar.
 
     Returns:
         DataProduct: El producto de datos eliminado, o None si no se encuentra.
     """
-    db = SessionLocal()
     data_product = db.query(DataProduct).filter(DataProduct.id == data_product_id).first()
     if not data_product:
-        db.close()
         return None
+    invalidate_after_commit(db, domain_ids=data_product_domains(db, [data_product_id]))
     db.delete(data_product)
     db.commit()
-    db.close()
     return data_product
 
-def delete_all_data_products():
+def delete_all_data_products(db: Session):
     """
     Elimina todos los productos de datos.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         int: El número de filas eliminadas.
     """
-    db = SessionLocal()
     try:
         num_rows_deleted = db.query(DataProduct).delete()
+        invalidate_all_after_commit(db)
         db.commit()
         return num_rows_deleted
     except Exception as e:
         db.rollback()
         raise e
-    finally:
-        db.close()
+
+DATA_PRODUCT_DOMAINS = Association("domain_ids", domain_data_product, "data_product_id", "domain_id", Domain)
+
+# Los dominios de los productos procesados por lotes se invalidan en la caché de autorización
+DATA_PRODUCT_CACHE = Dependents(data_product_domains, lambda db, domain_ids: invalidate_after_commit(db, domain_ids=domain_ids))
+
+def bulk_create_data_products(db: Session, data_products: list[dict]) -> list[dict]:
+    """
+    Crea varios productos de datos por lotes (ver bulk_service.bulk_create).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        data_products (list[dict]): Productos de datos con los campos de create_data_product.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden.
+    """
+    return bulk_create(db, DataProduct, data_products, (DATA_PRODUCT_DOMAINS,), dependents=DATA_PRODUCT_CACHE)
+
+def bulk_update_data_products(db: Session, data_products: list[dict]) -> list[dict]:
+    """
+    Actualiza varios productos de datos por lotes (ver bulk_service.bulk_update).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        data_products (list[dict]): Productos de datos con su id y los campos de update_data_product.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden.
+    """
+    return bulk_update(db, DataProduct, data_products, (DATA_PRODUCT_DOMAINS,), dependents=DATA_PRODUCT_CACHE)
+
+def bulk_delete_data_products(db: Session, data_product_ids: list[int]) -> list[dict]:
+    """
+    Elimina varios productos de datos por lotes (ver bulk_service.bulk_delete).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        data_product_ids (list[int]): IDs de los productos de datos a eliminar.
+
+    Returns:
+        list[dict]: Resultado de cada ID, en el mismo orden.
+    """
+    return bulk_delete(db, DataProduct, data_product_ids, dependents=DATA_PRODUCT_CACHE)
@@ -1,17 +1,31 @@
 """
 Servicio para la gestión de dominios.
 """
-from app.config.database import SessionLocal
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.domain import Domain
 from app.models.user import User
 from app.models.data_product import DataProduct
+from app.models.associations import domain_data_product
+from app.service.authorization_cache import cached, domain_key, invalidate_after_commit, invalidate_all_after_commit
+from app.service.bulk_service import Dependents, bulk_create, bulk_update, bulk_delete
+from app.service.association_resolver import resolve_associations
+from app.service.pagination import DEFAULT_PAGE_SIZE, paginate
+
+def domain_load_options() -> tuple:
+    """
+    Opciones de carga de las relaciones que se incluyen en las respuestas (una consulta por relación).
+    """
+    return (selectinload(Domain.data_products),)
 
-def create_domain(name: str, description: str, user_ids: list[int] = None, data_product_ids: list[int] = None):
+def create_domain(db: Session, name: str, description: str, user_ids: list[int] = None, data_product_ids: list[int] = None):
     """
     Crea un nuevo dominio con los usuarios y productos de datos proporcionados.
 
     Args:
+        db (Session): Sesión de la base de datos.
         name (str): Nombre del dominio.
         description (str): Descripción del dominio.
         user_ids (list[int], optional): Lista de IDs de usuarios a asignar al dominio.
@@ -20,61 +34,100 @@ def create_domain(name: str, description: str, user_ids: list[int] = None, data_
     Returns:
         Domain: El dominio creado.
     """
-    db = SessionLocal()
     try:
         new_domain = Domain(name=name, description=description)
-        if user_ids:
-            for user_id in user_ids:
-                user = db.query(User).get(user_id)
-                if user:
-                    new_domain.users.append(user)
-        if data_product_ids:
-            for data_product_id in data_product_ids:
-                data_product = db.query(DataProduct).get(data_product_id)
-                if data_product:
-                    new_domain.data_products.append(data_product)
+        new_domain.users = resolve_associations(db, User, user_ids)
+        new_domain.data_products = resolve_associations(db, DataProduct, data_product_ids)
         db.add(new_domain)
+        db.flush()
+        invalidate_after_commit(db, domain_ids=[new_domain.id])
         db.commit()
         db.refresh(new_domain)
         return new_domain
     except Exception as e:
         db.rollback()
         raise e
-    finally:
-        db.close()
 
-def get_domain(domain_id: int):
+def get_domain(db: Session, domain_id: int):
     """
     Recupera un dominio por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         domain_id (int): ID del dominio.
 
     Returns:
         Domain: El dominio correspondiente al ID proporcionado, o None si no se encuentra.
     """
-    db = SessionLocal()
-    domain = db.query(Domain).filter(Domain.id == domain_id).first()
-    db.close()
+    domain = db.query(Domain).options(*domain_load_options()).filter(Domain.id == domain_id).first()
     return domain
 
-def get_all_domains():
+def get_domain_data_product_ids(db: Session, domain_id: int) -> list[int]:
+    """
+    Recupera los IDs de los productos de datos visibles en un dominio, de la caché de autorización
+    o de la base de datos.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        domain_id (int): ID del dominio.
+
+    Returns:
+        list[int]: IDs de los productos de datos, ordenados, o None si el dominio no existe.
+    """
+    def load():
+        rows = db.execute(
+            select(Domain.id, domain_data_product.c.data_product_id)
+            .outerjoin(domain_data_product, domain_data_product.c.domain_id == Domain.id)
+            .where(Domain.id == domain_id)
+            .order_by(domain_data_product.c.data_product_id)
+        ).all()
+        if not rows:
+            return None
+        return [data_product_id for _, data_product_id in rows if data_product_id is not None]
+
+    return cached(domain_key(domain_id), load)
+
+def get_all_domains(db: Session):
     """
     Recupera todos los dominios.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         list[Domain]: Lista de todos los dominios.
     """
-    db = SessionLocal()
     domains = db.query(Domain).all()
-    db.close()
     return domains
 
-def update_domain(domain_id: int, name: str = None, description: str = None, user_ids: list[int] = None, data_product_ids: list[int] = None):
+def list_domains(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, name: str = None, fields: str = None):
+    """
+    Recupera una página de dominios, ordenados por ID (ver pagination.paginate).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        cursor (str, optional): Cursor de la página siguiente devuelto con la página anterior.
+        limit (int): Número máximo de elementos de la página.
+        name (str, optional): Nombre exacto del dominio.
+        fields (str, optional): Columnas a devolver, separadas por comas.
+
+    Returns:
+        tuple: Elementos de la página y cursor de la página siguiente (None si es la última).
+
+    Raises:
+        ValueError: Si el cursor o los campos no son válidos.
+    """
+    conditions = []
+    if name is not None:
+        conditions.append(Domain.name == name)
+    return paginate(db, Domain, cursor, limit, tuple(conditions), fields, options=domain_load_options())
+
+def update_domain(db: Session, domain_id: int, name: str = None, description: str = None, user_ids: list[int] = None, data_product_ids: list[int] = None):
     """
     Actualiza un dominio existente.
 
     Args:
+        db (Session): Sesión de la base de datos.
         domain_id (int): ID del dominio.
         name (str, optional): Nuevo nombre del dominio.
         description (str, optional): Nueva descripción del dominio.
@@ -84,66 +137,99 @@ def update_domain(domain_id: int, name: str = None, description: str = None, use
     Returns:
         Domain: El dominio actualizado, o None si no se encuentra.
     """
-    db = SessionLocal()
     domain = db.query(Domain).filter(Domain.id == domain_id).first()
     if not domain:
-        db.close()
         return None
     if name:
         domain.name = name
     if description:
         domain.description = description
     if user_ids is not None:
-        domain.users = []
-        for user_id in user_ids:
-            user = db.query(User).get(user_id)
-            if user:
-                domain.users.append(user)
+        domain.users = resolve_associations(db, User, user_ids)
     if data_product_ids is not None:
-        domain.data_products = []
-        for data_product_id in data_product_ids:
-            data_product = db.query(DataProduct).get(data_product_id)
-            if data_product:
-                domain.data_products.append(data_product)
+        domain.data_products = resolve_associations(db, DataProduct, data_product_ids)
+        invalidate_after_commit(db, domain_ids=[domain_id])
     db.commit()
     db.refresh(domain)
-    db.close()
     return domain
 
-def delete_domain(domain_id: int):
+def delete_domain(db: Session, domain_id: int):
     """
     Elimina un dominio por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         domain_id (int): ID del dominio a eliminar.
 
     Returns:
         Domain: El dominio eliminado, o None si no se encuentra.
     """
-    db = SessionLocal()
     domain = db.query(Domain).filter(Domain.id == domain_id).first()
     if not domain:
-        db.close()
         return None
     db.delete(domain)
+    invalidate_after_commit(db, domain_ids=[domain_id])
     db.commit()
-    db.close()
     return domain
 
-def delete_all_domains():
+def delete_all_domains(db: Session):
     """
     Elimina todos los dominios.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         int: El número de filas eliminadas.
     """
-    db = SessionLocal()
     try:
         num_rows_deleted = db.query(Domain).delete()
+        invalidate_all_after_commit(db)
         db.commit()
         return num_rows_deleted
     except Exception as e:
         db.rollback()
         raise e
-    finally:
-        db.close()
+
+# Los dominios eliminados por lotes se invalidan en la caché de autorización (crear o actualizar
+# dominios por lotes no cambia sus productos de datos)
+DOMAIN_CACHE = Dependents(lambda db, ids: set(ids), lambda db, domain_ids: invalidate_after_commit(db, domain_ids=domain_ids))
+
+def bulk_create_domains(db: Session, domains: list[dict]) -> list[dict]:
+    """
+    Crea varios dominios por lotes (ver bulk_service.bulk_create).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        domains (list[dict]): Dominios con los campos de create_domain.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden.
+    """
+    return bulk_create(db, Domain, domains, ())
+
+def bulk_update_domains(db: Session, domains: list[dict]) -> list[dict]:
+    """
+    Actualiza varios dominios por lotes (ver bulk_service.bulk_update).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        domains (list[dict]): Dominios con su id y los campos de update_domain.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden.
+    """
+    return bulk_update(db, Domain, domains, ())
+
+def bulk_delete_domains(db: Session, domain_ids: list[int]) -> list[dict]:
+    """
+    Elimina varios dominios por lotes (ver bulk_service.bulk_delete).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        domain_ids (list[int]): IDs de los dominios a eliminar.
+
+    Returns:
+        list[dict]: Resultado de cada ID, en el mismo orden.
+    """
+    return bulk_delete(db, Domain, domain_ids, dependents=DOMAIN_CACHE)
@@ -0,0 +1,87 @@
+"""
+Servicio para exportar tablas completas en NDJSON o CSV sin cargarlas en memoria.
+
+Las filas se leen con un cursor de servidor (stream_results) en bloques de EXPORT_CHUNK_SIZE
+(yield_per) y cada bloque se convierte en un fragmento de bytes en cuanto llega.
+"""
+
+import csv
+import io
+import json
+import os
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.associations import user_role_association, role_policy_association, domain_data_product
+from app.models.data_product import DataProduct
+from app.models.domain import Domain
+from app.models.policy import Policy
+from app.models.role import Role
+from app.models.user import User
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Tablas exportables y columnas que no se exportan
+EXPORTS = {
+    "users": (User.__table__, ("hashed_password",)),
+    "roles": (Role.__table__, ()),
+    "policies": (Policy.__table__, ()),
+    "domains": (Domain.__table__, ()),
+    "data_products": (DataProduct.__table__, ()),
+    "user_roles": (user_role_association, ()),
+    "role_policies": (role_policy_association, ()),
+    "domain_data_product": (domain_data_product, ())
+}
+
+
+def export_columns(name: str) -> list:
+    """
+    Devuelve las columnas exportables de una tabla.
+
+    Raises:
+        KeyError: Si la tabla no se puede exportar.
+    """
+    table, hidden = EXPORTS[name]
+    return [column for column in table.columns if column.key not in hidden]
+
+
+def iter_export(db: Session, name: str, export_format: str = "ndjson", chunk_size: int = None):
+    """
+    Genera el contenido de una tabla en NDJSON o CSV, en fragmentos de bytes de chunk_size filas.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        name (str): Nombre de la tabla (ver EXPORTS).
+        export_format (str): "ndjson" o "csv" (con cabecera).
+        chunk_size (int, optional): Filas por fragmento. Por defecto EXPORT_CHUNK_SIZE.
+
+    Yields:
+        bytes: Fragmento del contenido.
+    """
+    chunk_size = chunk_size or EXPORT_CHUNK_SIZE
+    columns = export_columns(name)
+    statement = select(*columns).order_by(*columns[:1])
+    result = db.connection().execution_options(stream_results=True, yield_per=chunk_size).execute(statement)
+    keys = [column.key for column in columns]
+
+    if export_format == "csv":
+        yield _csv_lines([keys])
+    for partition in result.partitions():
+        if export_format == "csv":
+            yield _csv_lines(partition)
+        else:
+            yield "".join(
+                json.dumps(dict(zip(keys, row)), ensure_ascii=False, default=str) + "\n" for row in partition
+            ).encode("utf-8")
+
+
+def _csv_lines(rows) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode("utf-8")
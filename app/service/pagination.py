@@ -0,0 +1,98 @@
+"""
+Servicio de paginación por cursor (keyset) para los listados.
+
+Las páginas se ordenan por la clave primaria id y cada página continúa a partir del último id
+de la anterior (WHERE id > :cursor ORDER BY id LIMIT :limit), de modo que el coste de leer una
+página no depende de su posición en la tabla, a diferencia de OFFSET.
+"""
+
+import base64
+import binascii
+import json
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Codifica el cursor de la página siguiente a partir del último id devuelto.
+    """
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> int:
+    """
+    Decodifica un cursor y devuelve el último id de la página anterior.
+
+    Raises:
+        ValueError: Si el cursor no es válido.
+    """
+    try:
+        last_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))["id"]
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(last_id, int):
+        raise ValueError("Invalid cursor")
+    return last_id
+
+
+def select_columns(model, fields: str = None, hidden: tuple = ()) -> list:
+    """
+    Devuelve las columnas pedidas (separadas por comas) de un modelo. El id se incluye siempre,
+    porque es la clave del cursor.
+
+    Raises:
+        ValueError: Si algún campo no existe o no se puede consultar.
+    """
+    if not fields:
+        return []
+    available = {column.key: column for column in model.__table__.columns if column.key not in hidden}
+    names = ["id"] + [name.strip() for name in fields.split(",") if name.strip() and name.strip() != "id"]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return [getattr(model, name) for name in dict.fromkeys(names)]
+
+
+def paginate(db: Session, model, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE,
+             conditions: tuple = (), fields: str = None, hidden: tuple = (), options: tuple = ()) -> tuple[list, str]:
+    """
+    Recupera una página de un listado.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        model: Modelo de las entidades del listado.
+        cursor (str, optional): Cursor devuelto con la página anterior. None para la primera página.
+        limit (int): Número máximo de elementos de la página.
+        conditions (tuple): Condiciones de filtrado.
+        fields (str, optional): Columnas a devolver, separadas por comas. Si se indican, los elementos
+            son diccionarios con esas columnas en lugar de objetos del modelo.
+        hidden (tuple): Columnas que no se pueden pedir en fields.
+        options (tuple): Opciones de carga de las relaciones (por ejemplo selectinload) cuando no se indica fields.
+
+    Returns:
+        tuple: Elementos de la página y cursor de la página siguiente (None si es la última).
+
+    Raises:
+        ValueError: Si el cursor o los campos no son válidos.
+    """
+    columns = select_columns(model, fields, hidden)
+    statement = select(*columns) if columns else select(model).options(*options)
+    statement = statement.where(*conditions)
+    if cursor:
+        statement = statement.where(model.id > decode_cursor(cursor))
+    statement = statement.order_by(model.id).limit(limit + 1)
+
+    if columns:
+        items = [dict(row) for row in db.execute(statement).mappings()]
+    else:
+        items = list(db.scalars(statement))
+    if len(items) <= limit:
+        return items, None
+    items = items[:limit]
+    last_id = items[-1]["id"] if columns else items[-1].id
+    return items, encode_cursor(last_id)
@@ -0,0 +1,158 @@
+"""
+Servicio del índice de permisos efectivos (usuario -> roles -> políticas).
+
+El índice se guarda materializado en la tabla user_effective_policies, con una fila por cada
+política que un usuario obtiene a través de sus roles, de modo que comprobar un permiso es una
+búsqueda por clave primaria en lugar de recorrer user_roles y role_policies. Los servicios de
+usuarios, roles y políticas lo actualizan de forma incremental en la misma transacción que cada
+cambio: solo se recalculan las filas de los usuarios afectados, y solo se invalidan sus entradas
+en la caché de autorización.
+"""
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.associations import user_role_association, role_policy_association
+from app.models.permissions import user_effective_policy
+from app.models.user import User
+from app.service.association_resolver import MAX_IDS_PER_QUERY
+from app.service.authorization_cache import cached, invalidate_after_commit, invalidate_all_after_commit, user_key
+from app.service.bulk_service import Dependents
+
+
+def _effective_policies():
+    return (
+        select(user_role_association.c.user_id, role_policy_association.c.policy_id)
+        .join(role_policy_association, role_policy_association.c.role_id == user_role_association.c.role_id)
+        .distinct()
+    )
+
+
+def affected_users(db: Session, model, ids: list[int]) -> set[int]:
+    """
+    Devuelve los usuarios cuyos permisos dependen de las entidades indicadas.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        model: Modelo de las entidades (User, Role o Policy).
+        ids (list[int]): IDs de las entidades.
+
+    Returns:
+        set[int]: IDs de los usuarios afectados.
+    """
+    if model.__tablename__ == "users":
+        return set(ids)
+    db.flush()
+    users = set()
+    for start in range(0, len(ids), MAX_IDS_PER_QUERY):
+        chunk = ids[start:start + MAX_IDS_PER_QUERY]
+        if model.__tablename__ == "roles":
+            statement = select(user_role_association.c.user_id).where(user_role_association.c.role_id.in_(chunk))
+        else:
+            statement = (
+                select(user_role_association.c.user_id)
+                .join(role_policy_association, role_policy_association.c.role_id == user_role_association.c.role_id)
+                .where(role_policy_association.c.policy_id.in_(chunk))
+            )
+        users.update(db.scalars(statement.distinct()))
+    return users
+
+
+def refresh_user_permissions(db: Session, user_ids) -> None:
+    """
+    Recalcula las filas del índice de los usuarios indicados a partir de sus roles. No hace commit,
+    para que el índice cambie en la misma transacción que las asociaciones.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        user_ids: IDs de los usuarios.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    # Las asociaciones pendientes de la sesión tienen que estar escritas antes de recalcular
+    db.flush()
+    for start in range(0, len(user_ids), MAX_IDS_PER_QUERY):
+        chunk = user_ids[start:start + MAX_IDS_PER_QUERY]
+        db.execute(delete(user_effective_policy).where(user_effective_policy.c.user_id.in_(chunk)))
+        db.execute(insert(user_effective_policy).from_select(
+            ["user_id", "policy_id"],
+            _effective_policies().where(user_role_association.c.user_id.in_(chunk))
+        ))
+    invalidate_after_commit(db, user_ids=user_ids)
+
+
+def rebuild_permission_index(db: Session) -> int:
+    """
+    Reconstruye el índice completo (por ejemplo al crear la tabla en una base de datos existente).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+
+    Returns:
+        int: Número de filas del índice.
+    """
+    db.execute(delete(user_effective_policy))
+    invalidate_all_after_commit(db)
+    result = db.execute(insert(user_effective_policy).from_select(
+        ["user_id", "policy_id"],
+        _effective_policies()
+    ))
+    db.commit()
+    return result.rowcount
+
+
+def clear_permission_index(db: Session) -> None:
+    """
+    Vacía el índice, cuando se eliminan todos los usuarios, roles o políticas. No hace commit.
+    """
+    db.execute(delete(user_effective_policy))
+    invalidate_all_after_commit(db)
+
+
+def _load_user_policy_ids(db: Session, user_id: int):
+    rows = db.execute(
+        select(User.id, user_effective_policy.c.policy_id)
+        .outerjoin(user_effective_policy, user_effective_policy.c.user_id == User.id)
+        .where(User.id == user_id)
+        .order_by(user_effective_policy.c.policy_id)
+    ).all()
+    if not rows:
+        return None
+    return [policy_id for _, policy_id in rows if policy_id is not None]
+
+
+def get_user_policy_ids(db: Session, user_id: int):
+    """
+    Recupera los IDs de las políticas efectivas de un usuario, de la caché de autorización o del índice.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        user_id (int): ID del usuario.
+
+    Returns:
+        list[int]: IDs de las políticas, ordenados, o None si el usuario no existe.
+    """
+    return cached(user_key(user_id), lambda: _load_user_policy_ids(db, user_id))
+
+
+def user_has_policy(db: Session, user_id: int, policy_id: int) -> bool:
+    """
+    Comprueba si un usuario tiene una política a través de alguno de sus roles.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        user_id (int): ID del usuario.
+        policy_id (int): ID de la política.
+
+    Returns:
+        bool: True si el usuario tiene la política.
+    """
+    return policy_id in (get_user_policy_ids(db, user_id) or ())
+
+
+def permission_dependents(model) -> Dependents:
+    """
+    Devuelve los datos derivados del índice para las operaciones por lotes de un modelo.
+    """
+    return Dependents(lambda db, ids: affected_users(db, model, ids), refresh_user_permissions)
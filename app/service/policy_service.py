@@ -2,16 +2,28 @@
 Servicio para la gestión de políticas.
 """
 
+from sqlalchemy.orm import Session
+
 from app.models.policy import Policy
-from app.config.database import SessionLocal
 
 from app.models.role import Role
-
-def create_policy(name: str, description: str, role_ids: list[int] = None):
+from app.models.associations import role_policy_association
+from app.service.bulk_service import Association, bulk_create, bulk_update, bulk_delete
+from app.service.association_resolver import resolve_associations
+from app.service.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.service.permission_service import (
+    affected_users,
+    clear_permission_index,
+    permission_dependents,
+    refresh_user_permissions
+)
+
+def create_policy(db: Session, name: str, description: str, role_ids: list[int] = None):
     """
     Crea una nueva política con los roles proporcionados.
 
     Args:
+        db (Session): Sesión de la base de datos.
         name (str): Nombre de la política.
         description (str): Descripción de la política.
         role_ids (list[int], optional): Lista de IDs de roles a asignar a la política.
@@ -19,56 +31,74 @@ def create_policy(name: str, description: str, role_ids: list[int] = None):
     Returns:
         Policy: La política creada.
     """
-    db = SessionLocal()
     try:
         new_policy = Policy(name=name, description=description)
-        if role_ids:
-            for role_id in role_ids:
-                role = db.query(Role).get(role_id)
-                if role:
-                    new_policy.roles.append(role)
+        new_policy.roles = resolve_associations(db, Role, role_ids)
         db.add(new_policy)
+        db.flush()
+        refresh_user_permissions(db, affected_users(db, Policy, [new_policy.id]))
         db.commit()
         db.refresh(new_policy)
         return new_policy
     except Exception as e:
         db.rollback()
         raise e
-    finally:
-        db.close()
 
-def get_policy(policy_id: int):
+def get_policy(db: Session, policy_id: int):
     """
     Recupera una política por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         policy_id (int): ID de la política.
 
     Returns:
         Policy: La política correspondiente al ID proporcionado, o None si no se encuentra.
     """
-    db = SessionLocal()
     policy = db.query(Policy).filter(Policy.id == policy_id).first()
-    db.close()
     return policy
 
-def get_all_policies():
+def get_all_policies(db: Session):
     """
     Recupera todas las políticas.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         list[Policy]: Lista de todas las políticas.
     """
-    db = SessionLocal()
     policies = db.query(Policy).all()
-    db.close()
     return policies
 
-def update_policy(policy_id: int, name: str = None, description: str = None, role_ids: list[int] = None):
+def list_policies(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, name: str = None, fields: str = None):
+    """
+    Recupera una página de políticas, ordenadas por ID (ver pagination.paginate).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        cursor (str, optional): Cursor de la página siguiente devuelto con la página anterior.
+        limit (int): Número máximo de elementos de la página.
+        name (str, optional): Nombre exacto de la política.
+        fields (str, optional): Columnas a devolver, separadas por comas.
+
+    Returns:
+        tuple: Elementos de la página y cursor de la página siguiente (None si es la última).
+
+    Raises:
+        ValueError: Si el cursor o los campos no son válidos.
+    """
+    conditions = []
+    if name is not None:
+        conditions.append(Policy.name == name)
+    return paginate(db, Policy, cursor, limit, tuple(conditions), fields)
+
+def update_policy(db: Session, policy_id: int, name: str = None, description: str = None, role_ids: list[int] = None):
     """
     Actualiza una política existente.
 
     Args:
+        db (Session): Sesión de la base de datos.
         policy_id (int): ID de la política.
         name (str, optional): Nuevo nombre de la política.
         description (str, optional): Nueva descripción de la política.
@@ -77,60 +107,99 @@ def update_policy(policy_id: int, name: str = None, description: str = None, rol
     Returns:
         Policy: La política actualizada, o None si no se encuentra.
     """
-    db = SessionLocal()
     policy = db.query(Policy).filter(Policy.id == policy_id).first()
     if not policy:
-        db.close()
         return None
+    # Usuarios con la política antes del cambio, para recalcular también los que la pierden
+    affected = affected_users(db, Policy, [policy_id]) if role_ids is not None else set()
     if name:
         policy.name = name
     if description:
         policy.description = description
     if role_ids is not None:
-        policy.roles = []
-        for role_id in role_ids:
-            role = db.query(Role).get(role_id)
-            if role:
-                policy.roles.append(role)
+        policy.roles = resolve_associations(db, Role, role_ids)
+        refresh_user_permissions(db, affected | affected_users(db, Policy, [policy_id]))
     db.commit()
     db.refresh(policy)
-    db.close()
     return policy
 
-def delete_policy(policy_id: int):
+def delete_policy(db: Session, policy_id: int):
     """
     Elimina una política por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         policy_id (int): ID de la política a eliminar.
 
     Returns:
         Policy: La política eliminada, o None si no se encuentra.
     """
-    db = SessionLocal()
     policy = db.query(Policy).filter(Policy.id == policy_id).first()
     if not policy:
-        db.close()
         return None
+    affected = affected_users(db, Policy, [policy_id])
+    policy.roles = []
+    refresh_user_permissions(db, affected)
     db.delete(policy)
     db.commit()
-    db.close()
     return policy
 
-def delete_all_policies():
+def delete_all_policies(db: Session):
     """
     Elimina todas las políticas.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         int: El número de filas eliminadas.
     """
-    db = SessionLocal()
     try:
+        clear_permission_index(db)
         num_rows_deleted = db.query(Policy).delete()
         db.commit()
         return num_rows_deleted
     except Exception as e:
         db.rollback()
         raise e
-    finally:
-        db.close()
+
+POLICY_ROLES = Association("role_ids", role_policy_association, "policy_id", "role_id", Role)
+
+def bulk_create_policies(db: Session, policies: list[dict]) -> list[dict]:
+    """
+    Crea varias políticas por lotes (ver bulk_service.bulk_create).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        policies (list[dict]): Políticas con los campos de create_policy.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden.
+    """
+    return bulk_create(db, Policy, policies, (POLICY_ROLES,), dependents=permission_dependents(Policy))
+
+def bulk_update_policies(db: Session, policies: list[dict]) -> list[dict]:
+    """
+    Actualiza varias políticas por lotes (ver bulk_service.bulk_update).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        policies (list[dict]): Políticas con su id y los campos de update_policy.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden.
+    """
+    return bulk_update(db, Policy, policies, (POLICY_ROLES,), dependents=permission_dependents(Policy))
+
+def bulk_delete_policies(db: Session, policy_ids: list[int]) -> list[dict]:
+    """
+    Elimina varias políticas por lotes (ver bulk_service.bulk_delete).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        policy_ids (list[int]): IDs de las políticas a eliminar.
+
+    Returns:
+        list[dict]: Resultado de cada ID, en el mismo orden.
+    """
+    return bulk_delete(db, Policy, policy_ids, dependents=permission_dependents(Policy))
@@ -0,0 +1,171 @@
+"""
+Servicio para el almacenamiento y la consulta de las métricas de producción.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import func, insert, literal_column, select
+from sqlalchemy.orm import Session
+
+from app.models.production_metric import ProductionMetric
+
+METRICS = ("consumo_electrico", "tiempo_de_paro", "entrada_material", "producto_salida")
+
+# Periodos de agregación, los mismos que periocidad_de_los_datos en los metadatos
+PERIODS = ("dia", "semana", "mes", "año")
+
+
+def store_combined_data(db: Session, combined_data: dict) -> int:
+    """
+    Guarda las métricas de cada línea de trabajo de unos datos combinados.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        combined_data (dict): Datos combinados y validados.
+
+    Returns:
+        int: El número de filas insertadas.
+    """
+    return store_combined_batch(db, [combined_data])
+
+
+def store_combined_batch(db: Session, batch: list[dict]) -> int:
+    """
+    Guarda las métricas de un lote de datos combinados con una sola inserción múltiple.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        batch (list[dict]): Datos combinados y validados.
+
+    Returns:
+        int: El número de filas insertadas.
+    """
+    rows = [row for combined_data in batch for row in metric_rows(combined_data)]
+    if rows:
+        db.execute(insert(ProductionMetric), rows)
+        db.commit()
+    return len(rows)
+
+
+def metric_rows(combined_data: dict) -> list[dict]:
+    """
+    Convierte las líneas de trabajo de unos datos combinados en filas de production_metrics.
+    """
+    timestamp = datetime.fromisoformat(combined_data["metadata"]["timestamp"])
+    return [
+        {
+            "timestamp": timestamp,
+            "planta": combined_data["Planta"],
+            "id_linea": line["ID_Linea"],
+            "consumo_electrico": line["consumo_electrico"],
+            "tiempo_de_paro": line["tiempo_de_paro"],
+            "entrada_material": line["entrada_material"],
+            "producto_salida": sum(product["cantidad"] for product in line["producto_Salida"])
+        }
+        for line in combined_data["Lineas_de_trabajo"]
+    ]
+
+
+def get_metrics(db: Session, planta: str, id_linea: str = None, start: datetime = None, end: datetime = None, limit: int = 1000):
+    """
+    Recupera las métricas de una planta (y opcionalmente de una línea) en un rango de fechas.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        planta (str): Planta.
+        id_linea (str, optional): Línea de trabajo.
+        start (datetime, optional): Inicio del rango (incluido).
+        end (datetime, optional): Fin del rango (incluido).
+        limit (int): Número máximo de filas.
+
+    Returns:
+        list[dict]: Las métricas ordenadas por timestamp.
+    """
+    query = select(
+        ProductionMetric.timestamp,
+        ProductionMetric.id_linea,
+        *(getattr(ProductionMetric, metric) for metric in METRICS)
+    ).where(ProductionMetric.planta == planta)
+    query = _filter_range(query, id_linea, start, end)
+    query = query.order_by(ProductionMetric.timestamp, ProductionMetric.id).limit(limit)
+    return [dict(row) for row in db.execute(query).mappings()]
+
+
+def aggregate_metrics(db: Session, planta: str, periodo: str, id_linea: str = None, start: datetime = None, end: datetime = None):
+    """
+    Agrega (suma) las métricas de una planta por periodo: dia, semana, mes o año.
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        planta (str): Planta.
+        periodo (str): Periodo de agregación.
+        id_linea (str, optional): Línea de trabajo. Si no se indica se agregan todas las líneas.
+        start (datetime, optional): Inicio del rango (incluido).
+        end (datetime, optional): Fin del rango (incluido).
+
+    Returns:
+        list[dict]: Un elemento por periodo con el inicio del periodo, el número de muestras y la suma de cada métrica.
+
+    Raises:
+        ValueError: Si el periodo no es válido.
+    """
+    if periodo not in PERIODS:
+        raise ValueError(f"Invalid periodo '{periodo}', expected one of {', '.join(PERIODS)}")
+
+    # La agrupación se hace en la base de datos: solo se devuelve una fila por periodo. Se agrupa
+    # por el alias para no repetir la expresión (y sus parámetros) en GROUP BY
+    bucket = period_start(db.get_bind().dialect.name, periodo).label("inicio")
+    query = select(
+        bucket,
+        func.count().label("muestras"),
+        *(func.sum(getattr(ProductionMetric, metric)).label(metric) for metric in METRICS)
+    ).where(ProductionMetric.planta == planta)
+    query = _filter_range(query, id_linea, start, end).group_by(literal_column("inicio")).order_by(literal_column("inicio"))
+
+    return [
+        {
+            "inicio": _as_datetime(row.inicio),
+            "muestras": row.muestras,
+            **{metric: float(getattr(row, metric) or 0.0) for metric in METRICS}
+        }
+        for row in db.execute(query)
+    ]
+
+
+def period_start(dialect: str, periodo: str):
+    """
+    Devuelve la expresión SQL del inicio del periodo (dia, semana, mes o año) de cada timestamp.
+    Las semanas empiezan el lunes.
+
+    Raises:
+        ValueError: Si la base de datos no está soportada.
+    """
+    timestamp = ProductionMetric.timestamp
+    if dialect == "mysql":
+        if periodo == "semana":
+            return func.date_format(func.subdate(timestamp, func.weekday(timestamp)), "%Y-%m-%d")
+        return func.date_format(timestamp, {"dia": "%Y-%m-%d", "mes": "%Y-%m-01", "año": "%Y-01-01"}[periodo])
+    if dialect == "sqlite":
+        if periodo == "semana":
+            # 'weekday 0' avanza hasta el domingo (o lo deja si ya lo es); 6 días antes es el lunes
+            return func.date(timestamp, "weekday 0", "-6 days")
+        return func.strftime({"dia": "%Y-%m-%d", "mes": "%Y-%m-01", "año": "%Y-01-01"}[periodo], timestamp)
+    if dialect == "postgresql":
+        return func.date_trunc({"dia": "day", "semana": "week", "mes": "month", "año": "year"}[periodo], timestamp)
+    raise ValueError(f"Aggregation is not supported on {dialect}")
+
+
+def _as_datetime(value) -> datetime:
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value)[:10])
+
+
+def _filter_range(query, id_linea: str = None, start: datetime = None, end: datetime = None):
+    if id_linea is not None:
+        query = query.where(ProductionMetric.id_linea == id_linea)
+    if start is not None:
+        query = query.where(ProductionMetric.timestamp >= start)
+    if end is not None:
+        query = query.where(ProductionMetric.timestamp <= end)
+    return query
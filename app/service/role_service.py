@@ -2,16 +2,34 @@
 Servicio para la gestión de roles y sus asociaciones.
 """
 
+from sqlalchemy.orm import Session, selectinload
+
 from app.models.role import Role
 from app.models.user import User
 from app.models.policy import Policy
-from app.config.database import SessionLocal
+from app.models.associations import user_role_association, role_policy_association
+from app.service.bulk_service import Association, bulk_create, bulk_update, bulk_delete
+from app.service.association_resolver import resolve_associations
+from app.service.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.service.permission_service import (
+    affected_users,
+    clear_permission_index,
+    permission_dependents,
+    refresh_user_permissions
+)
+
+def role_load_options() -> tuple:
+    """
+    Opciones de carga de las relaciones que se incluyen en las respuestas (una consulta por relación).
+    """
+    return (selectinload(Role.policies),)
 
-def create_role(name: str, description: str, user_ids: list[int] = None, policy_ids: list[int] = None):
+def create_role(db: Session, name: str, description: str, user_ids: list[int] = None, policy_ids: list[int] = None):
     """
     Crea un nuevo rol con las asociaciones proporcionadas.
 
     Args:
+        db (Session): Sesión de la base de datos.
         name (str): Nombre del rol.
         description (str): Descripción del rol.
         user_ids (list[int], optional): Lista de IDs de usuarios a asociar con el rol.
@@ -20,61 +38,75 @@ def create_role(name: str, description: str, user_ids: list[int] = None, policy_
     Returns:
         Role: El rol creado.
     """
-    db = SessionLocal()
     try:
         new_role = Role(name=name, description=description)
-        if user_ids:
-            for user_id in user_ids:
-                user = db.query(User).get(user_id)
-                if user:
-                    new_role.users.append(user)
-        if policy_ids:
-            for policy_id in policy_ids:
-                policy = db.query(Policy).get(policy_id)
-                if policy:
-                    new_role.policies.append(policy)
+        new_role.users = resolve_associations(db, User, user_ids)
+        new_role.policies = resolve_associations(db, Policy, policy_ids)
         db.add(new_role)
+        db.flush()
+        refresh_user_permissions(db, affected_users(db, Role, [new_role.id]))
         db.commit()
         db.refresh(new_role)
         return new_role
     except Exception as e:
         db.rollback()
         raise e
-    finally:
-        db.close()
 
-def get_role(role_id: int):
+def get_role(db: Session, role_id: int):
     """
     Recupera un rol por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         role_id (int): ID del rol.
 
     Returns:
         Role: El rol correspondiente al ID proporcionado, o None si no se encuentra.
     """
-    db = SessionLocal()
-    role = db.query(Role).filter(Role.id == role_id).first()
-    db.close()
+    role = db.query(Role).options(*role_load_options()).filter(Role.id == role_id).first()
     return role
 
-def get_all_roles():
+def get_all_roles(db: Session):
     """
     Recupera todos los roles.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         list[Role]: Lista de todos los roles.
     """
-    db = SessionLocal()
     roles = db.query(Role).all()
-    db.close()
     return roles
 
-def update_role(role_id: int, name: str = None, description: str = None, user_ids: list[int] = None, policy_ids: list[int] = None):
+def list_roles(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, name: str = None, fields: str = None):
+    """
+    Recupera una página de roles, ordenados por ID (ver pagination.paginate).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        cursor (str, optional): Cursor de la página siguiente devuelto con la página anterior.
+        limit (int): Número máximo de elementos de la página.
+        name (str, optional): Nombre exacto del rol.
+        fields (str, optional): Columnas a devolver, separadas por comas.
+
+    Returns:
+        tuple: Elementos de la página y cursor de la página siguiente (None si es la última).
+
+    Raises:
+        ValueError: Si el cursor o los campos no son válidos.
+    """
+    conditions = []
+    if name is not None:
+        conditions.append(Role.name == name)
+    return paginate(db, Role, cursor, limit, tuple(conditions), fields, options=role_load_options())
+
+def update_role(db: Session, role_id: int, name: str = None, description: str = None, user_ids: list[int] = None, policy_ids: list[int] = None):
     """
     Actualiza un rol existente.
 
     Args:
+        db (Session): Sesión de la base de datos.
         role_id (int): ID del rol.
         name (str, optional): Nuevo nombre del rol.
         description (str, optional): Nueva descripción del rol.
@@ -84,66 +116,103 @@ def update_role(role_id: int, name: str = None, description: str = None, user_id
     Returns:
         Role: El rol actualizado, o None si no se encuentra.
     """
-    db = SessionLocal()
     role = db.query(Role).filter(Role.id == role_id).first()
     if not role:
-        db.close()
         return None
+    # Usuarios con el rol antes del cambio, para recalcular también los que lo pierden
+    affected = affected_users(db, Role, [role_id]) if user_ids is not None or policy_ids is not None else set()
     if name:
         role.name = name
     if description:
         role.description = description
     if user_ids is not None:
-        role.users = []
-        for user_id in user_ids:
-            user = db.query(User).get(user_id)
-            if user:
-                role.users.append(user)
+        role.users = resolve_associations(db, User, user_ids)
     if policy_ids is not None:
-        role.policies = []
-        for policy_id in policy_ids:
-            policy = db.query(Policy).get(policy_id)
-            if policy:
-                role.policies.append(policy)
+        role.policies = resolve_associations(db, Policy, policy_ids)
+    if user_ids is not None or policy_ids is not None:
+        refresh_user_permissions(db, affected | affected_users(db, Role, [role_id]))
     db.commit()
     db.refresh(role)
-    db.close()
     return role
 
-def delete_role(role_id: int):
+def delete_role(db: Session, role_id: int):
     """
     Elimina un rol por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         role_id (int): ID del rol a eliminar.
 
     Returns:
         Role: El rol eliminado, o None si no se encuentra.
     """
-    db = SessionLocal()
     role = db.query(Role).filter(Role.id == role_id).first()
     if not role:
-        db.close()
         return None
+    affected = affected_users(db, Role, [role_id])
+    role.users = []
+    refresh_user_permissions(db, affected)
     db.delete(role)
     db.commit()
-    db.close()
     return role
 
-def delete_all_roles():
+def delete_all_roles(db: Session):
     """
     Elimina todos los roles.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         int: El número de filas eliminadas.
     """
-    db = SessionLocal()
     try:
+        clear_permission_index(db)
         num_rows_deleted = db.query(Role).delete()
         db.commit()
         return num_rows_deleted
     except Exception as e:
         db.rollback()
         raise e
-    finally:
-        db.close()
+
+ROLE_USERS = Association("user_ids", user_role_association, "role_id", "user_id", User)
+ROLE_POLICIES = Association("policy_ids", role_policy_association, "role_id", "policy_id", Policy)
+
+def bulk_create_roles(db: Session, roles: list[dict]) -> list[dict]:
+    """
+    Crea varios roles por lotes (ver bulk_service.bulk_create).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        roles (list[dict]): Roles con los campos de create_role.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden.
+    """
+    return bulk_create(db, Role, roles, (ROLE_USERS, ROLE_POLICIES), dependents=permission_dependents(Role))
+
+def bulk_update_roles(db: Session, roles: list[dict]) -> list[dict]:
+    """
+    Actualiza varios roles por lotes (ver bulk_service.bulk_update).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        roles (list[dict]): Roles con su id y los campos de update_role.
+
+    Returns:
+        list[dict]: Resultado de cada elemento, en el mismo orden.
+    """
+    return bulk_update(db, Role, roles, (ROLE_USERS, ROLE_POLICIES), dependents=permission_dependents(Role))
+
+def bulk_delete_roles(db: Session, role_ids: list[int]) -> list[dict]:
+    """
+    Elimina varios roles por lotes (ver bulk_service.bulk_delete).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        role_ids (list[int]): IDs de los roles a eliminar.
+
+    Returns:
+        list[dict]: Resultado de cada ID, en el mismo orden.
+    """
+    return bulk_delete(db, Role, role_ids, dependents=permission_dependents(Role))
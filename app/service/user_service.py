@@ -1,29 +1,58 @@
 from sqlalchemy.exc import IntegrityError
-from passlib.context import CryptContext
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.user import User
 from app.models.role import Role
-from app.config.database import SessionLocal
-from app.utils.security import hash_password, verify_password
+from app.models.associations import user_role_association
+from app.service.bulk_service import Association, bulk_create, bulk_update, bulk_delete
+from app.service.association_resolver import resolve_associations
+from app.service.pagination import DEFAULT_PAGE_SIZE, paginate
+from app.service.permission_service import (
+    clear_permission_index,
+    permission_dependents,
+    refresh_user_permissions
+)
+from app.utils.security import hash_password, hash_passwords_async, verify_password
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def user_load_options() -> tuple:
+    """
+    Opciones de carga de las relaciones que se incluyen en las respuestas (una consulta por relación).
+    """
+    return (selectinload(User.roles),)
 
-def get_password_hash(password):
+async def hash_user_passwords(users: list[dict]) -> list[dict]:
     """
-    Genera un hash seguro para una contraseña dada.
+    Sustituye plain_password por hashed_password en cada usuario, calculando los hash en paralelo en el
+    pool de hash (ver security.hash_passwords_async) en lugar de en el bucle de eventos.
+
+    Args:
+        users (list[dict]): Usuarios con los campos de create_user o update_user.
+
+    Returns:
+        list[dict]: Los mismos usuarios, con hashed_password en lugar de plain_password.
     """
-    return pwd_context.hash(password)
+    with_password = [user for user in users if user.get("plain_password")]
+    hashes = await hash_passwords_async([user["plain_password"] for user in with_password])
+    for user, hashed_password in zip(with_password, hashes):
+        user["hashed_password"] = hashed_password
+    for user in users:
+        user.pop("plain_password", None)
+    return users
 
-def create_user(name: str, email: str, plain_password: str, domain_id: int, roles: list[int] = None):
+def create_user(db: Session, name: str, email: str, plain_password: str, domain_id: int, roles: list[int] = None,
+                hashed_password: str = None):
     """
     Crea un nuevo usuario con los roles proporcionados.
 
     Args:
+        db (Session): Sesión de la base de datos.
         name (str): Nombre del usuario.
         email (str): Email del usuario.
         plain_password (str): Contraseña en texto plano del usuario.
         domain_id (int): ID del dominio al que pertenece el usuario.
         roles (list[int], optional): Lista de IDs de roles a asignar al usuario.
+        hashed_password (str, optional): Hash de la contraseña ya calculado (por ejemplo con
+            security.hash_password_async). Si se indica, plain_password no se usa.
 
     Returns:
         User: El usuario creado.
@@ -31,133 +60,217 @@ def create_user(name: str, email: str, plain_password: str, domain_id: int, role
     Raises:
         ValueError: Si el usuario ya existe.
     """
-    db = SessionLocal()
     try:
-        hashed_password = hash_password(plain_password)
+        hashed_password = hashed_password or hash_password(plain_password)
         new_user = User(name=name, email=email, hashed_password=hashed_password, domain_id=domain_id)
-        if roles:
-            for role_id in roles:
-                role = db.query(Role).get(role_id)
-                if role:
-                    new_user.roles.append(role)
+        new_user.roles = resolve_associations(db, Role, roles)
         db.add(new_user)
+        db.flush()
+        refresh_user_permissions(db, [new_user.id])
         db.commit()
         db.refresh(new_user)
         return new_user
     except IntegrityError as exc:
         db.rollback()
         raise ValueError("User with this name or email already exists") from exc
-    finally:
-        db.close()
 
-def get_user(user_id: int):
-    db = SessionLocal()
-    user = db.query(User).filter(User.id == user_id).first()
-    db.close()
+def get_user(db: Session, user_id: int):
+    user = db.query(User).options(*user_load_options()).filter(User.id == user_id).first()
     return user
 
-def get_all_users():
+def get_all_users(db: Session):
     """
     Recupera todos los usuarios.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         list[User]: Lista de todos los usuarios.
     """
-    db = SessionLocal()
     users = db.query(User).all()
-    db.close()
     return users
 
-def update_user(user_id: int, name: str = None, email: str = None, plain_password: str = None, domain_id: int = None, roles: list[int] = None):
+def list_users(db: Session, cursor: str = None, limit: int = DEFAULT_PAGE_SIZE, name: str = None, domain_id: int = None, fields: str = None):
+    """
+    Recupera una página de usuarios, ordenados por ID (ver pagination.paginate).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        cursor (str, optional): Cursor de la página siguiente devuelto con la página anterior.
+        limit (int): Número máximo de elementos de la página.
+        name (str, optional): Nombre exacto del usuario.
+        domain_id (int, optional): ID del dominio de los usuarios.
+        fields (str, optional): Columnas a devolver, separadas por comas.
+
+    Returns:
+        tuple: Elementos de la página y cursor de la página siguiente (None si es la última).
+
+    Raises:
+        ValueError: Si el cursor o los campos no son válidos.
+    """
+    conditions = []
+    if name is not None:
+        conditions.append(User.name == name)
+    if domain_id is not None:
+        conditions.append(User.domain_id == domain_id)
+    return paginate(db, User, cursor, limit, tuple(conditions), fields, hidden=("hashed_password",), options=user_load_options())
+
+def update_user(db: Session, user_id: int, name: str = None, email: str = None, plain_password: str = None, domain_id: int = None, roles: list[int] = None,
+                hashed_password: str = None):
     """
     Actualiza un usuario existente.
 
     Args:
+        db (Session): Sesión de la base de datos.
         user_id (int): ID del usuario.
         name (str, optional): Nuevo nombre del usuario.
         email (str, optional): Nuevo email del usuario.
         plain_password (str, optional): Nueva contraseña en texto plano del usuario.
         domain_id (int, optional): Nuevo ID del dominio al que pertenece el usuario.
         roles (list[int], optional): Nueva lista de IDs de roles a asignar al usuario.
+        hashed_password (str, optional): Hash de la nueva contraseña ya calculado. Si se indica, plain_password no se usa.
 
     Returns:
         User: El usuario actualizado, o None si no se encuentra.
+
+    Raises:
+        ValueError: Si ya existe otro usuario con ese nombre o email.
     """
-    db = SessionLocal()
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
-        db.close()
         return None
-    if name:
-        user.name = name
-    if email:
-        user.email = email
-    if plain_password:
-        user.hashed_password = get_password_hash(plain_password)
-    if domain_id:
-        user.domain_id = domain_id
-    if roles is not None:
-        user.roles = []
-        for role_id in roles:
-            role = db.query(Role).get(role_id)
-            if role:
-                user.roles.append(role)
-    db.commit()
-    db.refresh(user)
-    db.close()
-    return user
+    try:
+        if name:
+            user.name = name
+        if email:
+            user.email = email
+        if hashed_password:
+            user.hashed_password = hashed_password
+        elif plain_password:
+            user.hashed_password = hash_password(plain_password)
+        if domain_id:
+            user.domain_id = domain_id
+        if roles is not None:
+            user.roles = resolve_associations(db, Role, roles)
+            refresh_user_permissions(db, [user.id])
+        db.commit()
+        db.refresh(user)
+        return user
+    except IntegrityError as exc:
+        db.rollback()
+        raise ValueError("User with this name or email already exists") from exc
 
-def delete_user(user_id: int):
+def delete_user(db: Session, user_id: int):
     """
     Elimina un usuario por su ID.
 
     Args:
+        db (Session): Sesión de la base de datos.
         user_id (int): ID del usuario a eliminar.
 
     Returns:
         User: El usuario eliminado, o None si no se encuentra.
     """
-    db = SessionLocal()
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
-        db.close()
         return None
+    # Las filas del índice de permisos se quitan antes que el usuario al que hacen referencia
+    user.roles = []
+    refresh_user_permissions(db, [user.id])
     db.delete(user)
     db.commit()
-    db.close()
     return user
 
-def delete_all_users():
+def delete_all_users(db: Session):
     """
     Elimina todos los usuarios.
 
+    Args:
+        db (Session): Sesión de la base de datos.
+
     Returns:
         int: El número de filas eliminadas.
     """
-    db = SessionLocal()
     try:
+        clear_permission_index(db)
         num_rows_deleted = db.query(User).delete()
         db.commit()
         return num_rows_deleted
     except Exception as e:
         db.rollback()
         raise e
-    finally:
-        db.close()
 
-def authenticate_user(email: str, plain_password: str):
+def authenticate_user(db: Session, email: str, plain_password: str):
     """
     Autentica un usuario por su email y contraseña en texto plano.
 
     Args:
+        db (Session): Sesión de la base de datos.
         email (str): Email del usuario.
         plain_password (str): Contraseña en texto plano del usuario.
 
     Returns:
         User: El usuario autenticado, o None si la autenticación falla.
     """
-    db = SessionLocal()
     user = db.query(User).filter(User.email == email).first()
     if user and verify_password(plain_password, user.hashed_password):
         return user
     return None
+
+USER_ROLES = Association("roles", user_role_association, "user_id", "role_id", Role)
+
+def bulk_create_users(db: Session, users: list[dict]) -> list[dict]:
+    """
+    Crea varios usuarios por lotes (ver bulk_service.bulk_create).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        users (list[dict]): Usuarios con los campos de create_user (plain_password o hashed_password).
+
+    Returns:
+        list[dict]: Resultado de cada usuario, en el mismo orden.
+    """
+    rows = [
+        {
+            "name": user["name"],
+            "email": user["email"],
+            "hashed_password": user.get("hashed_password") or hash_password(user["plain_password"]),
+            "domain_id": user["domain_id"],
+            "roles": user.get("roles")
+        }
+        for user in users
+    ]
+    return bulk_create(db, User, rows, (USER_ROLES,), dependents=permission_dependents(User))
+
+def bulk_update_users(db: Session, users: list[dict]) -> list[dict]:
+    """
+    Actualiza varios usuarios por lotes (ver bulk_service.bulk_update).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        users (list[dict]): Usuarios con su id y los campos de update_user (plain_password o hashed_password).
+
+    Returns:
+        list[dict]: Resultado de cada usuario, en el mismo orden.
+    """
+    rows = []
+    for user in users:
+        row = {key: value for key, value in user.items() if key != "plain_password"}
+        if user.get("plain_password") and not user.get("hashed_password"):
+            row["hashed_password"] = hash_password(user["plain_password"])
+        rows.append(row)
+    return bulk_update(db, User, rows, (USER_ROLES,), dependents=permission_dependents(User))
+
+def bulk_delete_users(db: Session, user_ids: list[int]) -> list[dict]:
+    """
+    Elimina varios usuarios por lotes (ver bulk_service.bulk_delete).
+
+    Args:
+        db (Session): Sesión de la base de datos.
+        user_ids (list[int]): IDs de los usuarios a eliminar.
+
+    Returns:
+        list[dict]: Resultado de cada ID, en el mismo orden.
+    """
+    return bulk_delete(db, User, user_ids, dependents=permission_dependents(User))
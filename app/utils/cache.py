@@ -0,0 +1,192 @@
+"""
+Cachés de valores JSON con caducidad: una LRU en memoria del proceso y otra compartida en SQLite
+para que varios workers de uvicorn vean las mismas invalidaciones.
+
+Cada clave tiene una generación que aumenta al invalidarla (delete_many, clear). Quien calcula un
+valor lee la generación antes de calcularlo y lo pasa a set, que no guarda nada si entretanto se ha
+invalidado la clave: así un valor calculado antes de una invalidación no la deshace.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS generations (
+    key TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+# Clave de la tabla generations con la generación de toda la caché (aumenta con clear)
+EPOCH_KEY = ""
+
+GENERATION_SQL = """
+SELECT COALESCE((SELECT generation FROM generations WHERE key = ''), 0),
+       COALESCE((SELECT generation FROM generations WHERE key = ?), 0)
+"""
+
+
+class LRUCache:
+    """
+    Caché en memoria con un máximo de entradas (se descartan las menos usadas) y tiempo de vida.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        # Generaciones de las claves invalidadas alguna vez (las demás están en la 0)
+        self._generations = {}
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """
+        Devuelve el valor de una clave, o None si no está o ha caducado.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def generation(self, key: str) -> tuple:
+        """
+        Devuelve la generación actual de una clave, para pasarla a set.
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def set(self, key: str, value, generation: tuple = None):
+        """
+        Guarda el valor de una clave. Si se indica generation, solo lo guarda si la clave no se ha
+        invalidado desde que se leyó esa generación.
+
+        Returns:
+            bool: Si se ha guardado el valor.
+        """
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key, 0)):
+                return False
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def delete_many(self, keys):
+        """
+        Elimina las claves indicadas y aumenta su generación.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self):
+        """
+        Elimina todas las claves y aumenta la generación de todas.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def stats(self) -> dict:
+        """
+        Devuelve el número de entradas, aciertos y fallos.
+        """
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+class SQLiteCache:
+    """
+    Caché compartida entre procesos en un archivo SQLite local, con la misma interfaz que LRUCache.
+    Las entradas caducadas se ignoran al leerlas y se sobrescriben al volver a guardarlas.
+    """
+
+    def __init__(self, path: str, ttl: float = 300.0):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return json.loads(row[0])
+
+    def generation(self, key: str) -> tuple:
+        with self._lock:
+            return tuple(self._connection.execute(GENERATION_SQL, (key,)).fetchone())
+
+    def set(self, key: str, value, generation: tuple = None) -> bool:
+        # La comprobación de la generación y la escritura son una sola sentencia, atómica entre procesos
+        with self._lock:
+            if generation is None:
+                cursor = self._connection.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time() + self.ttl)
+                )
+            else:
+                cursor = self._connection.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, expires_at) SELECT ?, ?, ? "
+                    f"WHERE ({GENERATION_SQL}) = (?, ?)",
+                    (key, json.dumps(value), time.time() + self.ttl, key, *generation)
+                )
+            return cursor.rowcount == 1
+
+    def delete_many(self, keys):
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.executemany("DELETE FROM cache WHERE key = ?", [(key,) for key in keys])
+            self._connection.executemany(
+                "INSERT INTO generations (key, generation) VALUES (?, 1) "
+                "ON CONFLICT (key) DO UPDATE SET generation = generation + 1",
+                [(key,) for key in keys]
+            )
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("BEGIN IMMEDIATE")
+            self._connection.execute("DELETE FROM cache")
+            self._connection.execute("DELETE FROM generations WHERE key != ?", (EPOCH_KEY,))
+            self._connection.execute(
+                "INSERT INTO generations (key, generation) VALUES (?, 1) "
+                "ON CONFLICT (key) DO UPDATE SET generation = generation + 1",
+                (EPOCH_KEY,)
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM cache WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+            return {"backend": "sqlite", "entries": entries, "hits": self.hits, "misses": self.misses}
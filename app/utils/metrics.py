@@ -0,0 +1,312 @@
+"""
+Métricas de la aplicación en el formato de texto de Prometheus (GET /metrics).
+
+- Peticiones HTTP (MetricsMiddleware): peticiones y latencia por método, ruta y código de estado,
+  y peticiones en curso por método. La ruta es la plantilla (/api/v1/users/{user_id}) y no la URL,
+  para que el número de series no crezca con los identificadores.
+- Base de datos (instrument_engines): número y duración de las consultas, en total y por petición,
+  con los eventos de cursor de SQLAlchemy de todos los engines (también los asíncronos).
+- Etapas del procesamiento de datos (stage_timer): transform, combine, validate, archive, store,
+  enqueue y deliver.
+
+Las métricas se guardan en memoria en cada proceso: con varios workers cada uno expone las suyas.
+En el camino de cada petición solo se hacen sumas protegidas por un lock; el texto se genera al
+leer /metrics.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Límites superiores de los buckets de los histogramas
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# Ruta de las peticiones que no corresponden a ningún endpoint
+UNMATCHED_ROUTE = "unmatched"
+
+
+def format_value(value) -> str:
+    """
+    Formatea un valor de una muestra (los enteros sin decimales).
+    """
+    if isinstance(value, int):
+        return str(value)
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def escape_label(value) -> str:
+    """
+    Escapa el valor de una etiqueta: barras invertidas, comillas y saltos de línea.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(names: tuple, values: tuple) -> str:
+    """
+    Formatea las etiquetas de una muestra: {nombre="valor",...}.
+    """
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{escape_label(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class Metric:
+    """
+    Base de las métricas: valores por combinación de etiquetas, protegidos por un lock.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        METRICS.append(self)
+
+    def clear(self):
+        """
+        Borra todos los valores.
+        """
+        with self._lock:
+            self._values.clear()
+
+    def samples(self, labels: tuple, value) -> list[str]:
+        return [f"{self.name}{format_labels(self.labelnames, labels)} {format_value(value)}"]
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return sorted(self._values.items())
+
+    def render(self) -> list[str]:
+        """
+        Devuelve las líneas de la métrica en el formato de texto de Prometheus.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.snapshot():
+            lines.extend(self.samples(labels, value))
+        return lines
+
+
+class Counter(Metric):
+    """
+    Contador que solo aumenta.
+    """
+
+    kind = "counter"
+
+    def inc(self, labels: tuple = (), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Valor que sube y baja.
+    """
+
+    kind = "gauge"
+
+    def inc(self, labels: tuple = (), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, labels: tuple = (), amount=1):
+        self.inc(labels, -amount)
+
+
+class Histogram(Metric):
+    """
+    Histograma con buckets fijos: por cada combinación de etiquetas guarda las observaciones de cada
+    bucket (sin acumular, se acumulan al generar el texto) y la suma.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, labels: tuple = ()):
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0]
+            state[0][position] += 1
+            state[1] += value
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+
+    def samples(self, labels: tuple, value) -> list[str]:
+        counts, total = value
+        bucket_names = self.labelnames + ("le",)
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{format_labels(bucket_names, labels + (format_value(bound),))} {cumulative}")
+        lines.append(f"{self.name}_sum{format_labels(self.labelnames, labels)} {format_value(total)}")
+        lines.append(f"{self.name}_count{format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+METRICS: list[Metric] = []
+
+HTTP_REQUESTS = Counter("http_requests_total", "Peticiones HTTP atendidas.", ("method", "route", "status"))
+HTTP_REQUEST_DURATION = Histogram("http_request_duration_seconds", "Latencia de las peticiones HTTP.", ("method", "route"))
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Peticiones HTTP en curso.", ("method",))
+HTTP_REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries", "Consultas a la base de datos por petición HTTP.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Tiempo en la base de datos por petición HTTP.", ("method", "route")
+)
+DB_QUERIES = Counter("db_queries_total", "Consultas ejecutadas en la base de datos.")
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Duración de cada consulta a la base de datos.")
+PIPELINE_STAGE_DURATION = Histogram(
+    "pipeline_stage_duration_seconds", "Duración de cada etapa del procesamiento de datos del dashboard.", ("stage",)
+)
+
+
+def render_metrics() -> str:
+    """
+    Devuelve todas las métricas en el formato de texto de Prometheus.
+    """
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+def reset_metrics():
+    """
+    Borra los valores de todas las métricas.
+    """
+    for metric in METRICS:
+        metric.clear()
+
+
+class RequestStats:
+    """
+    Consultas y tiempo en la base de datos de la petición en curso.
+    """
+
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Estadísticas de la petición en curso: las copias del contexto (threadpool, greenlets de
+# run_sync) comparten el mismo objeto
+_request_stats: ContextVar = ContextVar("request_stats", default=None)
+
+
+def _before_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    if context is not None:
+        context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(_conn, _cursor, _statement, _parameters, context, _executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    DB_QUERIES.inc()
+    DB_QUERY_DURATION.observe(elapsed)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def instrument_engines():
+    """
+    Registra los eventos que miden las consultas de todos los engines (se puede llamar varias veces).
+    """
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """
+    Mide la duración de una etapa del procesamiento de datos.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PIPELINE_STAGE_DURATION.observe(time.perf_counter() - start, (stage,))
+
+
+def route_template(scope) -> str:
+    """
+    Devuelve la plantilla de la ruta que ha atendido la petición (/api/v1/users/{user_id}).
+
+    El router deja la ruta en el scope, pero en las rutas de un router incluido con prefijo su
+    plantilla no lleva el prefijo: se toma de los primeros segmentos de la URL, que son los que no
+    corresponden a la plantilla.
+    """
+    template = getattr(scope.get("route"), "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    if ":path}" in template:
+        return template
+    template_segments = template.count("/")
+    url_segments = scope["path"].split("/")[1:]
+    prefix = url_segments[:len(url_segments) - template_segments]
+    return "/" + "/".join(prefix) + template if prefix else template
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI que mide las peticiones HTTP y sus consultas a la base de datos.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        HTTP_REQUESTS_IN_FLIGHT.inc((method,))
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec((method,))
+            _request_stats.reset(token)
+            route = route_template(scope)
+            HTTP_REQUESTS.inc((method, route, str(status)))
+            HTTP_REQUEST_DURATION.observe(elapsed, (method, route))
+            HTTP_REQUEST_DB_QUERIES.observe(stats.queries, (method, route))
+            HTTP_REQUEST_DB_DURATION.observe(stats.seconds, (method, route))
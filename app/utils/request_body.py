@@ -0,0 +1,74 @@
+"""
+Utilidades para leer cuerpos de petición con varios elementos.
+"""
+
+import json
+from collections import Counter
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+def parse_json_items(body: bytes, content_type: str) -> list:
+    """
+    Convierte el cuerpo de una petición con varios elementos (array JSON o NDJSON) en una lista de elementos.
+
+    Raises:
+        HTTPException: Si el cuerpo no es un array JSON ni NDJSON válido.
+    """
+    try:
+        if "ndjson" in content_type or "jsonlines" in content_type:
+            return [json.loads(line) for line in body.splitlines() if line.strip()]
+        items = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid batch body: {e}") from e
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Batch body must be a JSON array or NDJSON")
+    return items
+
+
+async def read_json_items(request: Request) -> list:
+    """
+    Lee el cuerpo de una petición con varios elementos (array JSON o NDJSON, según su Content-Type).
+    """
+    return parse_json_items(await request.body(), request.headers.get("content-type", ""))
+
+
+def validate_items(items: list, schema) -> tuple[list[dict], list[int], list]:
+    """
+    Valida cada elemento con un esquema de Pydantic (o un tipo, como int).
+
+    Returns:
+        tuple: Resultado de cada elemento (status "invalid" para los que no son válidos), posiciones
+        de los elementos válidos y sus valores (los modelos de Pydantic se convierten a dict).
+    """
+    adapter = TypeAdapter(schema)
+    results = []
+    indexes = []
+    valid = []
+    for index, item in enumerate(items):
+        try:
+            value = adapter.validate_python(item)
+        except ValidationError as e:
+            results.append({"index": index, "status": "invalid", "detail": str(e)})
+            continue
+        results.append({"index": index})
+        indexes.append(index)
+        valid.append(value.model_dump() if isinstance(value, BaseModel) else value)
+    return results, indexes, valid
+
+
+def bulk_response(results: list[dict], indexes: list[int], processed: list[dict]) -> dict:
+    """
+    Une los resultados de la validación con los del procesamiento de los elementos válidos.
+
+    Returns:
+        dict: Número de elementos, recuento por estado y resultado de cada elemento en el orden de entrada.
+    """
+    for index, result in zip(indexes, processed):
+        results[index].update(result)
+    return {
+        "total": len(results),
+        "counts": dict(Counter(result["status"] for result in results)),
+        "items": results
+    }
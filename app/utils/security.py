@@ -1,7 +1,26 @@
+"""
+Hash y verificación de contraseñas con bcrypt.
+
+bcrypt tarda del orden de cientos de milisegundos por contraseña a propósito, así que desde el
+código asíncrono se usan hash_password_async y verify_password_async, que lo ejecutan en un pool
+de hilos acotado en lugar de bloquear el bucle de eventos (la extensión de bcrypt libera el GIL,
+por lo que los hilos trabajan en paralelo).
+
+    BCRYPT_ROUNDS           Factor de coste de bcrypt (log2 de las iteraciones). Por defecto 12.
+    PASSWORD_HASH_WORKERS   Hilos del pool de hash. Por defecto el número de CPUs (máximo 4).
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
 # Crear el contexto de hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 
 def hash_password(password: str) -> str:
     """
@@ -14,3 +33,49 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Verifica si una contraseña en texto plano coincide con una contraseña hasheada.
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+_hash_executor = None
+
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """
+    Devuelve el pool de hilos de hash compartido, creándolo la primera vez.
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+    return _hash_executor
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hashea una contraseña en el pool de hash sin bloquear el bucle de eventos.
+    """
+    return await asyncio.get_running_loop().run_in_executor(get_hash_executor(), hash_password, password)
+
+
+async def hash_passwords_async(passwords: list[str]) -> list[str]:
+    """
+    Hashea varias contraseñas en paralelo en el pool de hash, en el mismo orden.
+    """
+    return list(await asyncio.gather(*(hash_password_async(password) for password in passwords)))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifica una contraseña en el pool de hash sin bloquear el bucle de eventos.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        get_hash_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+def close_hash_executor():
+    """
+    Detiene el pool de hash compartido, si existe, esperando a los hash en curso.
+    """
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
@@ -0,0 +1,73 @@
+"""
+Benchmark de la asignación de políticas a un rol: consultas a la base de datos con una consulta
+por ID (implementación anterior) frente a la resolución por lotes con IN.
+
+Uso:
+    python -m benchmarks.bench_association_resolver
+"""
+
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import get_base
+from app.models.data_product import DataProduct  # noqa: F401  (registra los modelos de las relaciones)
+from app.models.domain import Domain  # noqa: F401
+from app.models.policy import Policy
+from app.models.role import Role
+from app.models.user import User  # noqa: F401
+from app.service.association_resolver import resolve_associations
+
+SIZES = [10, 100, 500, 2_000]
+
+
+def legacy_resolve(db, model, ids: list[int]) -> list:
+    """
+    Resolución anterior: una consulta por ID.
+    """
+    found = []
+    for object_id in ids:
+        obj = db.get(model, object_id)
+        if obj:
+            found.append(obj)
+    return found
+
+
+def measure(session_factory, engine, resolve, size: int) -> tuple[int, float]:
+    """
+    Crea un rol con size políticas y devuelve el número de consultas y el tiempo empleado.
+    """
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    db = session_factory()
+    event.listen(engine, "before_cursor_execute", listener)
+    start = time.perf_counter()
+    role = Role(name="bench", description="bench")
+    role.policies = resolve(db, Policy, list(range(1, size + 1)))
+    db.add(role)
+    db.flush()
+    elapsed = time.perf_counter() - start
+    event.remove(engine, "before_cursor_execute", listener)
+    db.rollback()
+    db.close()
+    return len(statements), elapsed
+
+
+def main():
+    engine = create_engine("sqlite://")
+    get_base().metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        db.add_all([Policy(name=f"policy{i}", description="bench") for i in range(max(SIZES))])
+        db.commit()
+
+    print(f"{'ids':>6} {'consultas antes':>16} {'consultas ahora':>16} {'antes (ms)':>11} {'ahora (ms)':>11}")
+    for size in SIZES:
+        legacy_queries, legacy_time = measure(session_factory, engine, legacy_resolve, size)
+        queries, elapsed = measure(session_factory, engine, resolve_associations, size)
+        print(f"{size:>6} {legacy_queries:>16} {queries:>16} {legacy_time * 1000:11.2f} {elapsed * 1000:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Prueba de carga de la capa de base de datos: peticiones concurrentes a un endpoint que lee un
+usuario con sesiones síncronas dentro de una ruta async (implementación anterior, bloquea el bucle
+de eventos en cada consulta) frente a sesiones asíncronas con run_in_session.
+
+Por defecto usa un archivo SQLite y simula el tiempo de ida y vuelta al servidor con una función
+SQL que espera ROUND_TRIP_MS milisegundos en el hilo de la conexión (en el driver asíncrono ese hilo
+no es el del bucle de eventos). Con BENCH_DATABASE_URL se puede medir contra un servidor real, por
+ejemplo MySQL.
+
+Uso:
+    python -m benchmarks.bench_async_db
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config.database import create_async_db_engine, load_settings, run_in_session
+from app.models.base import get_base
+from app.models.data_product import DataProduct  # noqa: F401  (registra los modelos de las relaciones)
+from app.models.domain import Domain  # noqa: F401
+from app.models.policy import Policy  # noqa: F401
+from app.models.response_schemas import UserRead
+from app.models.user import User
+from app.service.user_service import get_user
+
+CONCURRENCY = [1, 10, 50]
+REQUESTS = 200
+USERS = 100
+ROUND_TRIP_MS = 5
+
+
+def register_round_trip(engine):
+    """
+    Registra en cada conexión SQLite la función round_trip(), que espera ROUND_TRIP_MS milisegundos.
+    """
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, _record):
+        dbapi_connection.create_function("round_trip", 0, lambda: time.sleep(ROUND_TRIP_MS / 1000))
+
+
+def read_user_with_round_trip(db: Session, user_id: int):
+    """
+    Lee un usuario y, con SQLite, simula la espera de red de una consulta a un servidor.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        db.execute(text("SELECT round_trip()"))
+    return get_user(db, user_id)
+
+
+def build_app(url: str) -> FastAPI:
+    """
+    Aplicación con el mismo endpoint por el camino síncrono y por el asíncrono.
+    """
+    settings = load_settings()
+    sync_engine = create_engine(url, pool_size=max(CONCURRENCY), max_overflow=0)
+    async_engine = create_async_db_engine(url, {**settings, "pool_size": max(CONCURRENCY), "max_overflow": 0})
+    if sync_engine.dialect.name == "sqlite":
+        register_round_trip(sync_engine)
+        register_round_trip(async_engine.sync_engine)
+    SyncSession = sessionmaker(bind=sync_engine, autoflush=False)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    def get_sync_db():
+        with SyncSession() as db:
+            yield db
+
+    async def get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    bench_app = FastAPI()
+
+    @bench_app.get("/sync/users/{user_id}", response_model=UserRead)
+    async def read_user_sync(user_id: int, db: Session = Depends(get_sync_db)):
+        return UserRead.model_validate(read_user_with_round_trip(db, user_id))
+
+    @bench_app.get("/async/users/{user_id}", response_model=UserRead)
+    async def read_user_async(user_id: int, db: AsyncSession = Depends(get_async_db)):
+        return await run_in_session(db, read_user_with_round_trip, user_id, schema=UserRead)
+
+    return bench_app
+
+
+async def run_load(client: httpx.AsyncClient, path: str, concurrency: int) -> float:
+    """
+    Lanza REQUESTS peticiones con concurrency peticiones a la vez y devuelve las peticiones por segundo.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request(index: int):
+        async with semaphore:
+            response = await client.get(f"{path}/{index % USERS + 1}")
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request(index) for index in range(REQUESTS)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def main():
+    url = os.getenv("BENCH_DATABASE_URL") or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    engine = create_engine(url)
+    get_base().metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all([User(name=f"user{i}", email=f"user{i}@example.com", hashed_password="x", domain_id=1) for i in range(USERS)])
+        db.commit()
+
+    transport = httpx.ASGITransport(app=build_app(url))
+    print(f"{REQUESTS} peticiones por prueba contra {engine.url.render_as_string(hide_password=True)}")
+    if engine.dialect.name == "sqlite":
+        print(f"Ida y vuelta simulada de {ROUND_TRIP_MS} ms por petición")
+    print(f"{'concurrencia':>12} {'síncrono (req/s)':>17} {'asíncrono (req/s)':>18}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for concurrency in CONCURRENCY:
+            sync_rate = await run_load(client, "/sync/users", concurrency)
+            async_rate = await run_load(client, "/async/users", concurrency)
+            print(f"{concurrency:>12} {sync_rate:17.0f} {async_rate:18.0f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
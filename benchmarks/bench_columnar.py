@@ -0,0 +1,71 @@
+"""
+Benchmark del motor columnar (NumPy) frente al motor de diccionarios para transformar y combinar datos.
+
+Uso:
+    python -m benchmarks.bench_columnar
+"""
+
+import time
+
+from app.data_products.product_dashboard.columnar import combine_columnar
+from app.data_products.product_dashboard.transformers import transform_and_combine
+
+SIZES = [100, 1_000, 10_000, 100_000]
+REPEAT = 3
+
+
+def build_sources(size: int) -> tuple[dict, dict, dict, dict]:
+    """
+    Genera datos de entrada de SAP, GMAO, CLEAR y BIM con size líneas de trabajo y size productos.
+    """
+    sap = {"employee_costs": "25000€", "sap_plant": "Zona Franca"}
+    gmao = {
+        "gmao_location": "Zona Franca",
+        "gmao_worklines": [
+            {
+                "workline_id": f"L{i}",
+                "workline_title": f"Linea {i}",
+                "electric_usage": f"{1000 + i % 500} kW",
+                "downtime_total": str(i % 120)
+            }
+            for i in range(size)
+        ]
+    }
+    clear = {
+        "line_id": "L0",
+        "input_material": "50 Toneladas",
+        "output_products": [
+            {"product_type": f"Material {i % 26}", "product_amount": str(i % 40)}
+            for i in range(size)
+        ]
+    }
+    bim = {
+        "plant_location": "Zona Franca",
+        "bim_worklines": [{"ID_Linea": f"L{i}", "line_name": f"Linea {i}"} for i in range(size - 1, -1, -1)]
+    }
+    return sap, gmao, clear, bim
+
+
+def best_time(function, *args) -> float:
+    """
+    Devuelve el mejor tiempo en segundos de REPEAT ejecuciones.
+    """
+    timings = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'lineas':>8} {'dict (ms)':>12} {'columnar (ms)':>14} {'x':>6}")
+    for size in SIZES:
+        sources = build_sources(size)
+        dict_time = best_time(transform_and_combine, *sources)
+        columnar_time = best_time(combine_columnar, *sources)
+        print(f"{size:>8} {dict_time * 1000:12.2f} {columnar_time * 1000:14.2f} {dict_time / columnar_time:6.2f}")
+
+
+if __name__ == "__main__":
+    main()
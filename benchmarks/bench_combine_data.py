@@ -0,0 +1,90 @@
+"""
+Benchmark de combine_data: cruce de líneas de trabajo por índice hash frente al recorrido
+lineal por cada línea de BIM (implementación anterior, O(n²)).
+
+Uso:
+    python -m benchmarks.bench_combine_data
+"""
+
+import time
+
+from app.data_products.product_dashboard.transformers import combine_data
+
+SIZES = [10, 100, 1_000, 10_000, 100_000]
+# La implementación cuadrática solo se mide hasta este tamaño para que el benchmark termine
+LEGACY_MAX_SIZE = 10_000
+
+
+def build_sources(size: int) -> tuple[dict, dict, dict, dict]:
+    """
+    Genera datos transformados de SAP, GMAO, CLEAR y BIM con el número de líneas indicado.
+    """
+    line_ids = [f"L{i}" for i in range(size)]
+    sap = {"Planta": "Zona Franca", "Gasto_trabajadores": 25000.0}
+    gmao = {
+        "Planta": "Zona Franca",
+        "Lineas_de_trabajo": [
+            {"ID_Linea": line_id, "consumo_electrico": 1200.0, "tiempo_de_paro": 90.0}
+            for line_id in reversed(line_ids)
+        ]
+    }
+    clear = {
+        "Planta": "",
+        "Lineas_de_trabajo": [
+            {"ID_Linea": line_id, "entrada_material": 50.0, "producto_Salida": []}
+            for line_id in reversed(line_ids)
+        ]
+    }
+    bim = {
+        "Planta": "Zona Franca",
+        "Lineas_de_trabajo": [
+            {"ID_Linea": line_id, "nombre_linea_de_trabajo": f"Linea {line_id}"}
+            for line_id in line_ids
+        ]
+    }
+    return sap, gmao, clear, bim
+
+
+def legacy_join(gmao_data: dict, clear_data: dict, bim_data: dict) -> list:
+    """
+    Cruce original de combine_data: un next(...) sobre GMAO y CLEAR por cada línea de BIM.
+    """
+    lines = []
+    for bim_line in bim_data["Lineas_de_trabajo"]:
+        line_id = bim_line["ID_Linea"]
+        gmao_line = next((line for line in gmao_data["Lineas_de_trabajo"] if line["ID_Linea"] == line_id), None)
+        clear_line = next((line for line in clear_data["Lineas_de_trabajo"] if line["ID_Linea"] == line_id), None)
+        lines.append({
+            "ID_Linea": line_id,
+            "nombre_linea_de_trabajo": bim_line["nombre_linea_de_trabajo"],
+            "consumo_electrico": gmao_line["consumo_electrico"] if gmao_line else 0,
+            "tiempo_de_paro": gmao_line["tiempo_de_paro"] if gmao_line else 0,
+            "entrada_material": clear_line["entrada_material"] if clear_line else 0,
+            "producto_Salida": clear_line["producto_Salida"] if clear_line else []
+        })
+    return lines
+
+
+def measure(function, *args) -> float:
+    """
+    Devuelve el tiempo de ejecución en segundos de una llamada.
+    """
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f"{'lineas':>8} {'hash (ms)':>12} {'anterior (ms)':>14}")
+    for size in SIZES:
+        sap, gmao, clear, bim = build_sources(size)
+        hashed = measure(combine_data, sap, gmao, clear, bim) * 1000
+        if size <= LEGACY_MAX_SIZE:
+            legacy = f"{measure(legacy_join, gmao, clear, bim) * 1000:14.2f}"
+        else:
+            legacy = f"{'-':>14}"
+        print(f"{size:>8} {hashed:12.2f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Coste del middleware de métricas: latencia media de un endpoint trivial con y sin MetricsMiddleware,
+y de la generación del texto de /metrics con muchas series.
+
+Uso:
+    python -m benchmarks.bench_metrics
+"""
+
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.utils.metrics import HTTP_REQUEST_DURATION, MetricsMiddleware, render_metrics, reset_metrics
+
+REQUESTS = 5000
+ROUTES = 200
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    """
+    Aplicación con un único endpoint que no hace nada.
+    """
+    bench_app = FastAPI()
+
+    @bench_app.get("/items/{item_id}")
+    async def read_item(item_id: int):
+        return {"id": item_id}
+
+    if with_metrics:
+        bench_app.add_middleware(MetricsMiddleware)
+    return bench_app
+
+
+async def run_load(bench_app: FastAPI) -> float:
+    """
+    Lanza REQUESTS peticiones seguidas y devuelve la latencia media en microsegundos.
+    """
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for index in range(100):
+            await client.get(f"/items/{index}")
+        start = time.perf_counter()
+        for index in range(REQUESTS):
+            await client.get(f"/items/{index}")
+        return (time.perf_counter() - start) / REQUESTS * 1e6
+
+
+async def main():
+    without = await run_load(build_app(False))
+    with_metrics = await run_load(build_app(True))
+    print(f"{REQUESTS} peticiones: sin métricas {without:.1f} µs/petición, con métricas {with_metrics:.1f} µs/petición "
+          f"(+{with_metrics - without:.1f} µs)")
+
+    reset_metrics()
+    for route in range(ROUTES):
+        for _ in range(10):
+            HTTP_REQUEST_DURATION.observe(0.01, ("GET", f"/route/{route}"))
+    start = time.perf_counter()
+    text = render_metrics()
+    print(f"/metrics con {ROUTES} rutas: {len(text.splitlines())} líneas en {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
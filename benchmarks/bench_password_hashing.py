@@ -0,0 +1,82 @@
+"""
+Prueba de carga del hash de contraseñas: latencia de un endpoint que no tiene nada que ver
+(GET /api/v1/database/pool) mientras se crean usuarios en paralelo, con el hash en el bucle de
+eventos (implementación anterior) y en el pool de hash.
+
+Uso:
+    python -m benchmarks.bench_password_hashing
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config.database import get_db
+from app.main import app
+from app.models.base import get_base
+from app.routers import user_router
+from app.utils.security import BCRYPT_ROUNDS, hash_password, hash_password_async
+
+USERS = 16
+
+
+async def blocking_hash(password: str) -> str:
+    """
+    Hash anterior: bcrypt se ejecuta directamente en el bucle de eventos.
+    """
+    return hash_password(password)
+
+
+async def run_load(client: httpx.AsyncClient, prefix: str) -> list[float]:
+    """
+    Crea USERS usuarios en paralelo y mide la latencia de las peticiones al endpoint del pool hasta que terminan.
+    """
+    async def create(index: int):
+        await client.post("/api/v1/users/", json={
+            "name": f"{prefix}{index}", "email": f"{prefix}{index}@example.com", "plain_password": "secret", "domain_id": 1
+        })
+
+    creations = asyncio.gather(*(create(index) for index in range(USERS)))
+    latencies = []
+    while not creations.done():
+        start = time.perf_counter()
+        await client.get("/api/v1/database/pool")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0.005)
+    await creations
+    return latencies
+
+
+async def main():
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}", connect_args={"check_same_thread": False},
+                           pool_size=USERS, max_overflow=USERS)
+    get_base().metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    print(f"BCRYPT_ROUNDS={BCRYPT_ROUNDS}, {USERS} usuarios creados en paralelo")
+    print(f"{'hash':>14} {'peticiones':>11} {'p50 (ms)':>9} {'p95 (ms)':>9} {'max (ms)':>9}")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, hasher in (("bucle eventos", blocking_hash), ("pool de hash", hash_password_async)):
+            user_router.hash_password_async = hasher
+            latencies = sorted(await run_load(client, label.replace(" ", "")))
+            print(
+                f"{label:>14} {len(latencies):>11} {statistics.median(latencies) * 1000:9.1f} "
+                f"{latencies[int(len(latencies) * 0.95)] * 1000:9.1f} {latencies[-1] * 1000:9.1f}"
+            )
+    user_router.hash_password_async = hash_password_async
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,80 @@
+"""
+Benchmark de la serialización de una página de usuarios con sus roles: objetos ORM con carga
+perezosa y jsonable_encoder (implementación anterior) frente a selectinload y el esquema UserRead.
+
+Uso:
+    python -m benchmarks.bench_serialization
+"""
+
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import get_base
+from app.models.data_product import DataProduct  # noqa: F401  (registra los modelos de las relaciones)
+from app.models.domain import Domain  # noqa: F401
+from app.models.policy import Policy  # noqa: F401
+from app.models.response_schemas import UserRead
+from app.models.role import Role
+from app.models.user import User
+from app.service.user_service import list_users
+
+PAGE_SIZES = [100, 1_000, 5_000]
+USERS = 5_000
+
+
+def legacy_page(db, limit: int) -> list:
+    """
+    Serialización anterior: objetos ORM y relaciones cargadas de forma perezosa, fila a fila.
+    """
+    users = db.scalars(select(User).order_by(User.id).limit(limit)).all()
+    return [{**jsonable_encoder(user), "roles": jsonable_encoder(user.roles)} for user in users]
+
+
+def schema_page(db, limit: int) -> list:
+    """
+    Serialización actual: página con selectinload y esquema de respuesta.
+    """
+    users, _ = list_users(db, limit=limit)
+    return TypeAdapter(list[UserRead]).dump_python(users, mode="json")
+
+
+def measure(session_factory, engine, page, limit: int) -> tuple[int, float]:
+    """
+    Devuelve el número de consultas y el tiempo de serializar una página de limit usuarios.
+    """
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    with session_factory() as db:
+        event.listen(engine, "before_cursor_execute", listener)
+        start = time.perf_counter()
+        page(db, limit)
+        elapsed = time.perf_counter() - start
+        event.remove(engine, "before_cursor_execute", listener)
+    return len(statements), elapsed
+
+
+def main():
+    engine = create_engine("sqlite://")
+    get_base().metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as db:
+        roles = [Role(name=f"role{i}", description="bench") for i in range(10)]
+        db.add_all([
+            User(name=f"user{i}", email=f"user{i}@example.com", hashed_password="x", domain_id=1, roles=roles[i % 10:i % 10 + 2])
+            for i in range(USERS)
+        ])
+        db.commit()
+
+    print(f"{'usuarios':>9} {'consultas antes':>16} {'consultas ahora':>16} {'antes (ms)':>11} {'ahora (ms)':>11} {'usuarios/s ahora':>17}")
+    for limit in PAGE_SIZES:
+        legacy_queries, legacy_time = measure(session_factory, engine, legacy_page, limit)
+        queries, elapsed = measure(session_factory, engine, schema_page, limit)
+        print(f"{limit:>9} {legacy_queries:>16} {queries:>16} {legacy_time * 1000:11.1f} {elapsed * 1000:11.1f} {limit / elapsed:17.0f}")
+
+
+if __name__ == "__main__":
+    main()
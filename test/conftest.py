@@ -1,17 +1,55 @@
+import os
+import sqlite3
+import tempfile
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from app.models.base import get_base
+from sqlalchemy.pool import NullPool
+
+# Las pruebas no arrancan los workers de la cola de salida ni escriben en la cola del proyecto
+os.environ.setdefault("OUTBOX_WORKERS", "0")
+os.environ.setdefault("OUTBOX_PATH", os.path.join(tempfile.mkdtemp(), "outbox.db"))
+# El lifespan comprueba la versión del esquema de la base de datos principal: la de pruebas
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test.db")
+
 from app.main import app
-from app.config.database import get_db
+from app.data_products.product_dashboard import dashboard_router
+from app.data_products.product_dashboard.archive import SegmentArchive
+from app.data_products.product_dashboard.outbox import Outbox
+from app.config.database import get_db, get_read_db, get_async_db, get_async_read_db
+from app.migrations.runner import migrate
+from app.models.user import User
+from app.service.authorization_cache import cache
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"  # Usa SQLite para pruebas
 
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-get_base().metadata.create_all(bind=engine)
+# Sin pool: cada módulo de pruebas usa su propio bucle de eventos en el TestClient
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+# Base de datos plantilla con todas las migraciones aplicadas: antes de cada prueba se copia sobre
+# test.db con la API de backup de SQLite en lugar de borrar y volver a crear las tablas
+TEMPLATE_PATH = os.path.join(tempfile.mkdtemp(), "template.db")
+migrate(create_engine(f"sqlite:///{TEMPLATE_PATH}", poolclass=NullPool))
+template = sqlite3.connect(TEMPLATE_PATH, check_same_thread=False)
+
+
+def restore_template():
+    """
+    Sustituye el contenido de test.db por el de la plantilla.
+    """
+    with engine.connect() as connection:
+        template.backup(connection.connection.driver_connection)
+
+
+restore_template()
+
 
 @pytest.fixture(scope="module")
 def client():
@@ -22,14 +60,97 @@ def client():
         finally:
             db.close()
 
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     with TestClient(app) as c:
         yield c
 
+@pytest.fixture
+def request_engine():
+    """
+    Engine síncrono bajo las sesiones asíncronas de las peticiones, para escuchar sus sentencias.
+    """
+    return async_engine.sync_engine
+
+@pytest.fixture
+def db():
+    """
+    Sesión de la base de datos de pruebas.
+    """
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
 @pytest.fixture(autouse=True)
 def clean_tables():
     """
-    Limpia las tablas de la base de datos antes de cada prueba.
+    Restaura la base de datos vacía de la plantilla antes de cada prueba.
+    """
+    restore_template()
+    cache.clear()
+
+def make_combined_input(plant: str, line_id: str = "L1") -> dict:
+    """
+    Devuelve un CombinedDataInput de ejemplo para una planta.
+    """
+    return {
+        "sap": {"details": {"employee_costs": "25000€", "sap_plant": plant}},
+        "gmao": {"details": {
+            "gmao_location": plant,
+            "gmao_worklines": [{
+                "workline_id": line_id,
+                "workline_title": "Tratamiento industriales y otros",
+                "electric_usage": "1200 kW",
+                "downtime_total": "90"
+            }]
+        }},
+        "clear": {"details": {
+            "line_id": line_id,
+            "input_material": "50 Toneladas",
+            "output_products": [{"product_type": "Material A", "product_amount": "30"}]
+        }},
+        "bim": {"details": {
+            "plant_location": plant,
+            "bim_worklines": [{"ID_Linea": line_id, "line_name": "Tratamiento industriales y otros"}]
+        }}
+    }
+
+@pytest.fixture
+def combined_input():
+    """
+    Constructor de CombinedDataInput de ejemplo (ver make_combined_input).
+    """
+    return make_combined_input
+
+@pytest.fixture
+def add_users(db):
+    """
+    Crea usuarios user0, user1... repartidos entre los dominios 1 a domains.
+    """
+    def add(count: int, domains: int = 1):
+        db.add_all([
+            User(name=f"user{i}", email=f"user{i}@example.com", hashed_password="x", domain_id=1 + i % domains)
+            for i in range(count)
+        ])
+        db.commit()
+    return add
+
+@pytest.fixture
+def outbox(monkeypatch, tmp_path):
+    """
+    Sustituye la cola de salida y el archivo histórico por unos temporales.
     """
-    get_base().metadata.drop_all(bind=engine)
-    get_base().metadata.create_all(bind=engine)
+    test_outbox = Outbox(str(tmp_path / "outbox.db"))
+    test_archive = SegmentArchive(str(tmp_path / "archive"))
+    monkeypatch.setattr(dashboard_router, "get_outbox", lambda: test_outbox)
+    monkeypatch.setattr(dashboard_router, "get_archive", lambda: test_archive)
+    yield test_outbox
+    test_outbox.close()
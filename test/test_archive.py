@@ -0,0 +1,192 @@
+"""
+Módulo de pruebas para el archivo histórico de segmentos comprimidos.
+"""
+
+import asyncio
+import multiprocessing
+from datetime import datetime
+
+import pytest
+
+from app.data_products.product_dashboard import archive as archive_module
+from app.data_products.product_dashboard.archive import SegmentArchive, create_retention_task, fcntl
+
+
+def archived_data(timestamp: str, plant: str) -> dict:
+    """
+    Devuelve unos datos combinados mínimos para archivar.
+    """
+    return {
+        "metadata": {"timestamp": timestamp, "version": "1.0"},
+        "Planta": plant,
+        "Lineas_de_trabajo": [{"ID_Linea": "L1", "consumo_electrico": 1200.0}],
+        "Gasto_trabajadores": 25000.0
+    }
+
+
+def test_same_second_payloads_are_kept(tmp_path):
+    """
+    Prueba que los datos con el mismo timestamp no se sobrescriben.
+    """
+    archive = SegmentArchive(str(tmp_path))
+    archive.append_many([
+        archived_data("2024-05-31T13:44:26", "Zona Franca"),
+        archived_data("2024-05-31T13:44:26", "Martorell")
+    ])
+
+    found = archive.find(start="2024-05-31T13:44:26", end="2024-05-31T13:44:26")
+    assert [data["Planta"] for data in found] == ["Zona Franca", "Martorell"]
+
+
+def test_find_by_range_and_plant(tmp_path):
+    """
+    Prueba la búsqueda por rango de timestamps y por planta.
+    """
+    archive = SegmentArchive(str(tmp_path))
+    for day in range(1, 6):
+        archive.append(archived_data(f"2024-05-0{day}T10:00:00", "Zona Franca" if day % 2 else "Martorell"))
+
+    found = archive.find(start="2024-05-02T00:00:00", end="2024-05-04T10:00:00")
+    assert [data["metadata"]["timestamp"][:10] for data in found] == ["2024-05-02", "2024-05-03", "2024-05-04"]
+    found = archive.find(plant="Zona Franca", start="2024-05-02T00:00:00")
+    assert [data["metadata"]["timestamp"][:10] for data in found] == ["2024-05-03", "2024-05-05"]
+    assert archive.find(plant="Sagunto") == []
+
+
+def test_segments_rotate_and_index_is_reloaded(tmp_path):
+    """
+    Prueba que los segmentos rotan al superar el tamaño máximo y que el índice se recupera al reabrir.
+    """
+    archive = SegmentArchive(str(tmp_path), max_segment_bytes=200)
+    for minute in range(10):
+        archive.append(archived_data(f"2024-05-31T13:{minute:02d}:00", "Zona Franca"))
+    assert len(archive.segments()) > 1
+
+    reopened = SegmentArchive(str(tmp_path), max_segment_bytes=200)
+    found = reopened.find(plant="Zona Franca")
+    assert len(found) == 10
+    assert found[-1]["metadata"]["timestamp"] == "2024-05-31T13:09:00"
+
+
+def test_retention_removes_old_segments(tmp_path):
+    """
+    Prueba que la retención borra los segmentos cerrados con datos antiguos y conserva el activo.
+    """
+    archive = SegmentArchive(str(tmp_path), max_segment_bytes=1)
+    archive.append(archived_data("2024-01-01T00:00:00", "Zona Franca"))
+    archive.append(archived_data("2024-05-30T00:00:00", "Zona Franca"))
+    archive.append(archived_data("2024-05-31T00:00:00", "Zona Franca"))
+
+    archive.retention_days = 30
+    expired = archive.apply_retention(now=datetime(2024, 6, 1))
+    assert expired == [1]
+    assert [data["metadata"]["timestamp"][:10] for data in archive.find()] == ["2024-05-30", "2024-05-31"]
+
+
+def test_index_keeps_plants_with_tabs_and_reads_old_indexes(tmp_path):
+    """
+    Prueba que el índice se recupera con plantas que tienen tabuladores o saltos de línea, y que
+    se siguen leyendo los índices antiguos separados por tabuladores.
+    """
+    archive = SegmentArchive(str(tmp_path))
+    archive.append(archived_data("2024-05-31T10:00:00", "Zona\tFranca"))
+    archive.append(archived_data("2024-05-31T11:00:00", "Zona\nFranca"))
+    (tmp_path / "segment-00000001.idx").write_text(
+        (tmp_path / "segment-00000001.idx").read_text(encoding="utf-8")
+        + f"2024-05-31T12:00:00\tMart\torell\t{archive.find_entries()[0].offset}\t{archive.find_entries()[0].length}\n",
+        encoding="utf-8"
+    )
+
+    reopened = SegmentArchive(str(tmp_path))
+    assert [entry.plant for entry in reopened.find_entries()] == ["Zona\tFranca", "Zona\nFranca", "Mart\torell"]
+    assert [data["Planta"] for data in reopened.find(plant="Zona\nFranca")] == ["Zona\nFranca"]
+
+
+def test_reads_do_not_race_with_retention(tmp_path):
+    """
+    Prueba que las entradas de un segmento borrado por la retención después de buscarlas se omiten
+    en find y dan FileNotFoundError en read, en lugar de fallar a mitad de la lectura.
+    """
+    archive = SegmentArchive(str(tmp_path), max_segment_bytes=1)
+    archive.append(archived_data("2024-01-01T00:00:00", "Zona Franca"))
+    archive.append(archived_data("2024-05-31T00:00:00", "Zona Franca"))
+    archive.retention_days = 30
+    old_entry = archive.find_entries()[0]
+
+    # La retención borra el segmento antiguo justo después de buscar las entradas
+    open_segments = archive._open_segments
+
+    def open_after_retention(segments):
+        archive.apply_retention(now=datetime(2024, 6, 1))
+        return open_segments(segments)
+
+    archive._open_segments = open_after_retention
+    assert len(archive.find_entries()) == 2
+    assert [data["metadata"]["timestamp"][:10] for data in archive.find()] == ["2024-05-31"]
+    with pytest.raises(FileNotFoundError):
+        archive.read(old_entry)
+
+
+def test_retention_task_runs_at_startup(tmp_path, monkeypatch):
+    """
+    Prueba que la tarea de retención borra los segmentos antiguos al arrancar, sin esperar a una rotación.
+    """
+    archive = SegmentArchive(str(tmp_path), max_segment_bytes=1)
+    archive.append(archived_data("2024-01-01T00:00:00", "Zona Franca"))
+    archive.append(archived_data(datetime.now().strftime("%Y-%m-%dT%H:%M:%S"), "Zona Franca"))
+    assert archive.segments() == [1, 2]
+    archive.retention_days = 30
+    monkeypatch.setattr(archive_module, "_archive", archive)
+
+    async def run():
+        monkeypatch.delenv("ARCHIVE_RETENTION_DAYS", raising=False)
+        assert create_retention_task() is None
+        monkeypatch.setenv("ARCHIVE_RETENTION_DAYS", "30")
+        task = create_retention_task(interval=60)
+        for _ in range(100):
+            if archive.segments() != [1, 2]:
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(run())
+    assert archive.segments() == [2]
+
+
+def append_from_worker(directory: str, plant: str, count: int):
+    """
+    Añade count datos desde otro proceso, como un worker de uvicorn con su propio SegmentArchive.
+    """
+    archive = SegmentArchive(directory, max_segment_bytes=600)
+    for minute in range(count):
+        archive.append(archived_data(f"2024-05-31T13:{minute:02d}:00", plant))
+    archive.close()
+
+
+@pytest.mark.skipif(fcntl is None, reason="El bloqueo entre procesos necesita fcntl")
+def test_several_processes_share_the_archive(tmp_path):
+    """
+    Prueba que varios procesos pueden escribir a la vez en el mismo directorio sin corromper los
+    offsets del índice, y que cada uno ve las entradas de los demás.
+    """
+    archive = SegmentArchive(str(tmp_path), max_segment_bytes=600)
+    context = multiprocessing.get_context("fork")
+    workers = [
+        context.Process(target=append_from_worker, args=(str(tmp_path), plant, 30))
+        for plant in ["Zona Franca", "Martorell", "Sagunto"]
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0, 0, 0]
+
+    archive.append(archived_data("2024-05-31T14:00:00", "Zona Franca"))
+    for reader in [archive, SegmentArchive(str(tmp_path))]:
+        found = reader.find()
+        assert len(found) == 91
+        for plant in ["Zona Franca", "Martorell", "Sagunto"]:
+            assert [data["metadata"]["timestamp"] for data in reader.find(plant=plant)][:30] == [
+                f"2024-05-31T13:{minute:02d}:00" for minute in range(30)
+            ]
+    assert len(archive.segments()) > 1
@@ -0,0 +1,66 @@
+"""
+Módulo de pruebas para la resolución de asociaciones por lotes.
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app.models.policy import Policy
+from app.models.role import Role
+from app.service.association_resolver import load_by_ids
+from app.service.role_service import create_role
+
+
+def test_load_by_ids_uses_one_query(db):
+    """
+    Prueba que los IDs se cargan con una sola consulta, en orden, sin repetidos y con los que faltan.
+    """
+    policies = [Policy(name=f"policy{i}", description="test") for i in range(5)]
+    db.add_all(policies)
+    db.commit()
+    ids = [policy.id for policy in policies]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(db.get_bind(), "before_cursor_execute", listener)
+    try:
+        found, missing = load_by_ids(db, Policy, [ids[3], 999, ids[0], ids[3]])
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", listener)
+
+    assert len(statements) == 1
+    assert [policy.name for policy in found] == ["policy3", "policy0"]
+    assert missing == [999]
+
+
+def test_create_role_rejects_missing_ids(db):
+    """
+    Prueba que al crear un rol con políticas que no existen se informa de los IDs que faltan y no se crea.
+    """
+    db.add_all([Policy(name="read", description="test"), Policy(name="write", description="test")])
+    db.commit()
+
+    with pytest.raises(ValueError, match=r"Policy ids not found: \[42\]"):
+        create_role(db, "editor", "test role", policy_ids=[1, 2, 42])
+    assert db.query(Role).count() == 0
+
+    role = create_role(db, "editor", "test role", policy_ids=[1, 2])
+    assert sorted(policy.name for policy in role.policies) == ["read", "write"]
+
+
+def test_update_with_missing_ids_returns_400(client):
+    """
+    Prueba que los endpoints responden 400 con los IDs que faltan y no cambian la asociación.
+    """
+    policy_id = client.post("/api/v1/policies/", json={"name": "read", "description": "test"}).json()["policy"]["id"]
+    role_id = client.post("/api/v1/roles/", json={"name": "editor", "description": "test", "policy_ids": [policy_id]}).json()["role"]["id"]
+
+    response = client.put(f"/api/v1/roles/{role_id}", json={"name": "renamed", "policy_ids": [policy_id, 999]})
+    assert response.status_code == 400
+    assert "999" in response.json()["detail"]
+    role = client.get(f"/api/v1/roles/{role_id}").json()
+    assert role["name"] == "editor"
+    assert [policy["id"] for policy in role["policies"]] == [policy_id]
+
+    response = client.post("/api/v1/roles/", json={"name": "other", "description": "test", "policy_ids": [999]})
+    assert response.status_code == 400
@@ -0,0 +1,141 @@
+"""
+Módulo de pruebas de la caché de autorización.
+"""
+
+import time
+
+import pytest
+from sqlalchemy import event, text
+
+from app.service import authorization_cache
+from app.service.authorization_cache import cache, cached, domain_key, invalidate_after_commit, user_key
+from app.utils.cache import LRUCache, SQLiteCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    """
+    Prueba que la LRU descarta la entrada menos usada al superar el máximo y las caducadas.
+    """
+    lru = LRUCache(max_entries=2, ttl=60)
+    lru.set("a", [1])
+    lru.set("b", [2])
+    assert lru.get("a") == [1]
+    lru.set("c", [3])
+    assert lru.get("b") is None
+    assert lru.get("a") == [1] and lru.get("c") == [3]
+
+    lru = LRUCache(ttl=0.01)
+    lru.set("a", [1])
+    time.sleep(0.02)
+    assert lru.get("a") is None
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    """
+    Prueba que dos cachés sobre el mismo archivo (como dos workers) ven las mismas escrituras e invalidaciones.
+    """
+    path = str(tmp_path / "auth_cache.db")
+    first, second = SQLiteCache(path, ttl=60), SQLiteCache(path, ttl=60)
+    first.set("user:1:policies", [1, 2])
+    assert second.get("user:1:policies") == [1, 2]
+    second.delete_many(["user:1:policies"])
+    assert first.get("user:1:policies") is None
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_value_loaded_before_invalidation_is_not_stored(backend, tmp_path, monkeypatch):
+    """
+    Prueba que si una clave se invalida mientras otra petición calcula su valor (con los datos
+    anteriores al commit), ese valor no se guarda; sí se guarda el calculado después.
+    """
+    if backend == "memory":
+        test_cache = LRUCache(ttl=60)
+        other_worker = test_cache
+    else:
+        test_cache = SQLiteCache(str(tmp_path / "auth_cache.db"), ttl=60)
+        other_worker = SQLiteCache(str(tmp_path / "auth_cache.db"), ttl=60)
+    monkeypatch.setattr(authorization_cache, "cache", test_cache)
+
+    def stale_load():
+        # Otro worker hace commit e invalida la clave mientras se consulta la base de datos
+        other_worker.delete_many([user_key(1)])
+        return [1]
+
+    assert cached(user_key(1), stale_load) == [1]
+    assert test_cache.get(user_key(1)) is None
+    assert cached(user_key(1), lambda: [1, 2]) == [1, 2]
+    assert test_cache.get(user_key(1)) == [1, 2]
+
+    def stale_load_during_clear():
+        other_worker.clear()
+        return [1]
+
+    test_cache.delete_many([user_key(1)])
+    assert cached(user_key(1), stale_load_during_clear) == [1]
+    assert test_cache.get(user_key(1)) is None
+    assert test_cache.set(user_key(1), [2], test_cache.generation(user_key(1)))
+    assert test_cache.get(user_key(1)) == [2]
+
+
+def test_invalidation_waits_for_commit(db):
+    """
+    Prueba que las claves marcadas se invalidan solo si la transacción hace commit.
+    """
+    cache.set(user_key(1), [1])
+    cache.set(domain_key(1), [1])
+
+    db.execute(text("SELECT 1"))
+    invalidate_after_commit(db, user_ids=[1])
+    assert cache.get(user_key(1)) == [1]
+    db.rollback()
+    db.execute(text("SELECT 1"))
+    db.commit()
+    assert cache.get(user_key(1)) == [1]
+
+    db.execute(text("SELECT 1"))
+    invalidate_after_commit(db, user_ids=[1])
+    db.commit()
+    assert cache.get(user_key(1)) is None
+    assert cache.get(domain_key(1)) == [1]
+
+
+def test_permissions_served_from_cache_and_invalidated(client, request_engine):
+    """
+    Prueba que la segunda lectura de los permisos no consulta la base de datos y que un cambio de
+    políticas del rol invalida la entrada del usuario.
+    """
+    client.post("/api/v1/policies/bulk", json=[{"name": "read", "description": "test"}, {"name": "write", "description": "test"}])
+    client.post("/api/v1/roles/", json={"name": "viewer", "description": "test", "policy_ids": [1]})
+    user_id = client.post("/api/v1/users/", json={
+        "name": "ana", "email": "ana@example.com", "plain_password": "secret", "domain_id": 1, "roles": [1]
+    }).json()["user"]["id"]
+    assert client.get(f"/api/v1/users/{user_id}/permissions").json()["policy_ids"] == [1]
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(request_engine, "before_cursor_execute", listener)
+    try:
+        assert client.get(f"/api/v1/users/{user_id}/permissions").json()["policy_ids"] == [1]
+    finally:
+        event.remove(request_engine, "before_cursor_execute", listener)
+    assert statements == []
+
+    client.put("/api/v1/roles/1", json={"policy_ids": [1, 2]})
+    assert client.get(f"/api/v1/users/{user_id}/permissions").json()["policy_ids"] == [1, 2]
+
+
+def test_domain_data_products_invalidated_by_data_product_writes(client):
+    """
+    Prueba que los cambios de dominios de un producto de datos invalidan los dominios de antes y de después.
+    """
+    client.post("/api/v1/domains/bulk", json=[{"name": "sales", "description": "test"}, {"name": "ops", "description": "test"}])
+    product_id = client.post("/api/v1/data_products/", json={"name": "orders", "domain_ids": [1]}).json()["data_product"]["id"]
+    assert client.get("/api/v1/domains/1/data_products").json()["data_product_ids"] == [product_id]
+    assert client.get("/api/v1/domains/2/data_products").json()["data_product_ids"] == []
+
+    client.put(f"/api/v1/data_products/{product_id}", json={"domain_ids": [2]})
+    assert client.get("/api/v1/domains/1/data_products").json()["data_product_ids"] == []
+    assert client.get("/api/v1/domains/2/data_products").json()["data_product_ids"] == [product_id]
+
+    client.request("DELETE", "/api/v1/domains/bulk", json=[2])
+    assert client.get("/api/v1/domains/2/data_products").status_code == 404
@@ -0,0 +1,88 @@
+"""
+Módulo de pruebas para los endpoints de creación, actualización y eliminación por lotes.
+"""
+
+import json
+
+from app.models.associations import role_policy_association
+from app.models.user import User
+from app.service.bulk_service import bulk_create
+from app.service.user_service import USER_ROLES
+
+
+def test_create_roles_bulk_ndjson(client):
+    """
+    Prueba la creación de roles por lotes en NDJSON, con un elemento inválido y una política inexistente.
+    """
+    client.post("/api/v1/policies/bulk", json=[{"name": "read", "description": "test"}, {"name": "write", "description": "test"}])
+    body = "\n".join(json.dumps(item) for item in [
+        {"name": "viewer", "description": "test", "policy_ids": [1]},
+        {"name": "broken"},
+        {"name": "editor", "description": "test", "policy_ids": [1, 2, 99]}
+    ])
+
+    response = client.post("/api/v1/roles/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert response.status_code == 200
+    result = response.json()
+    assert result["counts"] == {"created": 1, "invalid": 1, "error": 1}
+    assert [item["status"] for item in result["items"]] == ["created", "invalid", "error"]
+    assert result["items"][2]["missing"] == {"policy_ids": [99]}
+    assert "id" not in result["items"][2]
+    assert [role["name"] for role in client.get("/api/v1/roles/").json()] == ["viewer"]
+
+
+def test_create_users_bulk_reports_duplicates(client):
+    """
+    Prueba que un email repetido solo hace fallar a su elemento y no al resto del bloque.
+    """
+    users = [
+        {"name": f"user{i}", "email": f"user{i % 3}@example.com", "plain_password": "secret", "domain_id": 1}
+        for i in range(4)
+    ]
+    response = client.post("/api/v1/users/bulk", json=users)
+    assert [item["status"] for item in response.json()["items"]] == ["created", "created", "created", "error"]
+    assert len(client.get("/api/v1/users/").json()) == 3
+
+
+def test_update_and_delete_roles_bulk(client, db):
+    """
+    Prueba la actualización y la eliminación de roles por lotes, incluidas sus asociaciones.
+    """
+    client.post("/api/v1/policies/bulk", json=[{"name": "read", "description": "test"}, {"name": "write", "description": "test"}])
+    client.post("/api/v1/roles/bulk", json=[
+        {"name": "viewer", "description": "test", "policy_ids": [1]},
+        {"name": "editor", "description": "test", "policy_ids": [1]}
+    ])
+
+    response = client.put("/api/v1/roles/bulk", json=[
+        {"id": 1, "name": "reader", "policy_ids": [2]},
+        {"id": 42, "name": "ghost"}
+    ])
+    assert [item["status"] for item in response.json()["items"]] == ["updated", "not_found"]
+    role = client.get("/api/v1/roles/1").json()
+    assert (role["name"], role["description"]) == ("reader", "test")
+    assert db.execute(role_policy_association.select().order_by("role_id")).all() == [(1, 2), (2, 1)]
+
+    response = client.put("/api/v1/roles/bulk", json=[{"id": 2, "name": "writer", "policy_ids": [2, 99]}])
+    assert response.json()["items"] == [
+        {"index": 0, "status": "error", "detail": "Policy ids not found: [99]", "missing": {"policy_ids": [99]}, "id": 2}
+    ]
+    assert client.get("/api/v1/roles/2").json()["name"] == "editor"
+    assert db.execute(role_policy_association.select().order_by("role_id")).all() == [(1, 2), (2, 1)]
+
+    response = client.request("DELETE", "/api/v1/roles/bulk", json=[2, 7])
+    assert response.json()["counts"] == {"deleted": 1, "not_found": 1}
+    assert db.execute(role_policy_association.select()).all() == [(1, 2)]
+
+
+def test_bulk_create_commits_in_chunks(db):
+    """
+    Prueba que los elementos se crean en bloques y que los IDs se devuelven en el orden de entrada.
+    """
+    rows = [
+        {"name": f"user{i}", "email": f"user{i}@example.com", "hashed_password": "x", "domain_id": 1, "roles": None}
+        for i in range(5)
+    ]
+    results = bulk_create(db, User, rows, (USER_ROLES,), chunk_size=2)
+    assert [result["id"] for result in results] == [1, 2, 3, 4, 5]
+    assert db.query(User).count() == 5
@@ -0,0 +1,126 @@
+"""
+Módulo de pruebas para el motor columnar de transformación y combinación de datos.
+"""
+
+from app.data_products.product_dashboard.columnar import combine_columnar
+from app.data_products.product_dashboard.transformers import transform_and_combine
+
+
+def without_timestamp(combined: dict) -> dict:
+    """
+    Devuelve los datos combinados sin el timestamp, que depende del momento de la ejecución.
+    """
+    return {**combined, "metadata": {**combined["metadata"], "timestamp": None}}
+
+
+def assert_same_output(sap: dict, gmao: dict, clear: dict, bim: dict):
+    """
+    Comprueba que los dos motores producen los mismos datos combinados y las mismas líneas sin cruzar.
+    """
+    expected, expected_unmatched = transform_and_combine(sap, gmao, clear, bim)
+    combined, unmatched = combine_columnar(sap, gmao, clear, bim)
+    assert without_timestamp(combined) == without_timestamp(expected)
+    assert [list(line) for line in combined["Lineas_de_trabajo"]] == [list(line) for line in expected["Lineas_de_trabajo"]]
+    assert unmatched == expected_unmatched
+
+
+SAP = {"employee_costs": "25000€", "sap_plant": "Zona Franca"}
+
+
+def test_same_output_with_duplicates_and_unmatched_lines():
+    """
+    Prueba que el motor columnar coincide con el de diccionarios con ID repetidos y líneas sin cruzar.
+    """
+    gmao = {
+        "gmao_location": "Zona Franca",
+        "gmao_worklines": [
+            {"workline_id": "L2", "workline_title": "B", "electric_usage": "800 kW", "downtime_total": "10"},
+            {"workline_id": "L1", "workline_title": "A", "electric_usage": " 1200.5 kW", "downtime_total": "90"},
+            {"workline_id": "L1", "workline_title": "A", "electric_usage": "1 kW", "downtime_total": "1"},
+            {"workline_id": "L9", "workline_title": "Z", "electric_usage": "5 kW", "downtime_total": "0"}
+        ]
+    }
+    clear = {
+        "line_id": "L1",
+        "input_material": "50 Toneladas",
+        "output_products": [
+            {"product_type": "Material A", "product_amount": "30"},
+            {"product_type": "Material B", "product_amount": "20.5"}
+        ]
+    }
+    bim = {
+        "plant_location": "Zona Franca",
+        "bim_worklines": [
+            {"ID_Linea": "L1", "line_name": "A"},
+            {"ID_Linea": "L3", "line_name": "C"},
+            {"ID_Linea": "L2", "line_name": "B"},
+            {"ID_Linea": "L1", "line_name": "A bis"}
+        ]
+    }
+    assert_same_output(SAP, gmao, clear, bim)
+
+
+def test_same_output_without_gmao_lines_or_products():
+    """
+    Prueba que el motor columnar coincide con el de diccionarios sin líneas de GMAO ni productos de CLEAR.
+    """
+    gmao = {"gmao_location": "Zona Franca", "gmao_worklines": []}
+    clear = {"line_id": "L7", "input_material": "5 Toneladas", "output_products": []}
+    bim = {"plant_location": "Zona Franca", "bim_worklines": [{"ID_Linea": "L1", "line_name": "A"}]}
+    assert_same_output(SAP, gmao, clear, bim)
+
+    combined, unmatched = combine_columnar(SAP, gmao, clear, bim)
+    assert combined["Lineas_de_trabajo"][0]["consumo_electrico"] == 0
+    assert unmatched == {"bim": ["L1"], "gmao": [], "clear": ["L7"]}
+
+
+def test_same_output_with_large_payload():
+    """
+    Prueba que el motor columnar coincide con el de diccionarios con miles de líneas de trabajo.
+    """
+    size = 3000
+    gmao = {
+        "gmao_location": "Zona Franca",
+        "gmao_worklines": [
+            {"workline_id": f"L{i}", "workline_title": f"Linea {i}",
+             "electric_usage": f"{i * 1.5} kW", "downtime_total": str(i % 120)}
+            for i in range(0, size, 2)
+        ]
+    }
+    clear = {
+        "line_id": "L4",
+        "input_material": "50 Toneladas",
+        "output_products": [{"product_type": f"Material {i}", "product_amount": str(i)} for i in range(size)]
+    }
+    bim = {
+        "plant_location": "Zona Franca",
+        "bim_worklines": [{"ID_Linea": f"L{i}", "line_name": f"Linea {i}"} for i in range(size - 1, -1, -1)]
+    }
+    assert_same_output(SAP, gmao, clear, bim)
+
+
+def test_same_output_with_any_whitespace_in_units():
+    """
+    Prueba que el motor columnar separa el valor de la unidad por cualquier espacio en blanco,
+    como el de diccionarios.
+    """
+    separators = [" ", "\t", "\n", "\r\n", "\u00a0", "\u2003", "  \t "]
+    gmao = {
+        "gmao_location": "Zona Franca",
+        "gmao_worklines": [
+            {"workline_id": f"L{i}", "workline_title": f"Linea {i}",
+             "electric_usage": f" {i}.5{separator}kW{separator}", "downtime_total": f" {i}\n"}
+            for i, separator in enumerate(separators)
+        ] + [{"workline_id": "L99", "workline_title": "Sin unidad", "electric_usage": "1e3", "downtime_total": "0"}]
+    }
+    clear = {"line_id": "L1", "input_material": "50 Toneladas", "output_products": []}
+    bim = {
+        "plant_location": "Zona Franca",
+        "bim_worklines": [{"ID_Linea": f"L{i}", "line_name": f"Linea {i}"} for i in [*range(len(separators)), 99]]
+    }
+    assert_same_output(SAP, gmao, clear, bim)
+
+    combined, _ = combine_columnar(SAP, gmao, clear, bim)
+    assert [line["consumo_electrico"] for line in combined["Lineas_de_trabajo"]] == [
+        i + 0.5 for i in range(len(separators))
+    ] + [1000.0]
@@ -0,0 +1,105 @@
+"""
+Módulo de pruebas para la validación en memoria del contrato de datos.
+"""
+
+import os
+
+import pytest
+
+from app.data_products.product_dashboard.contract_registry import ContractRegistry, contract_registry
+from app.data_products.product_dashboard.contract_validator import load_validator
+
+DATA_CONTRACT_PATH = "app/data_contracts/datacontract.yaml"
+
+
+def production_data():
+    """
+    Devuelve un ejemplo de datos combinados que cumple el contrato.
+    """
+    return {
+        "metadata": {"timestamp": "2024-05-31T13:44:26", "version": "1.0"},
+        "Planta": "Zona Franca",
+        "Lineas_de_trabajo": [
+            {
+                "ID_Linea": "L1",
+                "nombre_linea_de_trabajo": "Tratamiento industriales y otros",
+                "consumo_electrico": 1200.0,
+                "tiempo_de_paro": 90.0,
+                "entrada_material": 50.0,
+                "producto_Salida": [{"tipo_material": "Material A", "cantidad": 30.0}]
+            }
+        ],
+        "Gasto_trabajadores": 25000.0
+    }
+
+
+def test_schema_compiled_from_contract():
+    """
+    Prueba que el JSON Schema se genera a partir del modelo del contrato.
+    """
+    validator = load_validator(DATA_CONTRACT_PATH)
+    assert validator.contract_id == "production-data-contract"
+    assert validator.model_name == "production"
+    assert set(validator.schema["required"]) == {"Planta", "Lineas_de_trabajo", "Gasto_trabajadores"}
+    line_schema = validator.schema["properties"]["Lineas_de_trabajo"]["items"]
+    assert line_schema["properties"]["consumo_electrico"]["type"] == "number"
+
+
+def test_valid_data():
+    """
+    Prueba que unos datos correctos pasan la validación.
+    """
+    assert load_validator(DATA_CONTRACT_PATH).validate(production_data())
+
+
+def test_invalid_data():
+    """
+    Prueba que la validación falla si falta un campo obligatorio o un tipo es incorrecto.
+    """
+    data = production_data()
+    del data["Gasto_trabajadores"]
+    data["Lineas_de_trabajo"][0]["consumo_electrico"] = "1200 kW"
+    validator = load_validator(DATA_CONTRACT_PATH)
+
+    errors = validator.iter_errors(data)
+    assert len(errors) == 2
+    assert errors[1].startswith("Lineas_de_trabajo.0.consumo_electrico")
+    with pytest.raises(RuntimeError, match="Validation failed"):
+        validator.validate(data)
+
+
+def test_registry_reloads_only_on_mtime_change(tmp_path):
+    """
+    Prueba que el registro reutiliza el contrato compilado y solo lo recarga si cambia el archivo.
+    """
+    contract_path = tmp_path / "datacontract.yaml"
+    with open(DATA_CONTRACT_PATH, "r", encoding="utf-8") as source:
+        contract_text = source.read()
+    contract_path.write_text(contract_text, encoding="utf-8")
+    registry = ContractRegistry()
+
+    compiled = registry.get(str(contract_path))
+    assert registry.get(str(contract_path)) is compiled
+    assert registry.get_by_id("production-data-contract", "1.0.0") is compiled
+
+    contract_path.write_text(contract_text.replace("version: 1.0.0", "version: 1.1.0"), encoding="utf-8")
+    os.utime(contract_path, (compiled.mtime + 10, compiled.mtime + 10))
+    reloaded = registry.get(str(contract_path))
+    assert reloaded is not compiled
+    assert reloaded.version == "1.1.0"
+    assert registry.get_by_id("production-data-contract") is reloaded
+    with pytest.raises(KeyError):
+        registry.get_by_id("production-data-contract", "1.0.0")
+
+
+def test_validation_does_not_rewrite_contract():
+    """
+    Prueba que validar unos datos no modifica el archivo del contrato.
+    """
+    mtime = os.stat(DATA_CONTRACT_PATH).st_mtime
+    contract = contract_registry.get(DATA_CONTRACT_PATH)
+    contract.as_dict()["servers"]["production"]["path"] = "otro.json"
+
+    assert contract.validator.validate(production_data())
+    assert contract.as_dict()["servers"]["production"]["path"] != "otro.json"
+    assert os.stat(DATA_CONTRACT_PATH).st_mtime == mtime
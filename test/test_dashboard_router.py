@@ -0,0 +1,117 @@
+"""
+Módulo de pruebas para el router del producto de dashboard.
+"""
+
+import asyncio
+import json
+
+from app.data_products.product_dashboard import dashboard_router
+
+
+def test_process_data_batch_json_array(client, outbox, combined_input):
+    """
+    Prueba el procesamiento de un lote en forma de array JSON con resultados por elemento.
+    """
+    invalid_item = combined_input("Zona Franca")
+    invalid_item["sap"]["details"]["employee_costs"] = "mucho"
+    items = [combined_input("Zona Franca"), invalid_item, combined_input("Martorell"), combined_input("Sagunto")]
+
+    response = client.post("/api/v1/process_data/batch/?chunk_size=2", json=items)
+    assert response.status_code == 202
+    body = response.json()
+    assert body["total"] == 4
+    assert body["queued"] == 3
+    assert [item["status"] for item in body["items"]] == ["queued", "error", "queued", "queued"]
+    assert [item["chunk"] for item in body["items"] if item["status"] == "queued"] == [0, 0, 1]
+
+    chunks = [payload for _, _, payload, _ in outbox.claim(10)]
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert chunks[0][1]["Planta"] == "Martorell"
+
+
+def test_process_data_batch_ndjson(client, outbox, combined_input):
+    """
+    Prueba el procesamiento de un lote en NDJSON.
+    """
+    body = "\n".join(json.dumps(combined_input(plant)) for plant in ["Zona Franca", "Martorell"])
+    response = client.post(
+        "/api/v1/process_data/batch/",
+        content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 202
+    assert response.json()["queued"] == 2
+    assert outbox.stats()["depth"] == 1
+
+
+def test_process_data_batch_rejects_non_array(client, outbox, combined_input):
+    """
+    Prueba que un cuerpo que no es un array ni NDJSON se rechaza.
+    """
+    response = client.post("/api/v1/process_data/batch/", json=combined_input("Zona Franca"))
+    assert response.status_code == 400
+
+
+def test_process_data_is_queued(client, outbox, combined_input):
+    """
+    Prueba que /process_data/ responde en cuanto los datos quedan en la cola de salida.
+    """
+    response = client.post("/api/v1/process_data/", json=combined_input("Zona Franca"))
+    assert response.status_code == 202
+    assert response.json()["message"] == "Data queued for delivery"
+
+    status = client.get("/api/v1/process_data/outbox/status").json()
+    assert status["depth"] == 1
+    assert status["dead"] == 0
+
+    archived = client.get("/api/v1/process_data/archive/", params={"plant": "Zona Franca"}).json()
+    assert len(archived) == 1
+    assert archived[0]["Lineas_de_trabajo"][0]["ID_Linea"] == "L1"
+
+
+def test_process_data_stream(client, outbox, combined_input):
+    """
+    Prueba la ingesta en streaming de un payload NDJSON con las líneas de trabajo en registros separados.
+    """
+    data = combined_input("Zona Franca")
+    records = [
+        {"source": "sap", "details": data["sap"]["details"]},
+        {"source": "gmao", "details": {"gmao_location": "Zona Franca"}},
+        *({"source": "gmao", "workline": line} for line in data["gmao"]["details"]["gmao_worklines"]),
+        {"source": "clear", "details": data["clear"]["details"]},
+        {"source": "bim", "details": data["bim"]["details"]}
+    ]
+    body = "\n".join(json.dumps(record) for record in records)
+
+    response = client.post(
+        "/api/v1/process_data/stream/", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 202
+    assert response.json()["unmatched_lines"] == {"bim": [], "gmao": [], "clear": []}
+    payload = outbox.claim(1)[0][2]
+    assert payload["Lineas_de_trabajo"][0]["consumo_electrico"] == 1200.0
+
+    response = client.post("/api/v1/process_data/stream/", content='{"source": "erp"}')
+    assert response.status_code == 400
+
+
+def test_store_runs_outside_event_loop(client, outbox, monkeypatch, combined_input):
+    """
+    Prueba que el guardado en la base de datos de /process_data/ y del lote se ejecuta en el
+    threadpool y no bloquea el bucle de eventos.
+    """
+    calls = []
+
+    def store(_db, data):
+        try:
+            asyncio.get_running_loop()
+            calls.append("event loop")
+        except RuntimeError:
+            calls.append("threadpool")
+        return 0
+
+    monkeypatch.setattr(dashboard_router, "store_combined_data", store)
+    monkeypatch.setattr(dashboard_router, "store_combined_batch", store)
+    assert client.post("/api/v1/process_data/", json=combined_input("Martorell")).status_code == 202
+    assert client.post("/api/v1/process_data/batch/", json=[combined_input("Martorell")]).status_code == 202
+    assert calls == ["threadpool", "threadpool"]
@@ -2,24 +2,35 @@
 Módulo de pruebas para el CRUD de productos de datos.
 """
 
-def test_create_data_product(client):
+import pytest
+
+
+@pytest.fixture
+def domain_id(client):
+    """
+    Crea el dominio al que se asocian los productos de datos.
+    """
+    response = client.post("/api/v1/domains/", json={"name": "testdomain", "description": "test"})
+    return response.json()["id"]
+
+def test_create_data_product(client, domain_id):
     """
     Prueba la creación de un nuevo producto de datos.
     """
     response = client.post("/api/v1/data_products/", json={
         "name": "testdataproduct",
-        "domain_ids": [1]
+        "domain_ids": [domain_id]
     })
     assert response.status_code == 200
     assert response.json()["message"] == "Data product created successfully"
 
-def test_get_data_product(client):
+def test_get_data_product(client, domain_id):
     """
     Prueba la lectura de un producto de datos por ID.
     """
     response = client.post("/api/v1/data_products/", json={
         "name": "testdataproduct",
-        "domain_ids": [1]
+        "domain_ids": [domain_id]
     })
     data_product_id = response.json()["data_product"]["id"]
     response = client.get(f"/api/v1/data_products/{data_product_id}")
@@ -34,30 +45,30 @@ def test_get_all_data_products(client):
     assert response.status_code == 200
     assert isinstance(response.json(), list)
 
-def test_update_data_product(client):
+def test_update_data_product(client, domain_id):
     """
     Prueba la actualización de un producto de datos existente.
     """
     response = client.post("/api/v1/data_products/", json={
         "name": "testdataproduct",
-        "domain_ids": [1]
+        "domain_ids": [domain_id]
     })
     data_product_id = response.json()["data_product"]["id"]
     response = client.put(f"/api/v1/data_products/{data_product_id}", json={
         "name": "updateddataproduct",
-        "domain_ids": [1]
+        "domain_ids": [domain_id]
     })
     assert response.status_code == 200
     assert response.json()["message"] == "Data product updated successfully"
     assert response.json()["data_product"]["name"] == "updateddataproduct"
 
-def test_delete_data_product(client):
+def test_delete_data_product(client, domain_id):
     """
     Prueba la eliminación de un producto de datos por ID.
     """
     response = client.post("/api/v1/data_products/", json={
         "name": "testdataproduct",
-        "domain_ids": [1]
+        "domain_ids": [domain_id]
     })
     data_product_id = response.json()["data_product"]["id"]
     response = client.delete(f"/api/v1/data_products/{data_product_id}")
@@ -71,3 +82,27 @@ def test_delete_all_data_products(client):
     response = client.delete("/api/v1/data_products/")
     assert response.status_code == 200
     assert response.json()["message"] == "All data products deleted successfully"
+
+def test_create_data_product_with_missing_domain(client):
+    """
+    Prueba que no se crea un producto de datos asociado a un dominio que no existe.
+    """
+    response = client.post("/api/v1/data_products/", json={
+        "name": "testdataproduct",
+        "domain_ids": [999]
+    })
+    assert response.status_code == 400
+    assert "999" in response.json()["detail"]
+
+def test_update_data_product_to_existing_name(client):
+    """
+    Prueba que renombrar un producto de datos con el nombre de otro devuelve 400 y no cambia nada.
+    """
+    ids = [
+        client.post("/api/v1/data_products/", json={"name": name}).json()["data_product"]["id"]
+        for name in ["first", "second"]
+    ]
+    response = client.put(f"/api/v1/data_products/{ids[1]}", json={"name": "first"})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Data product with this name already exists"
+    assert client.get(f"/api/v1/data_products/{ids[1]}").json()["name"] == "second"
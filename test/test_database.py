@@ -0,0 +1,125 @@
+"""
+Módulo de pruebas para la configuración de la base de datos y las métricas del pool.
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.config.database import (
+    MeteredAsyncAdaptedQueuePool,
+    MeteredQueuePool,
+    async_url,
+    create_async_db_engine,
+    load_settings,
+    pool_metrics,
+    run_in_session
+)
+from app.models.base import get_base
+from app.models.response_schemas import RoleRead
+from app.service.role_service import create_role, get_role
+
+
+def test_settings_from_file_and_environment(tmp_path, monkeypatch):
+    """
+    Prueba que la configuración se lee del archivo YAML y que las variables de entorno tienen prioridad.
+    """
+    config_file = tmp_path / "database.yaml"
+    config_file.write_text("database:\n  pool_size: 4\n  max_overflow: 2\n  pool_pre_ping: false\n", encoding="utf-8")
+    monkeypatch.setenv("DB_MAX_OVERFLOW", "8")
+    monkeypatch.setenv("DB_PASSWORD", "secreto")
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+
+    settings = load_settings(str(config_file))
+    assert (settings["pool_size"], settings["max_overflow"], settings["pool_pre_ping"]) == (4, 8, False)
+    assert "secreto" not in settings["url"].render_as_string(hide_password=True)
+
+
+def test_pool_metrics_record_waits_and_timeouts(tmp_path):
+    """
+    Prueba que el pool registra las conexiones pedidas y los timeouts cuando no quedan conexiones libres.
+    """
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MeteredQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+    with engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        metrics = pool_metrics(engine)
+        assert metrics["checked_out"] == 1
+
+    metrics = pool_metrics(engine)
+    assert (metrics["checkouts"], metrics["timeouts"], metrics["checked_out"]) == (2, 1, 0)
+    assert metrics["wait_seconds_max"] >= 0.05
+    engine.dispose()
+
+
+def test_async_pool_metrics_record_waits_and_timeouts(tmp_path):
+    """
+    Prueba que el pool de los engines asíncronos (los de las peticiones) también registra las esperas.
+    """
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'pool.db'}",
+        poolclass=MeteredAsyncAdaptedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.05
+    )
+
+    async def run():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+            with pytest.raises(PoolTimeoutError):
+                await engine.connect().start()
+            assert pool_metrics(engine)["checked_out"] == 1
+        metrics = pool_metrics(engine)
+        await engine.dispose()
+        return metrics
+
+    metrics = asyncio.run(run())
+    assert (metrics["checkouts"], metrics["timeouts"], metrics["checked_out"]) == (2, 1, 0)
+    assert metrics["wait_seconds_max"] >= 0.05
+
+
+def test_read_pool_metrics(client):
+    """
+    Prueba el endpoint de métricas del pool, con los pools síncronos y asíncronos.
+    """
+    response = client.get("/api/v1/database/pool")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["replica"] is None and body["async_replica"] is None
+    assert "status" in body["async_primary"]
+
+
+def test_async_url_uses_async_driver():
+    """
+    Prueba que las URL síncronas se convierten a su driver asíncrono.
+    """
+    assert async_url("mysql+mysqlconnector://root@127.0.0.1/db").drivername == "mysql+aiomysql"
+    assert async_url("sqlite:///./test.db").drivername == "sqlite+aiosqlite"
+    assert async_url("sqlite+aiosqlite:///./test.db").drivername == "sqlite+aiosqlite"
+
+
+def test_run_in_session_serializes_inside_session(tmp_path):
+    """
+    Prueba que los servicios síncronos se ejecutan sobre una sesión asíncrona y que el resultado se
+    convierte con el esquema sin cargas perezosas fuera del contexto síncrono.
+    """
+    async def run():
+        engine = create_async_db_engine(f"sqlite:///{tmp_path / 'async.db'}", load_settings())
+        async with engine.begin() as connection:
+            await connection.run_sync(get_base().metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as db:
+            created = await run_in_session(db, create_role, "viewer", "test", schema=RoleRead)
+            found = await run_in_session(db, get_role, created.id, schema=RoleRead)
+            missing = await run_in_session(db, get_role, 999, schema=RoleRead)
+        await engine.dispose()
+        return created, found, missing
+
+    created, found, missing = asyncio.run(run())
+    assert isinstance(created, RoleRead) and created.policies == []
+    assert found.name == "viewer"
+    assert missing is None
@@ -0,0 +1,175 @@
+"""
+Módulo de pruebas para el cliente asíncrono de envío de datos, contra un servidor HTTP local.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi import HTTPException
+
+from app.data_products.product_dashboard.delivery_client import CircuitBreaker, DeliveryClient
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Responde con los códigos de estado configurados en el servidor, en orden.
+    """
+
+    def do_POST(self):
+        server = self.server
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length))
+        with server.lock:
+            server.requests.append(payload)
+            status = server.statuses.pop(0) if server.statuses else 200
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+        body = json.dumps({"status": status}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """
+    Arranca un servidor HTTP local en un hilo y devuelve el servidor.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.statuses = []
+    server.delay = 0
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/dashboard"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+async def post_with_client(client: DeliveryClient, url: str, payloads: list):
+    """
+    Envía los payloads de forma concurrente y cierra el cliente.
+    """
+    try:
+        return await asyncio.gather(*(client.post(url, payload) for payload in payloads), return_exceptions=True)
+    finally:
+        await client.aclose()
+
+
+def test_retries_server_errors(stub_server):
+    """
+    Prueba que los errores 5xx se reintentan hasta obtener respuesta correcta.
+    """
+    stub_server.statuses = [500, 503]
+    client = DeliveryClient(max_retries=3, backoff_base=0.001)
+
+    [response] = asyncio.run(post_with_client(client, stub_server.url, [{"Planta": "Zona Franca"}]))
+    assert response == {"status": 200}
+    assert len(stub_server.requests) == 3
+
+
+def test_client_errors_are_not_retried(stub_server):
+    """
+    Prueba que los errores 4xx no se reintentan.
+    """
+    stub_server.statuses = [422]
+    client = DeliveryClient(max_retries=3, backoff_base=0.001)
+
+    [response] = asyncio.run(post_with_client(client, stub_server.url, [{}]))
+    assert isinstance(response, HTTPException)
+    assert response.status_code == 422
+    assert len(stub_server.requests) == 1
+
+
+def test_circuit_opens_after_failures(stub_server):
+    """
+    Prueba que el circuito se abre tras varios fallos y deja de llamar a la API de destino.
+    """
+    stub_server.statuses = [500] * 10
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    client = DeliveryClient(max_retries=5, backoff_base=0.001, breaker=breaker)
+
+    [response] = asyncio.run(post_with_client(client, stub_server.url, [{}]))
+    assert isinstance(response, HTTPException)
+    assert response.status_code == 503
+    assert breaker.state == CircuitBreaker.OPEN
+    assert len(stub_server.requests) == 2
+
+
+def test_circuit_half_open_probe():
+    """
+    Prueba que tras el tiempo de espera se permite un único envío de prueba.
+    """
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    assert not breaker.allow_request()
+
+    now[0] = 10.0
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    # Una prueba que nadie libera se da por perdida pasados otros reset_timeout segundos
+    breaker.record_failure()
+    now[0] = 20.0
+    assert breaker.allow_request()
+    now[0] = 29.0
+    assert not breaker.allow_request()
+    now[0] = 30.0
+    assert breaker.allow_request()
+
+
+def test_cancelled_probe_is_released(stub_server):
+    """
+    Prueba que si se cancela el envío de prueba (por ejemplo, al parar el worker) se permite otra prueba.
+    """
+    stub_server.delay = 0.5
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+    breaker.record_failure()
+    now[0] = 10.0
+    client = DeliveryClient(breaker=breaker)
+
+    async def run():
+        probe = asyncio.create_task(client.post(stub_server.url, {}))
+        await asyncio.sleep(0.1)
+        assert not breaker.allow_request()
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        await client.aclose()
+
+    asyncio.run(run())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_concurrency_is_bounded(stub_server):
+    """
+    Prueba que no se superan los envíos concurrentes configurados.
+    """
+    stub_server.delay = 0.05
+    client = DeliveryClient(max_connections=2, max_concurrency=2)
+
+    responses = asyncio.run(post_with_client(client, stub_server.url, [{"n": n} for n in range(6)]))
+    assert responses == [{"status": 200}] * 6
+    assert stub_server.max_in_flight == 2
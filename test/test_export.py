@@ -0,0 +1,42 @@
+"""
+Módulo de pruebas para la exportación de tablas en streaming.
+"""
+
+import csv
+import io
+import json
+
+from app.service.export_service import iter_export
+
+
+def test_export_users_ndjson(client, add_users):
+    """
+    Prueba la exportación de usuarios en NDJSON, sin la contraseña.
+    """
+    add_users(3)
+    response = client.get("/api/v1/export/users")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    users = [json.loads(line) for line in response.text.splitlines()]
+    assert [user["name"] for user in users] == ["user0", "user1", "user2"]
+    assert "hashed_password" not in users[0]
+
+
+def test_export_associations_csv(client):
+    """
+    Prueba la exportación de una tabla de asociación en CSV con cabecera.
+    """
+    client.post("/api/v1/policies/bulk", json=[{"name": "read", "description": "test"}])
+    client.post("/api/v1/roles/bulk", json=[{"name": "viewer", "description": "test", "policy_ids": [1]}])
+    response = client.get("/api/v1/export/role_policies", params={"format": "csv"})
+    assert list(csv.reader(io.StringIO(response.text))) == [["role_id", "policy_id"], ["1", "1"]]
+    assert client.get("/api/v1/export/secrets").status_code == 404
+
+
+def test_export_is_chunked(db, add_users):
+    """
+    Prueba que la exportación se genera en fragmentos de chunk_size filas.
+    """
+    add_users(5)
+    chunks = list(iter_export(db, "users", chunk_size=2))
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
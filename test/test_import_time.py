@@ -0,0 +1,65 @@
+"""
+Módulo de pruebas del tiempo de importación de la aplicación (arranque en frío).
+
+Se mide con python -X importtime en un proceso nuevo. El presupuesto es la línea base medida tras
+cargar en diferido los módulos pesados (unos 550 ms; antes eran unos 730 ms en la misma máquina)
+con un margen del 20 %, para que vuelva a fallar si se pierde esa mejora. Al cambiar las
+importaciones a propósito hay que volver a medir y actualizar IMPORT_TIME_BASELINE_MS; en máquinas
+más lentas el presupuesto se puede fijar con IMPORT_TIME_BUDGET_MS.
+"""
+
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BASELINE_MS = 550
+IMPORT_TIME_MARGIN = 1.2
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", str(IMPORT_TIME_BASELINE_MS * IMPORT_TIME_MARGIN)))
+ATTEMPTS = 3
+
+# Módulos que solo se usan en algunos endpoints o al enviar datos y que no se deben cargar al importar
+LAZY_MODULES = ["numpy", "jsonschema", "yaml", "httpx", "mysql.connector", "aiosqlite"]
+
+SCRIPT = (
+    "import sys, app.main; "
+    f"print('loaded:' + ','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))"
+)
+
+
+def import_app() -> tuple[float, list[str], str]:
+    """
+    Importa app.main en un proceso nuevo y devuelve el tiempo acumulado de la importación en
+    milisegundos, los módulos perezosos que se han cargado y la salida estándar.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", SCRIPT],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    line = next(line for line in result.stderr.splitlines() if line.endswith("| app.main"))
+    loaded = next(line for line in result.stdout.splitlines() if line.startswith("loaded:"))
+    return int(line.split("|")[1]) / 1000, [name for name in loaded[len("loaded:"):].split(",") if name], result.stdout
+
+
+def test_import_does_not_load_lazy_modules():
+    """
+    Prueba que importar la aplicación no carga los módulos pesados opcionales ni crea el engine de
+    la base de datos (que se crea en el lifespan).
+    """
+    _, loaded, stdout = import_app()
+    assert loaded == []
+    assert "Conectando a la base de datos" not in stdout
+
+
+def test_import_time_budget():
+    """
+    Prueba que el tiempo de importación de la aplicación no supera el presupuesto (se toma el mejor
+    de varios intentos para no fallar por ruido de la máquina).
+    """
+    timings = []
+    for _ in range(ATTEMPTS):
+        milliseconds, _, _ = import_app()
+        timings.append(milliseconds)
+        if milliseconds <= IMPORT_TIME_BUDGET_MS:
+            break
+    assert min(timings) <= IMPORT_TIME_BUDGET_MS, f"import app.main: {min(timings):.0f} ms > {IMPORT_TIME_BUDGET_MS:.0f} ms"
@@ -0,0 +1,93 @@
+"""
+Módulo de pruebas de las métricas de la aplicación (/metrics).
+"""
+
+import asyncio
+
+import pytest
+
+from app.data_products.product_dashboard import data_contract_service
+from app.utils.metrics import Counter, Histogram, METRICS, reset_metrics
+
+
+def sample(text: str, name: str) -> float:
+    """
+    Devuelve el valor de una muestra del texto de /metrics (nombre con etiquetas), o None si no está.
+    """
+    for line in text.splitlines():
+        if line.startswith(name + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    """
+    Empieza cada prueba sin valores en las métricas.
+    """
+    reset_metrics()
+
+
+def test_histogram_and_counter_format():
+    """
+    Prueba el formato de texto de Prometheus: buckets acumulados, suma, cuenta y etiquetas escapadas.
+    """
+    histogram = Histogram("test_duration_seconds", "Prueba.", ("route",), buckets=(0.1, 1.0))
+    counter = Counter("test_total", "Prueba.", ("route",))
+    METRICS.remove(histogram)
+    METRICS.remove(counter)
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(value, ("/a",))
+    counter.inc(('/"b"\n',), 2)
+
+    assert histogram.render() == [
+        "# HELP test_duration_seconds Prueba.",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{route="/a",le="0.1"} 2',
+        'test_duration_seconds_bucket{route="/a",le="1.0"} 3',
+        'test_duration_seconds_bucket{route="/a",le="+Inf"} 4',
+        'test_duration_seconds_sum{route="/a"} 3.65',
+        'test_duration_seconds_count{route="/a"} 4'
+    ]
+    assert counter.render()[-1] == 'test_total{route="/\\"b\\"\\n"} 2'
+
+
+def test_request_and_query_metrics(client):
+    """
+    Prueba que se miden las peticiones por plantilla de ruta y las consultas que hace cada una,
+    también las de las sesiones asíncronas.
+    """
+    client.get("/api/v1/users/1")
+    client.get("/api/v1/users/2")
+    client.get("/no/existe")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+    route = 'method="GET",route="/api/v1/users/{user_id}"'
+    assert sample(text, f'http_requests_total{{{route},status="404"}}') == 2
+    assert sample(text, f"http_request_duration_seconds_count{{{route}}}") == 2
+    assert sample(text, f"http_request_db_queries_sum{{{route}}}") >= 2
+    assert sample(text, 'http_requests_total{method="GET",route="unmatched",status="404"}') == 1
+    # La propia petición a /metrics está en curso
+    assert sample(text, 'http_requests_in_flight{method="GET"}') == 1
+    assert sample(text, "db_queries_total") >= 2
+
+
+def test_pipeline_stage_metrics(client, outbox, combined_input, monkeypatch):
+    """
+    Prueba que se mide cada etapa del procesamiento de datos y el envío a la API de destino.
+    """
+    assert client.post("/api/v1/process_data/", json=combined_input("Martorell")).status_code == 202
+
+    class FakeDeliveryClient:
+        async def post(self, url, payload):
+            return {"ok": True}
+
+    monkeypatch.setattr(data_contract_service, "get_delivery_client", FakeDeliveryClient)
+    asyncio.run(data_contract_service.send_data_to_api_async({}, "http://destino"))
+
+    text = client.get("/metrics").text
+    for stage in ("transform", "combine", "validate", "archive", "store", "enqueue", "deliver"):
+        assert sample(text, f'pipeline_stage_duration_seconds_count{{stage="{stage}"}}') == 1, stage
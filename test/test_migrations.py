@@ -0,0 +1,193 @@
+"""
+Módulo de pruebas de las migraciones del esquema.
+"""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, inspect, select, text
+
+import app.main
+from app.config import database
+from app.models.base import get_base
+from app.migrations.runner import (
+    LATEST_VERSION,
+    MIGRATIONS,
+    check_schema_version,
+    current_version,
+    migrate,
+    schema_version
+)
+from app.migrations.v0002_index_review import upgrade
+
+OLD_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(60), domain_id INTEGER)",
+    "CREATE INDEX ix_users_id ON users (id)",
+    "CREATE INDEX ix_users_name ON users (name)",
+    "CREATE TABLE roles (id INTEGER PRIMARY KEY, description VARCHAR(200))",
+    "CREATE INDEX ix_roles_description ON roles (description)",
+    "CREATE TABLE user_roles (user_id INTEGER, role_id INTEGER, PRIMARY KEY (user_id, role_id))"
+]
+
+
+def create_old_schema(tmp_path, *statements):
+    """
+    Crea una base de datos con los índices anteriores a la revisión.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        for statement in OLD_SCHEMA + list(statements):
+            connection.execute(text(statement))
+    return engine
+
+
+def test_index_review_upgrade(tmp_path):
+    """
+    Prueba que la migración crea los índices inversos y únicos, elimina los que sobran y es idempotente.
+    """
+    engine = create_old_schema(tmp_path)
+    with engine.begin() as connection:
+        changes = upgrade(connection)
+    assert "created unique index ix_users_name on users" in changes
+    assert "dropped index ix_roles_description on roles" in changes
+
+    inspector = inspect(engine)
+    users = {index["name"]: index for index in inspector.get_indexes("users")}
+    assert set(users) == {"ix_users_name", "ix_users_domain_id"}
+    assert users["ix_users_name"]["unique"]
+    assert [index["name"] for index in inspector.get_indexes("user_roles")] == ["ix_user_roles_role_id"]
+    assert inspector.get_indexes("roles") == []
+
+    with engine.begin() as connection:
+        assert upgrade(connection) == []
+
+
+def test_index_review_rejects_duplicates(tmp_path):
+    """
+    Prueba que la migración no se aplica si hay nombres repetidos en una columna que pasa a ser única.
+    """
+    engine = create_old_schema(tmp_path, "INSERT INTO users (name) VALUES ('ana'), ('ana')")
+    with pytest.raises(ValueError, match="users.name"):
+        with engine.begin() as connection:
+            upgrade(connection)
+    assert not inspect(engine).get_indexes("users")[0]["unique"]
+
+
+def test_migrate_fresh_database(tmp_path):
+    """
+    Prueba que una base de datos vacía recibe todas las migraciones y que al volver a arrancar solo
+    se consulta la versión, sin inspeccionar el esquema.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    assert migrate(engine) == sorted(MIGRATIONS)
+    assert {"users", "user_roles", "user_effective_policies"} <= set(inspect(engine).get_table_names())
+    with engine.connect() as connection:
+        assert current_version(connection) == LATEST_VERSION
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert migrate(engine) == []
+    assert len(statements) <= 2 and not any("index_list" in statement for statement in statements)
+
+
+def test_migrate_database_created_before_migrations(tmp_path):
+    """
+    Prueba que una base de datos creada antes de las migraciones se actualiza: se crean las tablas
+    que faltan, se llena el índice de permisos y se aplica la revisión de índices.
+    """
+    engine = create_old_schema(
+        tmp_path,
+        "CREATE TABLE role_policies (role_id INTEGER, policy_id INTEGER, PRIMARY KEY (role_id, policy_id))",
+        "INSERT INTO users (id, name) VALUES (1, 'ana')",
+        "INSERT INTO roles (id) VALUES (1)",
+        "INSERT INTO user_roles VALUES (1, 1)",
+        "INSERT INTO role_policies VALUES (1, 7)"
+    )
+    assert migrate(engine) == [1, 2]
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT user_id, policy_id FROM user_effective_policies")).all() == [(1, 7)]
+        assert connection.execute(select(schema_version.c.version)).scalars().all() == [1, 2]
+    assert "ix_users_domain_id" in {index["name"] for index in inspect(engine).get_indexes("users")}
+
+
+def test_migrate_rejects_newer_schema(tmp_path):
+    """
+    Prueba que no se arranca sobre un esquema más reciente que el código.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'newer.db'}")
+    migrate(engine)
+    with engine.begin() as connection:
+        connection.execute(schema_version.insert().values(version=LATEST_VERSION + 1, name="future", applied_at=text("CURRENT_TIMESTAMP")))
+    with pytest.raises(ValueError, match="newer"):
+        migrate(engine)
+
+
+def describe_schema(engine) -> dict:
+    """
+    Columnas e índices (columnas y unicidad) de cada tabla de los modelos.
+    """
+    inspector = inspect(engine)
+    return {
+        table: (
+            sorted(column["name"] for column in inspector.get_columns(table)),
+            sorted((tuple(index["column_names"]), bool(index["unique"])) for index in inspector.get_indexes(table))
+        )
+        for table in get_base().metadata.tables
+    }
+
+
+def test_migrations_match_models(tmp_path):
+    """
+    Prueba que aplicar todas las migraciones (con el esquema inicial congelado) da el mismo
+    esquema que los modelos actuales.
+    """
+    migrated = create_engine(f"sqlite:///{tmp_path / 'migrated.db'}")
+    migrate(migrated)
+    models = create_engine(f"sqlite:///{tmp_path / 'models.db'}")
+    get_base().metadata.create_all(models)
+    assert describe_schema(migrated) == describe_schema(models)
+
+
+def test_concurrent_migrations_apply_once(tmp_path):
+    """
+    Prueba que si varios procesos (aquí hilos) migran a la vez, cada migración se aplica una vez.
+    """
+    url = f"sqlite:///{tmp_path / 'concurrent.db'}"
+    results = []
+    barrier = threading.Barrier(3)
+
+    def run():
+        engine = create_engine(url)
+        barrier.wait()
+        results.append(migrate(engine))
+
+    threads = [threading.Thread(target=run) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(results) == [[], [], sorted(MIGRATIONS)]
+
+
+def test_startup_refuses_unmigrated_or_newer_schema(tmp_path, monkeypatch):
+    """
+    Prueba que el arranque de la aplicación y init_db no ignoran un esquema en otra versión.
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    with pytest.raises(RuntimeError, match="does not match"):
+        check_schema_version(engine)
+    monkeypatch.setattr(app.main, "get_engine", lambda: engine)
+    with pytest.raises(RuntimeError, match="does not match"):
+        with TestClient(app.main.app):
+            pass
+
+    migrate(engine)
+    assert check_schema_version(engine) == LATEST_VERSION
+    with engine.begin() as connection:
+        connection.execute(schema_version.insert().values(version=LATEST_VERSION + 1, name="future", applied_at=text("CURRENT_TIMESTAMP")))
+    with pytest.raises(RuntimeError, match="does not match"):
+        check_schema_version(engine)
+    monkeypatch.setattr(database, "get_engine", lambda: engine)
+    with pytest.raises(ValueError, match="newer"):
+        database.init_db()
@@ -0,0 +1,140 @@
+"""
+Módulo de pruebas para la cola de salida (outbox) y sus workers.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.data_products.product_dashboard.outbox import Outbox, OutboxWorker
+
+
+@pytest.fixture
+def temp_outbox(tmp_path):
+    """
+    Devuelve una cola de salida en un archivo temporal.
+    """
+    test_outbox = Outbox(str(tmp_path / "outbox.db"))
+    yield test_outbox
+    test_outbox.close()
+
+
+def test_messages_survive_reopening(tmp_path):
+    """
+    Prueba que los mensajes encolados se conservan al volver a abrir la cola.
+    """
+    path = str(tmp_path / "outbox.db")
+    first = Outbox(path)
+    first.enqueue_many([{"Planta": "Zona Franca"}, {"Planta": "Martorell"}], "http://api")
+    first.close()
+
+    reopened = Outbox(path)
+    messages = reopened.claim(10)
+    assert [payload["Planta"] for _, _, payload, _ in messages] == ["Zona Franca", "Martorell"]
+    assert reopened.claim(10) == []
+    reopened.close()
+
+
+def test_worker_delivers_in_batches(temp_outbox):
+    """
+    Prueba que el worker envía los mensajes y los elimina de la cola.
+    """
+    sent = []
+
+    async def send(payload, target_url):
+        sent.append((payload, target_url))
+        return {"ok": True}
+
+    temp_outbox.enqueue_many([{"n": n} for n in range(5)], "http://api")
+    worker = OutboxWorker(temp_outbox, send, batch_size=3)
+
+    assert asyncio.run(worker.drain_once()) == 3
+    assert asyncio.run(worker.drain_once()) == 2
+    assert len(sent) == 5
+    assert temp_outbox.stats()["depth"] == 0
+
+
+def test_worker_retries_and_dead_letters(temp_outbox):
+    """
+    Prueba que los errores temporales se reintentan y que los permanentes van a la cola de fallidos.
+    """
+    async def send(payload, target_url):
+        if payload["n"] == 0:
+            raise HTTPException(status_code=503, detail="unavailable")
+        raise HTTPException(status_code=422, detail="bad payload")
+
+    temp_outbox.enqueue_many([{"n": 0}, {"n": 1}], "http://api")
+    worker = OutboxWorker(temp_outbox, send, max_attempts=2, backoff_base=0)
+
+    asyncio.run(worker.drain_once())
+    stats = temp_outbox.stats()
+    assert (stats["depth"], stats["in_flight"], stats["dead"]) == (1, 0, 1)
+    assert temp_outbox.dead_letters()[0]["last_error"] == "bad payload"
+
+    asyncio.run(worker.drain_once())
+    assert temp_outbox.stats()["dead"] == 2
+    assert temp_outbox.requeue_dead() == 2
+    assert temp_outbox.stats()["depth"] == 2
+
+
+def test_expired_lease_is_claimed_again(temp_outbox):
+    """
+    Prueba que un mensaje reservado y no confirmado vuelve a estar disponible al caducar la reserva.
+    """
+    temp_outbox.enqueue({"n": 0}, "http://api")
+    assert len(temp_outbox.claim(10, lease_seconds=0)) == 1
+    assert len(temp_outbox.claim(10)) == 1
+    assert temp_outbox.claim(10) == []
+
+
+def test_lease_is_renewed_while_sending(temp_outbox):
+    """
+    Prueba que mientras un envío sigue en curso su reserva se renueva y otro worker no lo reserva
+    aunque haya pasado la duración inicial de la reserva.
+    """
+    claimed_by_other = []
+
+    async def slow_send(payload, target_url):
+        await asyncio.sleep(0.5)
+        claimed_by_other.extend(await asyncio.to_thread(temp_outbox.claim, 10))
+        return {"ok": True}
+
+    temp_outbox.enqueue({"n": 0}, "http://api")
+    worker = OutboxWorker(temp_outbox, slow_send, lease_seconds=0.3)
+    assert asyncio.run(worker.drain_once()) == 1
+    assert claimed_by_other == []
+    assert temp_outbox.stats()["depth"] == 0
+
+
+def test_worker_survives_unexpected_errors(temp_outbox):
+    """
+    Prueba que un error que no es de SQLite no termina la tarea del worker: se registra y se
+    vuelve a intentar.
+    """
+    sent = []
+
+    async def send(payload, target_url):
+        sent.append(payload)
+        return {"ok": True}
+
+    temp_outbox.enqueue({"n": 0}, "http://api")
+    worker = OutboxWorker(temp_outbox, send, poll_interval=0.01)
+    original_drain = worker.drain_once
+    failures = [RuntimeError("boom")]
+
+    async def flaky_drain():
+        if failures:
+            raise failures.pop()
+        return await original_drain()
+
+    worker.drain_once = flaky_drain
+
+    async def run():
+        worker.start()
+        while not sent:
+            await asyncio.sleep(0.01)
+        await worker.stop()
+
+    asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert sent == [{"n": 0}]
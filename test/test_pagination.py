@@ -0,0 +1,47 @@
+"""
+Módulo de pruebas para la paginación por cursor, los filtros y la proyección de campos de los listados.
+"""
+
+
+def test_users_keyset_pagination(client, add_users):
+    """
+    Prueba que las páginas se recorren con el cursor de X-Next-Cursor sin repetir ni saltar elementos.
+    """
+    add_users(7, domains=2)
+    names = []
+    cursor = None
+    pages = 0
+    while True:
+        response = client.get("/api/v1/users/", params={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        names.extend(user["name"] for user in response.json())
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert pages == 3
+    assert names == [f"user{i}" for i in range(7)]
+
+
+def test_users_filter_and_fields(client, add_users):
+    """
+    Prueba el filtro por dominio y la proyección de columnas, que nunca incluye la contraseña.
+    """
+    add_users(4, domains=2)
+    response = client.get("/api/v1/users/", params={"domain_id": 2, "fields": "name,email"})
+    assert response.json() == [
+        {"id": 2, "name": "user1", "email": "user1@example.com"},
+        {"id": 4, "name": "user3", "email": "user3@example.com"}
+    ]
+    assert client.get("/api/v1/users/", params={"fields": "hashed_password"}).status_code == 400
+    assert client.get("/api/v1/users/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_data_products_filter_by_domain(client):
+    """
+    Prueba el filtro de productos de datos por dominio, a través de la tabla intermedia.
+    """
+    client.post("/api/v1/domains/", json={"name": "ventas", "description": "test"})
+    client.post("/api/v1/data_products/bulk", json=[{"name": "dashboard", "domain_ids": [1]}, {"name": "informe"}])
+    response = client.get("/api/v1/data_products/", params={"domain_id": 1, "fields": "name"})
+    assert response.json() == [{"id": 1, "name": "dashboard"}]
@@ -0,0 +1,103 @@
+"""
+Módulo de pruebas del índice de permisos efectivos.
+"""
+
+from app.service.permission_service import rebuild_permission_index, get_user_policy_ids, user_has_policy
+
+
+def _create(client, path, key, **fields):
+    response = client.post(f"/api/v1/{path}/", json=fields)
+    assert response.status_code == 200
+    return response.json()[key]["id"]
+
+
+def _permissions(client, user_id):
+    response = client.get(f"/api/v1/users/{user_id}/permissions")
+    assert response.status_code == 200
+    return response.json()["policy_ids"]
+
+
+def test_permissions_follow_role_and_policy_changes(client, db):
+    """
+    Prueba que el índice se actualiza al cambiar los roles de un usuario, las políticas de un rol
+    y los roles de una política.
+    """
+    read = _create(client, "policies", "policy", name="read", description="test")
+    write = _create(client, "policies", "policy", name="write", description="test")
+    viewer = _create(client, "roles", "role", name="viewer", description="test", policy_ids=[read])
+    user = _create(client, "users", "user", name="ana", email="ana@example.com", plain_password="secret", domain_id=1, roles=[viewer])
+    assert _permissions(client, user) == [read]
+
+    client.put(f"/api/v1/roles/{viewer}", json={"policy_ids": [read, write]})
+    assert _permissions(client, user) == [read, write]
+
+    client.put(f"/api/v1/policies/{write}", json={"role_ids": []})
+    assert _permissions(client, user) == [read]
+
+    editor = _create(client, "roles", "role", name="editor", description="test", user_ids=[user], policy_ids=[write])
+    assert _permissions(client, user) == [read, write]
+    assert user_has_policy(db, user, write)
+
+    response = client.put(f"/api/v1/users/{user}", json={
+        "name": None, "email": None, "plain_password": None, "domain_id": None, "roles": [editor]
+    })
+    assert response.status_code == 200
+    assert _permissions(client, user) == [write]
+    assert not user_has_policy(db, user, read)
+
+
+def test_permissions_after_deletes(client):
+    """
+    Prueba que eliminar un rol o una política quita los permisos que daban.
+    """
+    read = _create(client, "policies", "policy", name="read", description="test")
+    write = _create(client, "policies", "policy", name="write", description="test")
+    viewer = _create(client, "roles", "role", name="viewer", description="test", policy_ids=[read])
+    editor = _create(client, "roles", "role", name="editor", description="test", policy_ids=[write])
+    user = _create(client, "users", "user", name="ana", email="ana@example.com", plain_password="secret", domain_id=1, roles=[viewer, editor])
+
+    client.delete(f"/api/v1/policies/{write}")
+    assert _permissions(client, user) == [read]
+    client.delete(f"/api/v1/roles/{viewer}")
+    assert _permissions(client, user) == []
+
+
+def test_permissions_bulk(client, db):
+    """
+    Prueba que las operaciones por lotes también actualizan el índice.
+    """
+    client.post("/api/v1/policies/bulk", json=[{"name": "read", "description": "test"}, {"name": "write", "description": "test"}])
+    client.post("/api/v1/roles/bulk", json=[{"name": "viewer", "description": "test", "policy_ids": [1]}])
+    result = client.post("/api/v1/users/bulk", json=[
+        {"name": f"user{i}", "email": f"user{i}@example.com", "plain_password": "secret", "domain_id": 1, "roles": [1]}
+        for i in range(3)
+    ]).json()
+    user_ids = [item["id"] for item in result["items"]]
+    assert all(get_user_policy_ids(db, user_id) == [1] for user_id in user_ids)
+
+    client.put("/api/v1/roles/bulk", json=[{"id": 1, "policy_ids": [2]}])
+    assert all(get_user_policy_ids(db, user_id) == [2] for user_id in user_ids)
+
+    client.request("DELETE", "/api/v1/users/bulk", json=user_ids[:1])
+    client.request("DELETE", "/api/v1/policies/bulk", json=[2])
+    assert get_user_policy_ids(db, user_ids[1]) == []
+
+
+def test_rebuild_matches_incremental_index(client, db):
+    """
+    Prueba que reconstruir el índice completo da el mismo resultado que las actualizaciones incrementales.
+    """
+    read = _create(client, "policies", "policy", name="read", description="test")
+    viewer = _create(client, "roles", "role", name="viewer", description="test", policy_ids=[read])
+    user = _create(client, "users", "user", name="ana", email="ana@example.com", plain_password="secret", domain_id=1, roles=[viewer])
+
+    assert rebuild_permission_index(db) == 1
+    assert get_user_policy_ids(db, user) == [read]
+
+
+def test_permissions_user_not_found(client):
+    """
+    Prueba que se devuelve 404 para un usuario inexistente.
+    """
+    response = client.get("/api/v1/users/999/permissions")
+    assert response.status_code == 404
@@ -0,0 +1,118 @@
+"""
+Módulo de pruebas para el almacenamiento y la consulta de las métricas de producción.
+"""
+
+from sqlalchemy import event
+
+from app.service.production_metric_service import store_combined_batch
+
+
+def combined_data(timestamp: str, plant: str = "Zona Franca") -> dict:
+    """
+    Devuelve unos datos combinados con dos líneas de trabajo.
+    """
+    return {
+        "metadata": {"timestamp": timestamp, "version": "1.0"},
+        "Planta": plant,
+        "Lineas_de_trabajo": [
+            {
+                "ID_Linea": "L1",
+                "nombre_linea_de_trabajo": "Linea 1",
+                "consumo_electrico": 1200.0,
+                "tiempo_de_paro": 90.0,
+                "entrada_material": 50.0,
+                "producto_Salida": [{"tipo_material": "A", "cantidad": 30.0}, {"tipo_material": "B", "cantidad": 20.0}]
+            },
+            {
+                "ID_Linea": "L2",
+                "nombre_linea_de_trabajo": "Linea 2",
+                "consumo_electrico": 800.0,
+                "tiempo_de_paro": 10.0,
+                "entrada_material": 0,
+                "producto_Salida": []
+            }
+        ],
+        "Gasto_trabajadores": 25000.0
+    }
+
+
+def test_range_scan(client, db):
+    """
+    Prueba la consulta de las métricas de una línea en un rango de fechas.
+    """
+    store_combined_batch(db, [
+        combined_data("2024-05-30T10:00:00"),
+        combined_data("2024-05-31T10:00:00"),
+        combined_data("2024-05-31T10:00:00", plant="Martorell")
+    ])
+
+    response = client.get("/api/v1/production_metrics/", params={
+        "planta": "Zona Franca",
+        "id_linea": "L1",
+        "start": "2024-05-31T00:00:00"
+    })
+    assert response.status_code == 200
+    metrics = response.json()
+    assert len(metrics) == 1
+    assert metrics[0]["timestamp"] == "2024-05-31T10:00:00"
+    assert metrics[0]["producto_salida"] == 50.0
+
+
+def test_aggregate_by_period(client, db):
+    """
+    Prueba la agregación de las métricas por día y por mes.
+    """
+    store_combined_batch(db, [
+        combined_data("2024-05-30T10:00:00"),
+        combined_data("2024-05-30T18:00:00"),
+        combined_data("2024-05-31T10:00:00"),
+        combined_data("2024-06-01T10:00:00")
+    ])
+
+    response = client.get("/api/v1/production_metrics/aggregate", params={"planta": "Zona Franca", "periodo": "dia"})
+    assert response.status_code == 200
+    days = response.json()
+    assert [day["inicio"][:10] for day in days] == ["2024-05-30", "2024-05-31", "2024-06-01"]
+    assert days[0]["muestras"] == 4
+    assert days[0]["consumo_electrico"] == 4000.0
+
+    response = client.get("/api/v1/production_metrics/aggregate", params={
+        "planta": "Zona Franca", "periodo": "mes", "id_linea": "L1"
+    })
+    months = response.json()
+    assert [(month["inicio"][:7], month["muestras"]) for month in months] == [("2024-05", 3), ("2024-06", 1)]
+
+
+def test_aggregate_rejects_unknown_period(client):
+    """
+    Prueba que un periodo no válido devuelve un error 400.
+    """
+    response = client.get("/api/v1/production_metrics/aggregate", params={"planta": "Zona Franca", "periodo": "hora"})
+    assert response.status_code == 400
+
+
+def test_aggregate_by_week_in_database(client, db, request_engine):
+    """
+    Prueba que la agregación por semana (de lunes a domingo) y por año se hace en la base de datos.
+    """
+    store_combined_batch(db, [
+        combined_data("2024-06-02T23:00:00"),  # domingo
+        combined_data("2024-06-03T00:00:00"),  # lunes
+        combined_data("2024-06-09T10:00:00")   # domingo
+    ])
+    statements = []
+
+    def record(_conn, _cursor, statement, *_args):
+        statements.append(statement)
+
+    event.listen(request_engine, "before_cursor_execute", record)
+    try:
+        weeks = client.get("/api/v1/production_metrics/aggregate", params={"planta": "Zona Franca", "periodo": "semana"}).json()
+    finally:
+        event.remove(request_engine, "before_cursor_execute", record)
+    assert [(week["inicio"][:10], week["muestras"]) for week in weeks] == [("2024-05-27", 2), ("2024-06-03", 4)]
+    assert weeks[1]["producto_salida"] == 100.0
+    assert any("GROUP BY" in statement for statement in statements)
+
+    years = client.get("/api/v1/production_metrics/aggregate", params={"planta": "Zona Franca", "periodo": "año"}).json()
+    assert [(year["inicio"][:10], year["muestras"]) for year in years] == [("2024-01-01", 6)]
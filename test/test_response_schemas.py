@@ -0,0 +1,43 @@
+"""
+Módulo de pruebas para los esquemas de respuesta y la carga de relaciones.
+"""
+
+from sqlalchemy import event
+
+from app.models.role import Role
+from app.models.user import User
+
+
+def test_user_response_includes_roles_without_password(client, db):
+    """
+    Prueba que un usuario se devuelve con sus roles y sin la contraseña.
+    """
+    db.add(User(name="ana", email="ana@example.com", hashed_password="x", domain_id=1, roles=[Role(name="viewer")]))
+    db.commit()
+
+    user = client.get("/api/v1/users/1").json()
+    assert user == {"id": 1, "name": "ana", "email": "ana@example.com", "domain_id": 1, "roles": [{"id": 1, "name": "viewer"}]}
+
+
+def test_list_page_uses_fixed_number_of_queries(client, db, request_engine):
+    """
+    Prueba que una página del listado se carga con el mismo número de consultas sea cual sea su tamaño.
+    """
+    roles = [Role(name=f"role{i}") for i in range(3)]
+    db.add_all([
+        User(name=f"user{i}", email=f"user{i}@example.com", hashed_password="x", domain_id=1, roles=roles[:1 + i % 3])
+        for i in range(30)
+    ])
+    db.commit()
+
+    statements = []
+    listener = lambda *args: statements.append(args[2])
+    event.listen(request_engine, "before_cursor_execute", listener)
+    try:
+        users = client.get("/api/v1/users/", params={"limit": 25}).json()
+    finally:
+        event.remove(request_engine, "before_cursor_execute", listener)
+
+    assert len(users) == 25
+    assert [role["name"] for role in users[2]["roles"]] == ["role0", "role1", "role2"]
+    assert len(statements) == 2
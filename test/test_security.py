@@ -0,0 +1,70 @@
+"""
+Módulo de pruebas del hash de contraseñas en el pool de hash.
+"""
+
+import asyncio
+import time
+
+from app.models.user import User
+from app.utils.security import (
+    BCRYPT_ROUNDS,
+    hash_password,
+    hash_password_async,
+    hash_passwords_async,
+    verify_password,
+    verify_password_async
+)
+
+
+def test_hash_and_verify_async():
+    """
+    Prueba que los hash del pool se verifican igual que los síncronos y usan el factor de coste configurado.
+    """
+    async def run():
+        hashed = await hash_password_async("secret")
+        return hashed, await verify_password_async("secret", hashed), await verify_password_async("other", hashed)
+
+    hashed, valid, invalid = asyncio.run(run())
+    assert valid and not invalid
+    assert verify_password("secret", hashed)
+    assert hashed.startswith(f"$2b${BCRYPT_ROUNDS:02d}$")
+
+
+def test_hashing_does_not_block_event_loop():
+    """
+    Prueba que mientras se calculan varios hash el bucle de eventos sigue atendiendo otras tareas:
+    el mayor retraso de un temporizador de 10 ms es mucho menor que lo que tarda un hash.
+    """
+    start = time.perf_counter()
+    hash_password("secret")
+    hash_seconds = time.perf_counter() - start
+
+    async def run():
+        delays = []
+        hashing = asyncio.ensure_future(hash_passwords_async(["secret"] * 4))
+        while not hashing.done():
+            tick = time.perf_counter()
+            await asyncio.sleep(0.01)
+            delays.append(time.perf_counter() - tick - 0.01)
+        return await hashing, delays
+
+    hashes, delays = asyncio.run(run())
+    assert len(hashes) == 4 and all(verify_password("secret", hashed) for hashed in hashes)
+    assert max(delays) < hash_seconds / 2
+
+
+def test_user_endpoints_hash_in_pool(client, db):
+    """
+    Prueba que los usuarios creados y actualizados por la API se pueden autenticar con su contraseña.
+    """
+    user_id = client.post("/api/v1/users/", json={
+        "name": "ana", "email": "ana@example.com", "plain_password": "secret", "domain_id": 1
+    }).json()["user"]["id"]
+    client.put(f"/api/v1/users/{user_id}", json={
+        "name": None, "email": None, "plain_password": "changed", "domain_id": None
+    })
+    client.put("/api/v1/users/bulk", json=[{"id": user_id, "name": "ana maria"}])
+
+    user = db.get(User, user_id)
+    assert user.name == "ana maria"
+    assert verify_password("changed", user.hashed_password)
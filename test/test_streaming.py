@@ -0,0 +1,98 @@
+"""
+Módulo de pruebas para la ingesta en streaming de los datos de entrada.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from app.data_products.product_dashboard.streaming import LineTooLongError, combine_stream
+from app.data_products.product_dashboard.transformers import transform_and_combine
+
+SAP = {"employee_costs": "25000€", "sap_plant": "Zona Franca"}
+GMAO = {
+    "gmao_location": "Zona Franca",
+    "gmao_worklines": [
+        {"workline_id": "L2", "workline_title": "B", "electric_usage": "800 kW", "downtime_total": "10"},
+        {"workline_id": "L1", "workline_title": "A", "electric_usage": "1200 kW", "downtime_total": "90"},
+        {"workline_id": "L1", "workline_title": "A", "electric_usage": "1 kW", "downtime_total": "1"},
+        {"workline_id": "L9", "workline_title": "Z", "electric_usage": "5 kW", "downtime_total": "0"}
+    ]
+}
+CLEAR = {
+    "line_id": "L1",
+    "input_material": "50 Toneladas",
+    "output_products": [
+        {"product_type": "Material A", "product_amount": "30"},
+        {"product_type": "Material B", "product_amount": "20"}
+    ]
+}
+BIM = {
+    "plant_location": "Zona Franca",
+    "bim_worklines": [
+        {"ID_Linea": "L1", "line_name": "A"},
+        {"ID_Linea": "L3", "line_name": "C"},
+        {"ID_Linea": "L2", "line_name": "B"}
+    ]
+}
+
+
+def stream_records() -> list[dict]:
+    """
+    Devuelve los datos de ejemplo como registros del stream, con las líneas y productos por separado.
+    """
+    return [
+        {"source": "bim", "workline": BIM["bim_worklines"][0]},
+        {"source": "sap", "details": SAP},
+        {"source": "gmao", "details": {"gmao_location": GMAO["gmao_location"]}},
+        *({"source": "gmao", "workline": line} for line in GMAO["gmao_worklines"]),
+        {"source": "clear", "details": {"line_id": CLEAR["line_id"], "input_material": CLEAR["input_material"]}},
+        *({"source": "clear", "product": product} for product in CLEAR["output_products"]),
+        {"source": "bim", "details": {"plant_location": BIM["plant_location"]}},
+        *({"source": "bim", "workline": line} for line in BIM["bim_worklines"][1:])
+    ]
+
+
+async def chunked(body: bytes, size: int):
+    """
+    Devuelve el cuerpo en fragmentos de size bytes, como llegaría por la red.
+    """
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+
+def test_stream_matches_transform_and_combine():
+    """
+    Prueba que la ingesta en streaming produce lo mismo que transform_and_combine, aunque las líneas
+    lleguen partidas entre fragmentos.
+    """
+    body = "\n".join(json.dumps(record, ensure_ascii=False) for record in stream_records()).encode("utf-8")
+    combined, unmatched = asyncio.run(combine_stream(chunked(body, 7)))
+    expected, expected_unmatched = transform_and_combine(SAP, GMAO, CLEAR, BIM)
+
+    assert combined["Lineas_de_trabajo"] == expected["Lineas_de_trabajo"]
+    assert (combined["Planta"], combined["Gasto_trabajadores"]) == (expected["Planta"], expected["Gasto_trabajadores"])
+    assert unmatched == expected_unmatched
+
+
+def test_stream_rejects_long_lines_and_missing_records():
+    """
+    Prueba que se rechazan las líneas demasiado largas y los streams sin registro de SAP.
+    """
+    body = json.dumps({"source": "bim", "details": BIM}).encode("utf-8")
+    with pytest.raises(LineTooLongError):
+        asyncio.run(combine_stream(chunked(body, 16), max_line_bytes=32))
+    with pytest.raises(ValueError, match="sap"):
+        asyncio.run(combine_stream(chunked(body, 16)))
+
+
+def test_stream_rejects_duplicate_details_records():
+    """
+    Prueba que se rechaza un segundo registro de cabecera de la misma fuente, que sobrescribiría
+    la entrada de material de CLEAR pero sumaría sus productos.
+    """
+    records = stream_records() + [{"source": "clear", "details": CLEAR}]
+    body = "\n".join(json.dumps(record, ensure_ascii=False) for record in records).encode("utf-8")
+    with pytest.raises(ValueError, match="Duplicate details record for source 'clear'"):
+        asyncio.run(combine_stream(chunked(body, 64)))
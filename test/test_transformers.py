@@ -1,17 +1,17 @@
 """
 Este módulo contiene pruebas para los transformadores de datos.
 """
-import subprocess
 import json
-import yaml
 
+from app.data_products.product_dashboard.contract_validator import load_validator
 
 from app.data_products.product_dashboard.transformers import (
     transform_sap_data,
     transform_gmao_data,
     transform_clear_data,
     transform_bim_data,
-    combine_data
+    combine_data,
+    combine_data_with_report
 )
 
 
@@ -72,27 +72,45 @@ def test_combined_data():
     # Combina los datos
     combined_json = combine_data(sap_transformed, gmao_transformed, clear_transformed, bim_transformed)
 
-    # Convertir el timestamp para que sea adecuado como nombre de archivo
-    timestamp = combined_json["metadata"]["timestamp"].replace(':', '').replace('-', '').replace('T', '_').replace('Z', '')
-    filename = f"app/uploads/{timestamp}.json"
-
     print(json.dumps(combined_json, indent=2))
 
-    # Guardar el resultado en un archivo nombrado con el timestamp
-    with open(filename, "w", encoding="utf-8") as file:
-        json.dump(combined_json, file, ensure_ascii=False, indent=2)
+    # Validar el resultado contra el contrato de datos
+    validator = load_validator("app/data_contracts/datacontract.yaml")
+    assert validator.validate(combined_json)
 
 
-    # Actualizar el archivo de contrato de datos para referenciar el archivo subido
-    with open("app/data_contracts/datacontract.yaml", "r", encoding="utf-8") as yaml_file:
-        datacontract = yaml.safe_load(yaml_file)
-    datacontract['servers']['production']['path'] = filename
-    with open("app/data_contracts/datacontract.yaml", "w", encoding="utf-8") as yaml_file:
-        yaml.safe_dump(datacontract, yaml_file)
+def test_combine_data_reports_unmatched_lines():
+    """
+    Prueba que el cruce por ID_Linea informa de las líneas sin correspondencia en cada fuente.
+    """
+    sap_transformed = {"Planta": "Zona Franca", "Gasto_trabajadores": 25000.0}
+    gmao_transformed = {"Planta": "Zona Franca", "Lineas_de_trabajo": [
+        {"ID_Linea": "L2", "consumo_electrico": 800.0, "tiempo_de_paro": 10.0},
+        {"ID_Linea": "L1", "consumo_electrico": 1200.0, "tiempo_de_paro": 90.0},
+        {"ID_Linea": "L1", "consumo_electrico": 1.0, "tiempo_de_paro": 1.0},
+        {"ID_Linea": "L9", "consumo_electrico": 5.0, "tiempo_de_paro": 5.0}
+    ]}
+    clear_transformed = {"Planta": "", "Lineas_de_trabajo": [
+        {"ID_Linea": "L1", "entrada_material": 50.0, "producto_Salida": []}
+    ]}
+    bim_transformed = {"Planta": "Zona Franca", "Lineas_de_trabajo": [
+        {"ID_Linea": "L1", "nombre_linea_de_trabajo": "Linea 1"},
+        {"ID_Linea": "L2", "nombre_linea_de_trabajo": "Linea 2"},
+        {"ID_Linea": "L3", "nombre_linea_de_trabajo": "Linea 3"}
+    ]}
+
+    combined, unmatched = combine_data_with_report(
+        sap_transformed, gmao_transformed, clear_transformed, bim_transformed
+    )
+
+    lines = {line["ID_Linea"]: line for line in combined["Lineas_de_trabajo"]}
+    assert [line["ID_Linea"] for line in combined["Lineas_de_trabajo"]] == ["L1", "L2", "L3"]
+    assert lines["L1"]["consumo_electrico"] == 1200.0  # Se conserva la primera línea con ese ID
+    assert lines["L1"]["entrada_material"] == 50.0
+    assert lines["L2"]["entrada_material"] == 0
+    assert lines["L3"]["consumo_electrico"] == 0
+    assert unmatched == {"bim": ["L2", "L3"], "gmao": ["L9"], "clear": []}
 
-    # Ejecutar la validación
-    result = subprocess.run(['datacontract', 'test', 'app/data_contracts/datacontract.yaml'], capture_output=True, text=True)
-    print("Validation result:", result.stdout)
 
 if __name__ == "__main__":
     test_combined_data()
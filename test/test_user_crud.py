@@ -136,3 +136,29 @@ def test_delete_all_users(client):
     response = client.delete("/api/v1/users/")
     assert response.status_code == 200
     assert response.json()["message"] == "All users deleted successfully"
+
+def test_update_user_to_existing_name(client):
+    """
+    Prueba que renombrar un usuario con el nombre de otro devuelve 400 y no cambia nada.
+    """
+    domain_id = client.post("/api/v1/domains/", json={"name": "testdomain", "description": "test"}).json()["id"]
+    ids = []
+    for name in ["alice", "bob"]:
+        response = client.post("/api/v1/users/", json={
+            "name": name,
+            "email": f"{name}@example.com",
+            "plain_password": "testpassword",
+            "domain_id": domain_id
+        })
+        assert response.status_code == 200
+        ids.append(response.json()["user"]["id"])
+
+    response = client.put(f"/api/v1/users/{ids[1]}", json={
+        "name": "alice",
+        "email": "bob@example.com",
+        "plain_password": None,
+        "domain_id": domain_id
+    })
+    assert response.status_code == 400
+    assert response.json()["detail"] == "User with this name or email already exists"
+    assert client.get(f"/api/v1/users/{ids[1]}").json()["name"] == "bob"